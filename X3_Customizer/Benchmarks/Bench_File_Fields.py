@@ -0,0 +1,78 @@
+'''
+Benchmark of t file parsing across all t files with fields in
+File_Fields, comparing field names looked up for every entry of every
+line (as T_File parsing did before Get_T_File_Line_Keys) against the
+precompiled line keys.
+
+Usage: python Benchmarks/Bench_File_Fields.py [line_count]
+'''
+import sys
+import Bench_Shared
+from X3_Customizer.File_Manager import File_Fields
+
+
+def Get_Line_Keys_Per_Entry(field_dict, data_list):
+    '''
+    Returns the keys for a line, checking each entry index against the
+    field dict, including negative indices.
+    '''
+    is_data_line = len(data_list) >= field_dict['min_data_entries']
+    key_list = []
+    for index in range(len(data_list)):
+        this_key = index
+        if is_data_line:
+            if index in field_dict:
+                this_key = field_dict[index]
+            negative_index = index - len(data_list)
+            if negative_index in field_dict:
+                this_key = field_dict[negative_index]
+        key_list.append(this_key)
+    return key_list
+
+
+def Parse_Per_Entry(data_list_list, file_name):
+    '''
+    Looks up the keys for each line, resolving each entry in turn.
+    '''
+    field_dict = File_Fields.T_file_name_field_dict_dict[file_name]
+    return [Get_Line_Keys_Per_Entry(field_dict, data_list)
+            for data_list in data_list_list]
+
+
+def Parse_Precompiled(data_list_list, file_name):
+    '''
+    Looks up the keys for each line from the keys compiled per line
+    length.
+    '''
+    return [File_Fields.Get_T_File_Line_Keys(file_name, len(data_list))[0]
+            for data_list in data_list_list]
+
+
+def Run(line_count = 1000):
+    file_data_dict = {}
+    for file_name in Bench_Shared.Get_T_File_Names():
+        text = Bench_Shared.Make_T_File_Binary(
+            file_name, line_count).decode()
+        file_data_dict[file_name] = [
+            x.split(';') for x in text.splitlines(True)
+            if not x.startswith('//')]
+
+    def Parse_All(parse_function):
+        return {x : [tuple(z) for z in parse_function(y, x)]
+                for x, y in file_data_dict.items()}
+
+    # Both should produce the same keys.
+    assert Parse_All(Parse_Per_Entry) == Parse_All(Parse_Precompiled)
+
+    print('{} t files with {} lines each:'.format(
+        len(file_data_dict), line_count))
+    for label, parse_function in [
+            ('per entry lookup', Parse_Per_Entry),
+            ('precompiled keys', Parse_Precompiled),
+        ]:
+        parse_time = Bench_Shared.Time_Call(lambda: Parse_All(parse_function))
+        print('  {:<18} {:6.1f} ms'.format(label, parse_time * 1000))
+
+
+if __name__ == '__main__':
+    Run(*[int(x) for x in sys.argv[1:]])
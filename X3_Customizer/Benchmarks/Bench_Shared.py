@@ -0,0 +1,62 @@
+'''
+Shared support for the benchmark scripts in this folder.
+
+Benchmarks are run directly, eg. "python Benchmarks/Bench_T_Table.py",
+and work on generated file contents, so that they do not need a game
+installation. Generated t files follow the field layouts given in
+File_Fields, filled with random numbers.
+'''
+import sys
+import time
+import random
+from pathlib import Path
+
+# Make the X3_Customizer package importable, along with its top level
+#  modules (eg. Change_Log) which are imported by name.
+package_dir = Path(__file__).resolve().parent.parent
+for path in [str(package_dir.parent), str(package_dir)]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from X3_Customizer.File_Manager import File_Fields
+
+
+def Get_T_File_Names():
+    '''
+    Returns a list of the t file names with fields in File_Fields.
+    '''
+    return [x for x in File_Fields.T_file_name_field_dict_dict
+            if x.endswith('.txt')]
+
+
+def Make_T_File_Binary(file_name, line_count, seed = 1):
+    '''
+    Returns the binary for a generated t file with the given name and
+    number of data lines, with windows line endings as in the game
+    files. Lines are long enough to cover all fields of the file,
+    including those indexed from the end of the line.
+    '''
+    rng = random.Random(seed)
+    field_dict = File_Fields.T_file_name_field_dict_dict[file_name]
+    indices = [x for x in field_dict if isinstance(x, int)]
+    entry_count = max(indices + [0]) - min(indices + [0]) + 10
+
+    lines = ['// Generated {}'.format(file_name),
+             '1;{};'.format(line_count)]
+    for _ in range(line_count):
+        lines.append(';'.join(str(rng.randint(0, 99999))
+                              for _ in range(entry_count - 1)) + ';')
+    return ('\r\n'.join(lines) + '\r\n').encode()
+
+
+def Time_Call(function, repeats = 5):
+    '''
+    Calls the function repeatedly, and returns the fastest time taken
+    in seconds.
+    '''
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
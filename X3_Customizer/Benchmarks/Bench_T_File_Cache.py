@@ -0,0 +1,66 @@
+'''
+Benchmark of loading all t files with fields in File_Fields, without
+the t file cache, with a cold cache (parsing and recording entries),
+and with a warm cache (restoring entries).
+
+Usage: python Benchmarks/Bench_T_File_Cache.py [line_count]
+'''
+import gc
+import sys
+import time
+import tempfile
+import Bench_Shared
+from X3_Customizer.Common.Settings import Settings
+from X3_Customizer.File_Manager.File_Types import T_File
+from X3_Customizer.File_Manager.T_File_Cache import T_File_Cache
+
+
+def Load_All(binary_dict):
+    '''
+    Loads the t files through the cache as the Source_Reader does.
+    Returns a dict of the T_Files, keyed by virtual path.
+    '''
+    t_file_dict = {}
+    for virtual_path, file_binary in binary_dict.items():
+        t_file = T_File_Cache.Get(file_binary, virtual_path)
+        if t_file == None:
+            t_file = T_File(file_binary, virtual_path = virtual_path)
+            T_File_Cache.Record(t_file, file_binary)
+        t_file_dict[virtual_path] = t_file
+    return t_file_dict
+
+
+def Run(line_count = 1000):
+    binary_dict = {
+        'types/' + x : Bench_Shared.Make_T_File_Binary(x, line_count)
+        for x in Bench_Shared.Get_T_File_Names()}
+
+    with tempfile.TemporaryDirectory() as log_folder:
+        Settings.path_to_log_folder = log_folder
+
+        print('{} t files with {} lines each:'.format(
+            len(binary_dict), line_count))
+        output_dict_dict = {}
+        for label, use_cache in [
+                ('no cache'  , False),
+                ('cold cache', True),
+                ('warm cache', True),
+            ]:
+            Settings.use_t_file_cache = use_cache
+            # Start each load from a clean heap, so garbage collection
+            #  of earlier loads is not timed.
+            gc.collect()
+            start = time.perf_counter()
+            t_file_dict = Load_All(binary_dict)
+            print('  {:<10} {:6.1f} ms'.format(
+                label, (time.perf_counter() - start) * 1000))
+            output_dict_dict[label] = {
+                x : y.Get_Binary() for x, y in t_file_dict.items()}
+            del(t_file_dict)
+
+    # Files restored from the cache should match those parsed.
+    assert output_dict_dict['warm cache'] == output_dict_dict['no cache']
+
+
+if __name__ == '__main__':
+    Run(*[int(x) for x in sys.argv[1:]])
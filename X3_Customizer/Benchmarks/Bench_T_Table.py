@@ -0,0 +1,67 @@
+'''
+Benchmark of t file parse time and memory use, comparing the column
+backed T_Table layout of T_File against the prior layout of one
+OrderedDict per line.
+
+Usage: python Benchmarks/Bench_T_Table.py [line_count]
+'''
+import sys
+import tracemalloc
+from collections import OrderedDict
+import Bench_Shared
+from X3_Customizer.File_Manager import File_Fields
+from X3_Customizer.File_Manager.File_Types import T_File
+
+
+def Parse_Dicts(file_binary, file_name):
+    '''
+    Parses the file binary into a list of OrderedDicts, one per line,
+    along with a raw text copy, as T_File did before T_Table.
+    '''
+    text = file_binary.decode().replace('\r\n','\n')
+    line_dict_list = []
+    for line in text.splitlines(True):
+        if line.startswith('//'):
+            continue
+        data_list = line.split(';')
+        key_tuple, _ = File_Fields.Get_T_File_Line_Keys(
+            file_name, len(data_list))
+        line_dict_list.append(OrderedDict(zip(key_tuple, data_list)))
+    return text, line_dict_list
+
+
+def Get_Retained_Size(function):
+    '''
+    Returns the bytes allocated by the function and still held by
+    its return value.
+    '''
+    tracemalloc.start()
+    # Keep the result alive until the size is taken.
+    result = function()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def Run(line_count = 1000):
+    file_name = 'TShips.txt'
+    file_binary = Bench_Shared.Make_T_File_Binary(file_name, line_count)
+    virtual_path = 'types/' + file_name
+
+    layout_function_dict = {
+        'OrderedDict per line' : lambda: Parse_Dicts(file_binary, file_name),
+        'T_Table'              : lambda: T_File(
+            file_binary, virtual_path = virtual_path),
+        }
+    print('{} with {} lines:'.format(file_name, line_count))
+    for layout, function in layout_function_dict.items():
+        # Parse once up front, so that cached line keys are not counted.
+        function()
+        parse_time = Bench_Shared.Time_Call(function)
+        size = Get_Retained_Size(function)
+        print('  {:<22} parse {:6.1f} ms, retained {:6.0f} KB'.format(
+            layout, parse_time * 1000, size / 1024))
+
+
+if __name__ == '__main__':
+    Run(*[int(x) for x in sys.argv[1:]])
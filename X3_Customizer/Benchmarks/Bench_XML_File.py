@@ -0,0 +1,190 @@
+'''
+Benchmark of line based xml edits, comparing whole text edits (a
+str.replace over the text per edited line, or splitting and joining
+the text on each pass) against the XML_File line buffer from
+Get_Lines and Update_From_Lines.
+
+Files are generated to resemble 'director/3.01 Generic Missions.xml'
+(with many chance lines to edit) and 'maps/x3_universe.xml' (edited
+over several passes, as by the sector transforms).
+
+Also times a chain of transforms using the element tree of a file
+like 'maps/WareTemplate.xml', with and without the snapshots taken
+to undo failed transforms, and with a new snapshot copy made by every
+transform instead of shared copies.
+
+Usage: python Benchmarks/Bench_XML_File.py [line_count]
+'''
+import sys
+import random
+import Bench_Shared
+from X3_Customizer.File_Manager.File_Types import XML_File
+
+header = '<?xml version="1.0" encoding="UTF-8" ?>'
+
+
+def Make_Missions_Binary(line_count):
+    '''
+    Returns a generated missions file binary, with every tenth line
+    setting a cue chance.
+    '''
+    rng = random.Random(1)
+    lines = [header, '<director name="Generic Missions">']
+    for index in range(line_count):
+        if index % 10 == 0:
+            lines.append('      <set_value name="this.L2M{}" '
+                         'chance="{{player.sector.quota.T{}}}*{}"/>'.format(
+                             index, rng.randint(0, 9), rng.randint(0, 100)))
+        else:
+            lines.append('      <do_if value="{}"/>'.format(rng.random()))
+    lines.append('</director>')
+    return ('\r\n'.join(lines) + '\r\n').encode()
+
+
+def Make_Universe_Binary(line_count):
+    '''
+    Returns a generated universe file binary, with a sector every
+    tenth line.
+    '''
+    rng = random.Random(1)
+    lines = [header, '<universe>']
+    for index in range(line_count):
+        if index % 10 == 0:
+            lines.append('  <o f="0" x="{}" y="{}" r="{}" size="2000" '
+                         'm="{}" p="-1" qtrade="1" t="1">'.format(
+                             index % 24, index // 24, rng.randint(0, 5),
+                             rng.randint(0, 9000)))
+        else:
+            lines.append('    <o t="{}" s="{}"/>'.format(
+                rng.randint(2, 30), rng.randint(0, 99)))
+    lines.append('</universe>')
+    return ('\r\n'.join(lines) + '\r\n').encode()
+
+
+def Edit_Line(line):
+    '''
+    Returns an edited version of a line, or None if it is not edited.
+    '''
+    if 'chance="' in line or ' m="' in line:
+        return line.replace('"/>', '" edited="1"/>').replace(
+            '" t="1">', '" t="1" edited="1">')
+    return None
+
+
+def Missions_Text(file_binary):
+    xml_file = XML_File(file_binary, virtual_path = 'director/test.xml')
+    new_text = xml_file.Get_Text()
+    for line in xml_file.Get_Text().splitlines():
+        new_line = Edit_Line(line)
+        if new_line != None:
+            new_text = new_text.replace(line.strip(), new_line.strip())
+    xml_file.Update_From_Text(new_text)
+    return xml_file.Get_Binary()
+
+
+def Missions_Lines(file_binary):
+    xml_file = XML_File(file_binary, virtual_path = 'director/test.xml')
+    line_list = xml_file.Get_Lines()
+    for index, line in enumerate(line_list):
+        new_line = Edit_Line(line)
+        if new_line != None:
+            line_list[index] = new_line
+    xml_file.Update_From_Lines()
+    return xml_file.Get_Binary()
+
+
+def Universe_Text(file_binary, pass_count = 5):
+    xml_file = XML_File(file_binary, virtual_path = 'maps/test.xml')
+    for _ in range(pass_count):
+        line_list = xml_file.Get_Text().splitlines()
+        for index, line in enumerate(line_list):
+            new_line = Edit_Line(line)
+            if new_line != None:
+                line_list[index] = new_line
+        xml_file.Update_From_Text('\n'.join(line_list))
+    return xml_file.Get_Binary()
+
+
+def Universe_Lines(file_binary, pass_count = 5):
+    xml_file = XML_File(file_binary, virtual_path = 'maps/test.xml')
+    for _ in range(pass_count):
+        line_list = xml_file.Get_Lines()
+        for index, line in enumerate(line_list):
+            new_line = Edit_Line(line)
+            if new_line != None:
+                line_list[index] = new_line
+        xml_file.Update_From_Lines()
+    return xml_file.Get_Binary()
+
+
+def Make_Ware_Template_Binary(line_count):
+    '''
+    Returns a generated ware template file binary, with a factory
+    node per line.
+    '''
+    lines = [header, '<universe>', '<o t="1">']
+    for index in range(line_count):
+        lines.append('  <o t="6" s="SS_FAC_{0}"><o t="7" s="a{0}"/>'
+                     '<o t="7" s="b{0}"/><o t="7" s="c{0}"/></o>'.format(index))
+    lines += ['</o>', '</universe>']
+    return ('\r\n'.join(lines) + '\r\n').encode()
+
+
+# Transforms in the tree chain, as bools, True if editing the tree,
+#  else only reading it.
+tree_chain = [True, False, False, True, False, True, False, False]
+
+def Tree_Chain(file_binary, snapshot = True, share_copies = True):
+    xml_file = XML_File(file_binary, virtual_path = 'maps/test.xml')
+    for index, edits in enumerate(tree_chain):
+        # Snapshots are taken and closed as by the Transform_Wrapper.
+        if snapshot:
+            xml_file.Save_Snapshot(1)
+            if not share_copies:
+                xml_file._snapshot_copy_dict.clear()
+        xml_root = xml_file.Get_XML_Tree().getroot()
+        if edits:
+            xml_root[0][index].set('edited', '1')
+            xml_file.Update_From_XML_Node(xml_root)
+        else:
+            xml_root[0].findall('o')
+        if snapshot:
+            xml_file.Commit_Snapshot(1)
+    return xml_file.Get_Binary()
+
+
+def Run(line_count = 20000):
+    print('Files with {} lines:'.format(line_count))
+    for label, file_binary, text_function, lines_function in [
+            ('missions edit'      , Make_Missions_Binary(line_count),
+             Missions_Text, Missions_Lines),
+            ('universe, 5 passes' , Make_Universe_Binary(line_count),
+             Universe_Text, Universe_Lines),
+        ]:
+        # Both should give the same result, other than a trailing
+        #  newline added by Get_Binary to text missing one.
+        assert (text_function(file_binary).rstrip()
+                == lines_function(file_binary).rstrip())
+        text_time  = Bench_Shared.Time_Call(lambda: text_function(file_binary))
+        lines_time = Bench_Shared.Time_Call(lambda: lines_function(file_binary))
+        print('  {:<20} text {:7.1f} ms, lines {:6.1f} ms'.format(
+            label, text_time * 1000, lines_time * 1000))
+
+    file_binary = Make_Ware_Template_Binary(line_count // 4)
+    print('Tree chain of {} transforms, {} edits, {} elements:'.format(
+        len(tree_chain), tree_chain.count(True), line_count))
+    output_set = set()
+    for label, kwargs in [
+            ('no snapshots'    , {'snapshot' : False}),
+            ('copy per use'    , {'share_copies' : False}),
+            ('shared copies'   , {}),
+        ]:
+        output_set.add(bytes(Tree_Chain(file_binary, **kwargs)))
+        chain_time = Bench_Shared.Time_Call(
+            lambda: Tree_Chain(file_binary, **kwargs))
+        print('  {:<20} {:7.1f} ms'.format(label, chain_time * 1000))
+    assert len(output_set) == 1
+
+
+if __name__ == '__main__':
+    Run(*[int(x) for x in sys.argv[1:]])
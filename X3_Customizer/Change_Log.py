@@ -224,6 +224,84 @@ Change Log:
    - Added Max_Marines_Video_Id_Overwrite.
    - Tentatively added Set_LaserTower_Equipment and
      Make_Terran_Stations_Make_Terran_Marines.
+ * 3.14
+   - Sped up xor decoding and encoding of cat/dat files.
+   - Dat files are memory mapped once per run instead of being reopened
+     for every file read.
+   - Catalog contents are merged into a single index on first use, so
+     each file lookup no longer searches every catalog in turn.
+   - Parsed catalog contents are cached in the log folder, and reused
+     on later runs for catalogs that have not changed.
+   - Added Settings.eager_catalog_loading, which parses all catalogs at
+     startup across worker threads, along with hashing files from the
+     prior run. Catalog folders are also listed once instead of checking
+     for each catalog number.
+   - Catalog output is written to the dat file one entry at a time,
+     instead of being built up in memory, and both cat and dat are
+     written under temporary names before being moved into place.
+   - Catalog output is compressed across worker threads, with the
+     compression level and worker count adjustable in Settings.
+   - The catalog from a prior run is updated in place, copying over
+     unchanged entries instead of compressing them again.
+   - Unmodified files in the source folder are copied without being
+     held in memory, and packed files are passed through as-is.
+     Source folder files loaded by transforms but left unedited are
+     also copied this way, instead of being written from their
+     parsed contents.
+   - Bugfix for an unmodified packed source file being written
+     alongside the transformed version of the same file.
+   - Added File_Manager.File_Exists, and transforms now check for their
+     required files without loading them ahead of time.
+   - T file contents are stored in columns, roughly halving their
+     memory use.
+   - T files support indexed lookups on a field, used by Find and by
+     transforms that search for wares or ships by name.
+   - Bugfix for repeated Globals_File.Set_Field calls on a new field
+     adding duplicate lines.
+   - T file fields can be read and written as numbers through Get_Typed
+     and Set_Typed, which cache parsed values; whole number fields are
+     listed in File_Fields, and numbers set on them are truncated to
+     ints. Weapon transforms and Add_Ship_Variants use these.
+   - T files track edited lines, writing unedited lines from their
+     original text, and are only written out when actually edited.
+   - Added T_File.Scale_Fields for bulk scaling of fields by ship type or
+     other groupings, using numpy when available. The Adjust_Ship_Hull,
+     _Speed, _Laser_Recharge, _Pricing and _Shield_Regen transforms use it.
+   - Added Settings.fuse_row_transforms, which runs consecutive line edits
+     from transforms on the same t file in a single pass over the file.
+   - T file field names are resolved once per line length instead of
+     per entry, speeding up t file parsing by around a third.
+   - Added Settings.use_t_file_cache, which caches parsed t files in the
+     log folder for reuse on later runs while their source is unchanged.
+   - Xml files are decoded to text only when their text is first used,
+     and unmodified xml files keep their original binary.
+   - Bugfix for xml files declaring a non-utf-8 encoding failing to load
+     when holding special characters.
+   - Xml files keep their parsed element tree between transforms, only
+     regenerating their text when needed.
+   - Xml files support line based edits through Get_Lines and
+     Update_From_Lines. Adjust_Generic_Missions and Color_Sector_Names
+     use these, greatly speeding up Adjust_Generic_Missions.
+   - Language files in the t folder are loaded as Language_File, with
+     text lookups and edits by page and text id. Color_Sector_Names,
+     Adjust_Max_Seta on LU, and the Bounce wall file update in
+     Add_Ship_Variants use these, and no longer strip comments from the
+     Bounce file.
+   - Text changes from transforms are gathered into a single text
+     override file in the addon/t folder, numbered by the new
+     t_folder_file_number setting (default 9997), instead of rewriting
+     the source language files. Color_Sector_Names, Adjust_Max_Seta on
+     LU, and the Bounce wall file update in Add_Ship_Variants write to
+     this file.
+   - The universe map is loaded as Universe_File, with an index of
+     sectors by x,y coordinates built once and shared by the universe
+     transforms. Color_Sector_Names, Restore_Aldrin_rock,
+     Restore_Hub_Music and Restore_M148_Music read and edit sectors
+     through it.
+   - Obj patches in a group whose reference code starts with the same
+     bytes are searched for together in a single pass over the obj file.
+   - Bugfix for transforms that fail partway through editing an xml file
+     leaving their partial edits in place.
 '''
 # Note: changes moved here for organization, and to make them easier to
 # break out during documentation generation.
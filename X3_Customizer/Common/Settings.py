@@ -85,12 +85,56 @@ class Settings_class:
       - Bool, if True then the modified files will be written to a single
         cat/dat pair, incrementally numbered above existing catalogs.
       - Scripts will be kept as loose files.
-    '''
-    '''
-    -Removed attributes, for now.
-
+    * memory_map_catalogs
+      - Bool, if True then dat files will be memory mapped once when
+        first read and kept open until cleanup, instead of being
+        reopened for every file read from them.
+    * use_catalog_cache
+      - Bool, if True then parsed catalog contents will be cached to a
+        file in the log folder, and reused on later runs for catalogs
+        that have not changed.
+    * catalog_cache_file_name
+      - String, name of the catalog cache file in the log folder.
+    * eager_catalog_loading
+      - Bool, if True then all catalogs will be parsed during startup,
+        spread across worker threads, along with hashing of files from
+        a prior run; otherwise catalogs are parsed on the first file
+        lookup that needs them.
+      - May speed up startup on slow drives with many catalogs.
+    * parallel_workers
+      - Int, the number of worker threads to use for parallel file
+        handling, or None to match the cpu count.
+      - 1 disables the worker threads.
+    * compression_level
+      - Int, gzip compression level (0 to 9) used when packing files
+        into a catalog. Lower levels write faster but larger files.
+    * incremental_catalog_output
+      - Bool, if True then the catalog from a prior run will be kept
+        and updated in place, copying over any entries whose contents
+        did not change instead of packing them again.
+      - Only applies when the prior catalog is the highest numbered
+        catalog and was not modified externally.
+    * fuse_row_transforms
+      - Bool, if True then transforms which edit t file lines one at a
+        time will queue their edits, and consecutive queued edits to
+        a file are run together in a single pass over its lines when
+        the lines are next needed. Results match running each
+        transform in turn.
+      - Exceptions in queued edits are reported when the edits are run,
+        after their transform was reported as successful. In developer
+        mode, the first is reraised naming its transform.
+    * use_t_file_cache
+      - Bool, if True then parsed t files will be cached in a folder
+        under the log folder, and reused on later runs when the source
+        file contents and the known t file fields have not changed.
+      - Restoring a cached t file is only modestly quicker than parsing
+        it, and runs that record new entries are measurably slower (eg.
+        286 ms against 156 ms uncached when loading all t files); see
+        Benchmarks/Bench_T_File_Cache.py.
+    * t_file_cache_folder_name
+      - String, name of the t file cache folder in the log folder.
     * t_folder_file_number
-      - String, 4-digit number to give to any generated xml file holding
+      - String, 4-digit number to give to the generated xml file holding
         override text in the addon/t folder.
       - This should be set to avoid numbers in use by other mods, and
         higher than those mods that might be overridden.
@@ -116,19 +160,29 @@ class Settings_class:
         s.show_scaling_plots = False
         s.developer = False
         s.verbose = True
-        #s.t_folder_file_number = '9997'
         s.allow_path_error = False
         s.target_base_tc = False
         s.output_to_catalog = True
+        s.memory_map_catalogs = True
+        s.use_catalog_cache = True
+        s.catalog_cache_file_name = 'X3_Customizer_catalog_cache.json'
+        s.eager_catalog_loading = False
+        s.parallel_workers = None
+        s.compression_level = 9
+        s.incremental_catalog_output = True
+        s.fuse_row_transforms = False
+        s.use_t_file_cache = False
+        s.t_file_cache_folder_name = 'X3_Customizer_t_file_cache'
+        s.t_folder_file_number = '9997'
         
 
-    #def Get_Page_Text_File_Path(s):
-    #    '''
-    #    Returns the path to use for the custom page text file, to
-    #    be placed in the addon/t folder.
-    #    Path will be cat style, eg. '/t/9997-L044.xml'.
-    #    '''
-    #    return 't/' + s.t_folder_file_number + '-L044.xml'
+    def Get_Page_Text_File_Path(s):
+        '''
+        Returns the path to use for the custom page text file, to
+        be placed in the addon/t folder.
+        Path will be cat style, eg. 't/9997-L044.xml'.
+        '''
+        return 't/' + s.t_folder_file_number + '-L044.xml'
 
 
     def Set_Addon_Folder(s, path):
@@ -412,6 +466,30 @@ class Settings_class:
         return os.path.join(s.path_to_log_folder, s.log_file_name)
 
 
+    def Get_Parallel_Workers(s):
+        '''
+        Returns the number of worker threads to use for parallel file
+        handling, at least 1.
+        '''
+        if s.parallel_workers != None:
+            return max(1, s.parallel_workers)
+        return os.cpu_count() or 1
+
+
+    def Get_Catalog_Cache_File_Path(s):
+        '''
+        Returns the path to the catalog cache file, including file name.
+        '''
+        return os.path.join(s.path_to_log_folder, s.catalog_cache_file_name)
+
+
+    def Get_T_File_Cache_Folder_Path(s):
+        '''
+        Returns the path to the t file cache folder.
+        '''
+        return os.path.join(s.path_to_log_folder, s.t_file_cache_folder_name)
+
+
 # General settings object, to be referenced by any place so interested.
 Settings = Settings_class()
 
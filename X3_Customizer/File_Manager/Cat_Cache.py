@@ -0,0 +1,171 @@
+'''
+Support for caching parsed catalog contents across runs.
+
+Catalog files rarely change between runs, but decoding and parsing them
+takes a noticeable portion of startup on heavily modded installs.
+The entry list of each parsed cat is stored to a json file in the log
+folder, keyed by the cat path relative to the x3 folder.
+
+Each cached cat records its byte size, modification time, and a hash
+of its first bytes. If any of these no longer match, the cached entry
+is discarded and the cat is parsed again. A cache file that fails to
+load for any reason is ignored as a whole.
+'''
+import os
+import json
+import hashlib
+import threading
+from ..Common.Settings import Settings
+from .File_Paths import *
+
+# Number of bytes at the start of a cat file to hash when validating
+#  cached entries. Cats start with the dat name and then early file
+#  paths, so this catches most in-place edits that keep size and mtime.
+_header_hash_bytes = 4096
+
+# Version of the cache format; older caches are ignored.
+_cache_version = 1
+
+
+class Cat_Cache_class:
+    '''
+    Cache of parsed catalog entry lists.
+
+    Attributes:
+    * loaded
+      - Bool, True once a load from file has been attempted.
+    * modified
+      - Bool, True if entries were recorded that are not yet stored.
+    * cat_dict
+      - Dict, keyed by cat path relative to the x3 folder, holding a
+        dict with 'size', 'mtime', 'header_hash', and 'entries', the
+        latter being a list of [cat path, size in bytes] in dat order.
+    * cat_paths_used
+      - Set of relative cat paths looked up or recorded this run;
+        other entries are dropped when the cache is stored.
+    * load_lock
+      - Lock guarding the first load, since catalogs may be parsed
+        from multiple threads.
+    '''
+    def __init__(s):
+        s.loaded = False
+        s.modified = False
+        s.cat_dict = {}
+        s.cat_paths_used = set()
+        s.load_lock = threading.Lock()
+
+
+    def Load(s):
+        '''
+        Load the cache file, if present. Any problem reading it will
+        leave the cache empty.
+        '''
+        s.loaded = True
+        path = Settings.Get_Catalog_Cache_File_Path()
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r') as file:
+                cache_dict = json.load(file)
+            if cache_dict['version'] != _cache_version:
+                return
+            s.cat_dict = cache_dict['cat_dict']
+            assert isinstance(s.cat_dict, dict)
+        except Exception:
+            s.cat_dict = {}
+            if Settings.verbose:
+                print('Catalog cache at {} could not be read;'
+                      ' catalogs will be parsed fresh.'.format(path))
+
+
+    def Store(s):
+        '''
+        Store the cache to file, if anything changed, keeping only
+        the catalogs used on this run.
+        '''
+        if not s.modified:
+            return
+        cache_dict = {
+            'version' : _cache_version,
+            'cat_dict' : {
+                key : value for key, value in s.cat_dict.items()
+                if key in s.cat_paths_used
+                },
+            }
+        # Write to a temp file and swap it in, so that an interrupted
+        #  write does not leave a truncated cache.
+        path = Settings.Get_Catalog_Cache_File_Path()
+        temp_path = path + '.tmp'
+        try:
+            with open(temp_path, 'w') as file:
+                json.dump(cache_dict, file)
+            os.replace(temp_path, path)
+        finally:
+            # Clean out the temp file left over from an error.
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        s.modified = False
+
+
+    @staticmethod
+    def Get_Cat_Stats(cat_path):
+        '''
+        Returns a dict with the 'size', 'mtime', and 'header_hash' of
+        the cat file at the given sys path.
+        '''
+        stat = os.stat(cat_path)
+        with open(cat_path, 'rb') as file:
+            header = file.read(_header_hash_bytes)
+        return {
+            'size'        : stat.st_size,
+            'mtime'       : stat.st_mtime_ns,
+            'header_hash' : hashlib.sha256(header).hexdigest(),
+            }
+
+
+    def Get(s, cat_path):
+        '''
+        Returns the cached list of (cat path, size) tuples for the cat at
+        the given sys path, or None if not cached or out of date.
+        '''
+        if not Settings.use_catalog_cache:
+            return None
+        with s.load_lock:
+            if not s.loaded:
+                s.Load()
+
+        key = System_Path_to_Relative_Path(cat_path)
+        s.cat_paths_used.add(key)
+        if key not in s.cat_dict:
+            return None
+
+        try:
+            cached = s.cat_dict[key]
+            stats = s.Get_Cat_Stats(cat_path)
+            if any(cached[field] != value for field, value in stats.items()):
+                raise Exception()
+            return [(path, int(size)) for path, size in cached['entries']]
+        except Exception:
+            # Drop the stale or damaged entry.
+            del(s.cat_dict[key])
+            s.modified = True
+            return None
+
+
+    def Record(s, cat_path, entry_list):
+        '''
+        Record the parsed list of (cat path, size) tuples for the cat at
+        the given sys path.
+        '''
+        if not Settings.use_catalog_cache:
+            return
+        key = System_Path_to_Relative_Path(cat_path)
+        cached = s.Get_Cat_Stats(cat_path)
+        cached['entries'] = [list(x) for x in entry_list]
+        s.cat_dict[key] = cached
+        s.cat_paths_used.add(key)
+        s.modified = True
+
+
+# Single, global copy of the cache.
+Cat_Cache = Cat_Cache_class()
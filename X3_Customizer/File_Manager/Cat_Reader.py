@@ -20,10 +20,35 @@ is not captured by the cat/dat setup.
 
 Note: the data has an extra layer of encoding by xoring with 0x33.
 
+Dat files may be memory mapped (see Settings.memory_map_catalogs), in
+which case each dat is mapped once on its first read and kept open
+until Close is called, which File_Manager.Cleanup handles for all
+catalogs read during the run.
+
 '''
 from ..Common.Settings import Settings
 import os
+import mmap
+from collections import namedtuple
 from .File_Paths import *
+from . import Xor_Codec
+from .Cat_Cache import Cat_Cache
+
+# Location of a single file within a catalog, as recorded in the
+#  merged catalog index built by the Source_Reader.
+# * cat_reader
+#   - The Cat_Reader holding the file.
+# * cat_path
+#   - String, the path of the file within the catalog, maybe packed.
+# * offset, size
+#   - Ints, the byte range of the file in the dat.
+# * packed
+#   - Bool, True if the file is a packed (gzipped) version.
+# * priority
+#   - Int, the priority rank of the catalog, 0 being highest.
+Cat_Entry = namedtuple('Cat_Entry', 
+    ['cat_reader', 'cat_path', 'offset', 'size', 'packed', 'priority'])
+
 
 class Cat_Reader:
     '''
@@ -46,26 +71,24 @@ class Cat_Reader:
       - Dict, keyed by file cat path with name, containing the integer
         offset into the dat file where the contents begin.
       - This is summed from prior entries in the file_size_dict.
+    * dat_file
+      - File object for the open dat file, when memory mapped.
+      - None until the first read in memory mapped mode.
+    * dat_map
+      - mmap object covering the full dat file, when memory mapped.
+      - None until the first read, or if the dat file is empty.
     '''
     def __init__(s, cat_path = None):
         s.cat_path = cat_path
         s.file_size_dict = {}
         s.file_offset_dict = {}
+        s.dat_file = None
+        s.dat_map = None
                 
-        # Read the cat binary data. Error if not found.
+        # Error if the cat is not found.
         if not os.path.exists(s.cat_path):
-            raise Exception('Error: failed to find cat file at {}'.format(path))
-        with open(s.cat_path, 'rb') as file:
-            binary = file.read()
-            
-        # Convert back to a long string, and split the lines.
-        # Also, pick off the first line for the dat file name.
-        dat_name, *decoded_lines = s.Decode_Cat(binary).splitlines()
-        # Set the dat path, sharing the cat folder.
-        folder, _ = os.path.split(s.cat_path)
-        s.dat_path = os.path.join(folder, dat_name)
-        # Verify the dat_path has the .dat extension, as expected.
-        assert s.dat_path.endswith('.dat')
+            raise Exception('Error: failed to find cat file at {}'.format(
+                s.cat_path))
 
         # Note: addon/04.cat was observed to point to 'foo.dat', which
         #  implies the game will just look for a dat file named the same
@@ -74,17 +97,17 @@ class Cat_Reader:
         # TODO: maybe toss a warning, but probably nobody cares.
         s.dat_path = s.cat_path.replace('.cat','.dat')
 
-        # Loop over the lines.
+        # Try to get the parsed entries from the cache of a prior run,
+        #  else parse the cat and cache its entries.
+        entry_list = Cat_Cache.Get(s.cat_path)
+        if entry_list == None:
+            entry_list = s.Parse_Cat()
+            Cat_Cache.Record(s.cat_path, entry_list)
+
+        # Loop over the entries.
         # Also track a running offset for packed file start locations.
         start_offset = 0
-        for line in decoded_lines:
-
-            # Get the packed file's name and size.
-            # Note: the file name may include spaces, and the name is
-            #  separated from the size by a space, so this will need
-            #  to only split on the last space.
-            cat_path, size_str = line.rsplit(' ', 1)
-            size_bytes = int(size_str)
+        for cat_path, size_bytes in entry_list:
 
             # Record its size and start offset.
             s.file_size_dict[cat_path] = size_bytes
@@ -96,24 +119,42 @@ class Cat_Reader:
         return
 
 
+    def Parse_Cat(s):
+        '''
+        Read and decode the cat file.
+        Returns a list of (cat path, size in bytes) tuples for the files
+        it holds, in dat order.
+        '''
+        with open(s.cat_path, 'rb') as file:
+            binary = file.read()
+            
+        # Convert back to a long string, and split the lines.
+        # Also, pick off the first line for the dat file name.
+        dat_name, *decoded_lines = s.Decode_Cat(binary).splitlines()
+        # Verify the dat name has the .dat extension, as expected.
+        # (The name itself is otherwise ignored; see above.)
+        assert dat_name.endswith('.dat')
+
+        entry_list = []
+        for line in decoded_lines:
+
+            # Get the packed file's name and size.
+            # Note: the file name may include spaces, and the name is
+            #  separated from the size by a space, so this will need
+            #  to only split on the last space.
+            cat_path, size_str = line.rsplit(' ', 1)
+            entry_list.append((cat_path, int(size_str)))
+
+        return entry_list
+
+
     @staticmethod
     def Decode_Cat(binary):
         '''
         Decode the cat binary into text.
         Returns a raw text string.
         '''
-        # Remove the encoding and convert to characters, using a simple
-        #  loop to make the logic easy to read.
-        xor_value = 0xDB
-        decoded_bytes = []
-        for byte in binary:
-            # Apply the xor and convert to a character.
-            char = chr(byte ^ xor_value)
-            # Store it.
-            decoded_bytes.append(char)
-            # Advance the xor_value, keeping to the byte range.
-            xor_value = (xor_value + 1) % 256
-        return ''.join(decoded_bytes)
+        return Xor_Codec.Decode_Cat(binary)
 
         
     def Read(s, cat_path, error_if_not_found = False):
@@ -133,13 +174,18 @@ class Cat_Reader:
         if cat_path not in s.file_size_dict:
             if error_if_not_found:
                 raise Exception('File {} not found in cat {}'.format(
-                    virtual_path, s.cat_name
+                    cat_path, s.cat_path
                     ))
             return None
 
-        # For now, open the dat file on every call and close it
-        #  afterwards.  Could also consider leaving this open
-        #  across calls, if many reads are expected, for a speedup.
+        # When memory mapping, decode directly out of the mapped range,
+        #  which avoids reopening the file and making an extra copy.
+        if Settings.memory_map_catalogs:
+            with s.Read_View(cat_path) as view:
+                return Xor_Codec.Decode_Dat(view)
+
+        # Otherwise, open the dat file on every call and close it
+        #  afterwards.
         with open(s.dat_path, 'rb') as file:
             # Move to the file start location.
             file.seek(s.file_offset_dict[cat_path])
@@ -148,22 +194,50 @@ class Cat_Reader:
 
         # The data was encoded by xoring with 0x33, so apply this operation
         #  to every byte to decode.
-        # Note: this method seems somewhat slow to run.
-        # Use bytearray for this, since it can be useful elsewhere for
+        # This returns a bytearray, since it can be useful elsewhere for
         #  mutability (mainly obj code).
-        data = bytearray(x ^ 0x33 for x in data)
-
-        # Numpy might be faster, but want to avoid non-standard packages.
-        # Alternative: bytes objects are immutable like strings, so the
-        #  constructor above might be running into issues making excessive
-        #  copies; a bytearray might work better.
-        #data = bytearray(data)
-        #for index, byte in enumerate(data):
-        #    data[index] = byte ^ 0x33
-        # Result: this only seems maybe 10-20% faster, if that; it might
-        #  be fine when not using a debugger.
-        # Keep the simple code version for now; complexity is not worth
-        #  such a small gain.
+        data = Xor_Codec.Decode_Dat(data)
 
         return data
 
+
+    def Read_View(s, cat_path):
+        '''
+        Returns a memoryview over the still encoded bytes of an entry,
+        using a memory map of the dat file that is opened on the first
+        call and kept open afterwards.
+        The view should be released (eg. used in a 'with' block) before
+        Close is called, else the map cannot be closed.
+
+        * cat_path
+          - String, path of the file to look up in cat format.
+          - Should be present in this cat.
+        '''
+        # Map the dat on first use.
+        if s.dat_file == None:
+            s.dat_file = open(s.dat_path, 'rb')
+            # Empty dat files (eg. dummy catalogs) cannot be mapped,
+            #  but also have no entries with content.
+            if os.path.getsize(s.dat_path) > 0:
+                s.dat_map = mmap.mmap(
+                    s.dat_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        start = s.file_offset_dict[cat_path]
+        end   = start + s.file_size_dict[cat_path]
+        # Zero size entries may not have a map to slice.
+        if start == end:
+            return memoryview(b'')
+        return memoryview(s.dat_map)[start : end]
+
+
+    def Close(s):
+        '''
+        Close any memory map and file handle held on the dat file.
+        Safe to call multiple times; a later read will reopen the dat.
+        '''
+        if s.dat_map != None:
+            s.dat_map.close()
+            s.dat_map = None
+        if s.dat_file != None:
+            s.dat_file.close()
+            s.dat_file = None
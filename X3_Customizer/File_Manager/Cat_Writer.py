@@ -15,7 +15,27 @@ import os
 from pathlib import Path
 from .File_Paths import *
 from . import File_Types
+from . import Xor_Codec
+from .Cat_Reader import Cat_Reader
 import gzip
+import io
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def Gzip_Compress(binary):
+    '''
+    Returns the gzipped version of the given binary, using the
+    compression level from the Settings.
+    The gzip header timestamp is left at 0, so that the same binary
+    always compresses to the same bytes.
+    '''
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj = buffer, mode = 'wb', mtime = 0,
+                       compresslevel = Settings.compression_level) as file:
+        file.write(binary)
+    return buffer.getvalue()
 
 
 class Cat_Writer:
@@ -31,16 +51,44 @@ class Cat_Writer:
       - Set automatically to match the cat_path index.
     * game_files
       - List of Game_File objects to be written.
+    * entry_hash_dict
+      - Dict, keyed by cat path of each written entry, holding a hash
+        of the file contents before packing.
+      - Filled in during Write, to be logged for reuse on a later run.
+    * prior_cat_reader
+      - Cat_Reader for a catalog written on a prior run, from which
+        unchanged entries may be copied, or None.
+    * prior_entry_hash_dict
+      - Dict, as entry_hash_dict but for the prior catalog.
     '''
     def __init__(self, cat_path):
         # Ensure this is a Path.
         self.cat_path = Path(cat_path)
         self.dat_path = self.cat_path.with_suffix('.dat')
         self.game_files = []
+        self.entry_hash_dict = {}
+        self.prior_cat_reader = None
+        self.prior_entry_hash_dict = {}
 
         return
 
 
+    def Set_Prior_Catalog(self, cat_path, entry_hash_dict):
+        '''
+        Set a catalog from a prior run to copy unchanged entries from.
+        Entries are copied as their still packed and encoded bytes, so
+        this skips compression and encoding for them.
+
+        * cat_path
+          - String, path to the prior cat file.
+        * entry_hash_dict
+          - Dict, keyed by the prior catalog's entry cat paths, holding
+            the content hashes logged when it was written.
+        '''
+        self.prior_cat_reader = Cat_Reader(cat_path)
+        self.prior_entry_hash_dict = entry_hash_dict
+
+
     def Add_File(self, game_file):
         '''
         Add a Game_File to be recorded into the catalog.
@@ -53,76 +101,164 @@ class Cat_Writer:
         '''
         Write the contents to a cat/dat file pair.
         Any existing files will be overwritten.
+
+        Entries are encoded and written to the dat one at a time, so only
+        the cat lines are held for the whole catalog. Both files are
+        first written under temporary names and then renamed into place,
+        so a failed write will not leave a partial catalog.
         '''
         # Cat contents will be kept as a list of strings.
-        # Dat contents will be running binary.
-        # First pass gets raw (maybe zipped) binary; second pass will encode.
         cat_lines = []
-        dat_binary = bytearray()
 
         # The first cat line is the name of the dat file, no path.
         cat_lines.append(self.dat_path.name)
 
-        # Collect info from the files.
-        # Note: this may generate nothing if no game files were added,
-        #  eg. when making dummy catalogs.
-        for game_file in self.game_files:
+        dat_path_temp = self.Get_Temp_Path(self.dat_path)
+        cat_path_temp = self.Get_Temp_Path(self.cat_path)
+        try:
+            with open(dat_path_temp, 'wb') as file:
 
-            # Get the binary data; any text should be utf-8.
-            this_binary = game_file.Get_Binary()
+                # Collect info from the files.
+                # Note: this may generate nothing if no game files were
+                #  added, eg. when making dummy catalogs.
+                for cat_path, content_hash, this_binary in self.Get_Packed_Entries():
 
-            # Get the cat path for the file.
-            cat_path = Virtual_Path_to_Cat_Path(game_file.virtual_path)
+                    if this_binary == None:
+                        # Copy the unchanged entry from the prior catalog;
+                        #  it is already encoded.
+                        with self.prior_cat_reader.Read_View(cat_path) as view:
+                            file.write(view)
+                            byte_count = len(view)
+                    else:
+                        # Do the Xor encoding pass, and write it out.
+                        file.write(self.Encode_Dat(this_binary))
+                        byte_count = len(this_binary)
 
-            # Get any possible compressed version of this path.
-            # This is None if packing not supported.
-            cat_path_pck = Unpacked_Path_to_Packed_Path(cat_path)
+                    # Add the cat path and the byte size of the file to
+                    #  the cat.
+                    cat_lines.append(cat_path +' '+ str(byte_count))
+                    self.entry_hash_dict[cat_path] = content_hash
 
-            # If packing, gzip the binary.
-            if cat_path_pck:
-                this_binary = gzip.compress(this_binary)
-                # Use the pck name in the catalog.
-                cat_path = cat_path_pck
-                
-            # Append to the existing dat binary.
-            dat_binary += this_binary
+                self.Sync_File(file)
 
-            # Add the virtual path and the byte size of the file to the cat.
-            cat_lines.append(cat_path +' '+ str(len(this_binary)))
+            # Release the prior catalog, which may be getting replaced.
+            if self.prior_cat_reader != None:
+                self.prior_cat_reader.Close()
 
-        # The cat needs to end in a newline.
-        cat_lines.append('')
+            # The cat needs to end in a newline.
+            cat_lines.append('')
 
-        # Convert the cat to utf-8 binary.
-        cat_str = '\n'.join(cat_lines)
-        cat_binary = bytes(cat_str, encoding = 'utf-8')
+            # Convert the cat to utf-8 binary, and encode it.
+            cat_str = '\n'.join(cat_lines)
+            cat_binary = bytes(cat_str, encoding = 'utf-8')
+            cat_binary = self.Encode_Cat(cat_binary)
 
-        # Do the Xor encoding passes.
-        cat_binary = self.Encode_Cat(cat_binary)
-        dat_binary = self.Encode_Dat(dat_binary)
+            with open(cat_path_temp, 'wb') as file:
+                file.write(cat_binary)
+                self.Sync_File(file)
 
-        # Write the data out.
-        with open(self.cat_path, 'wb') as file:
-            file.write(cat_binary)
-        with open(self.dat_path, 'wb') as file:
-            file.write(dat_binary)
+            # Move the files into place, dat first, so that the cat never
+            #  refers to a missing or partial dat.
+            os.replace(dat_path_temp, self.dat_path)
+            os.replace(cat_path_temp, self.cat_path)
+
+        finally:
+            # Clean out any temp files left over from an error.
+            for path in [dat_path_temp, cat_path_temp]:
+                if path.exists():
+                    path.unlink()
 
         return
 
 
+    def Get_Packed_Entries(self):
+        '''
+        Generator which yields the (cat path, content hash, binary)
+        packed entries for all game files, in the order they were added.
+        See Get_Packed_Entry.
+
+        Packing is spread across worker threads (zlib releases the GIL
+        while compressing). Only a limited number of entries are worked
+        on ahead of the one being yielded, to keep memory bounded.
+        '''
+        workers = Settings.Get_Parallel_Workers()
+        if workers <= 1 or len(self.game_files) <= 1:
+            yield from map(self.Get_Packed_Entry, self.game_files)
+            return
+
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            # Futures in submission order.
+            pending_futures = deque()
+            for game_file in self.game_files:
+                pending_futures.append(
+                    executor.submit(self.Get_Packed_Entry, game_file))
+                # Once enough are in flight, hand back the oldest.
+                if len(pending_futures) >= 2 * workers:
+                    yield pending_futures.popleft().result()
+            while pending_futures:
+                yield pending_futures.popleft().result()
+
+
+    def Get_Packed_Entry(self, game_file):
+        '''
+        Returns a tuple of (cat path, content hash, binary) for a
+        Game_File, as it should be recorded in a catalog. Files with a
+        packed form will be gzipped, and given the packed cat path.
+        If the prior catalog holds the same contents for this entry,
+        binary is None, and the prior entry should be copied.
+        '''
+        # Get the binary data; any text should be utf-8.
+        this_binary = game_file.Get_Binary()
+        content_hash = hashlib.sha256(this_binary).hexdigest()
+
+        # Get the cat path for the file.
+        cat_path = Virtual_Path_to_Cat_Path(game_file.virtual_path)
+
+        # Get any possible compressed version of this path.
+        # This is None if packing not supported.
+        cat_path_pck = Unpacked_Path_to_Packed_Path(cat_path)
+
+        # Use the pck name in the catalog, if packing.
+        if cat_path_pck:
+            cat_path = cat_path_pck
+
+        # Check for an unchanged prior entry.
+        if (self.prior_cat_reader != None
+        and cat_path in self.prior_cat_reader.file_size_dict
+        and self.prior_entry_hash_dict.get(cat_path) == content_hash):
+            return cat_path, content_hash, None
+
+        # If packing, gzip the binary.
+        if cat_path_pck:
+            this_binary = Gzip_Compress(this_binary)
+
+        return cat_path, content_hash, this_binary
+
+
+    @staticmethod
+    def Get_Temp_Path(path):
+        '''
+        Returns the temporary Path to write to before renaming a file
+        into place at the given Path.
+        '''
+        return path.with_name(path.name + '.tmp')
+
+
+    @staticmethod
+    def Sync_File(file):
+        '''
+        Flush an open file and force its contents to disk.
+        '''
+        file.flush()
+        os.fsync(file.fileno())
+
+
     @staticmethod
     def Encode_Cat(binary):
         '''
         Encode the cat binary using a running Xor.
         '''
-        xor_value = 0xDB
-        encoded_bytes = bytearray()
-        for byte in binary:
-            # Apply the xor and store it.
-            encoded_bytes.append(byte ^ xor_value)
-            # Advance the xor_value, keeping to the byte range.
-            xor_value = (xor_value + 1) % 256
-        return encoded_bytes
+        return Xor_Codec.Encode_Cat(binary)
     
 
     @staticmethod
@@ -130,9 +266,7 @@ class Cat_Writer:
         '''
         Encode the dat binary using an Xor.
         '''
-        encoded_bytes = bytearray()
-        encoded_bytes = bytearray(x ^ 0x33 for x in binary)
-        return encoded_bytes
+        return Xor_Codec.Encode_Dat(binary)
 
     #-Older, x2? style encoding used in loose pck files.
     #@staticmethod
@@ -561,8 +561,158 @@ for tc_line_number, field in T_file_name_field_dict_dict['Jobs.txt'].items():
         #  on tc reaching 105, an offset of 2 is applied.
         [1 for x in [70,105,123,128] if tc_line_number >= x])
     T_file_name_field_dict_dict['Jobs.txt.ap'][ap_line_number] = field
-    
 
+
+# Compiled line keys, keyed by (field dict name, entry count), and holding
+#  a tuple of (key tuple, is data line flag).
+# These are filled in as new line lengths are seen when parsing.
+_line_keys_dict = {}
+
+def Get_T_File_Line_Keys(field_dict_name, entry_count):
+    '''
+    Returns a tuple of (keys, is_data_line) for a T file line of the
+    given entry count, using the fields of the given name in
+    T_file_name_field_dict_dict.
+    The keys are a tuple of field names by entry position, using the
+    position index for unnamed entries. Data lines are those with at
+    least the min_data_entries of the fields; other lines (headers)
+    are keyed by position only.
+    Results are cached, so this is cheap to call per line.
+    '''
+    dict_key = (field_dict_name, entry_count)
+    if dict_key in _line_keys_dict:
+        return _line_keys_dict[dict_key]
+
+    field_dict = T_file_name_field_dict_dict[field_dict_name]
+    is_data_line = entry_count >= field_dict['min_data_entries']
+    key_list = []
+    for index in range(entry_count):
+        # If this index has a field name, use it, otherwise use
+        #  the index for a key.
+        this_key = index
+        # Only do the named key check when the line is considered
+        #  a data line; don't do this for headers/comments.
+        if is_data_line:
+            if index in field_dict:
+                this_key = field_dict[index]
+            # Also check negative indices.
+            negative_index = index - entry_count
+            if negative_index in field_dict:
+                this_key = field_dict[negative_index]
+                # Error if both matched; something went wrong in that
+                #  case.
+                assert index not in field_dict
+        key_list.append(this_key)
+
+    _line_keys_dict[dict_key] = (tuple(key_list), is_data_line)
+    return _line_keys_dict[dict_key]
+
+
+
+
+# Types of numeric fields, used when numbers are set on T file fields
+#  (eg. through T_Row.Set_Typed), so that eg. a scaled float is stored
+#  as int() would truncate it.
+# This dict will be keyed by a T file name, with an inner dict keyed by
+#  field name and holding the type to convert set numbers to.
+# Only fields known to always hold whole numbers are listed. Float fields
+#  are left out, since they may also be written as whole numbers (eg. a
+#  weapon_recharge_factor of '1'), which should stay ints when read and
+#  set back.
+# Fields read as numbers are always parsed as int if possible, else float.
+# Note: scene fields may be strings or ints, and are left out.
+# Fields shared by all ware files.
+_ware_field_type_dict = {
+    'model_file'            : int,
+    'picture_id'            : int,
+    'name_id'               : int,
+    'volume'                : int,
+    'relative_value_npc'    : int,
+    'price_modifier_1'      : int,
+    'price_modifier_2'      : int,
+    'cargo_size'            : int,
+    'relative_value_player' : int,
+    'minimum_notoriety'     : int,
+    'video_id'              : int,
+    'skin_index'            : int,
+    }
+T_file_name_field_type_dict_dict = {
+    'TBullets.txt' : {
+        'shield_damage'     : int,
+        'energy_used'       : int,
+        'lifetime'          : int,
+        'speed'             : int,
+        'flags'             : int,
+        'hull_damage'       : int,
+        'fragment_bullet'   : int,
+        'shield_damage_oos' : int,
+        'hull_damage_oos'   : int,
+        'ammo_type'         : int,
+        },
+    'TFactories.txt' : dict(_ware_field_type_dict, **{
+        'race'              : int,
+        'factory_size'      : int,
+        }),
+    'TLaser.txt' : dict(_ware_field_type_dict, **{
+        'fire_delay'        : int,
+        'bullet'            : int,
+        'max_energy'        : int,
+        }),
+    'TMissiles.txt' : dict(_ware_field_type_dict, **{
+        'speed'             : int,
+        'acceleration'      : int,
+        'damage'            : int,
+        'blast_radius'      : int,
+        'lifetime'          : int,
+        'flags'             : int,
+        'fire_delay'        : int,
+        }),
+    'TShips.txt' : dict(_ware_field_type_dict, **{
+        'speed'             : int,
+        'acceleration'      : int,
+        'shield_power'      : int,
+        'weapon_energy'     : int,
+        'shield_type'       : int,
+        'max_shields'       : int,
+        'speed_tunings'     : int,
+        'rudder_tunings'    : int,
+        'cargo_min'         : int,
+        'cargo_max'         : int,
+        'ware_list'         : int,
+        'race'              : int,
+        'hull_strength'     : int,
+        'variation_index'   : int,
+        }),
+    'TShields.txt' : dict(_ware_field_type_dict, **{
+        'power_drain'       : int,
+        'capacity'          : int,
+        }),
+    'TWare_.txt' : _ware_field_type_dict,
+    'TBackgrounds.txt' : {
+        'fog_density'       : int,
+        'fadeout_start'     : int,
+        'fadeout_end'       : int,
+        'num_particles'     : int,
+        },
+    'WareLists.txt' : {
+        'ware_count'        : int,
+        },
+    # Applies to both the TC and AP forms of the jobs file.
+    'Jobs.txt' : {
+        'id'                : int,
+        },
+    }
+
+# Fill in the TWare file entries.
+for tware_name in [
+    'TWareB.txt',
+    'TWareE.txt',
+    'TWareF.txt',
+    'TWareM.txt',
+    'TWareN.txt',
+    'TWareT.txt',
+    ]:
+    T_file_name_field_type_dict_dict[tware_name] = _ware_field_type_dict
     
 # Table capturing all known global names and their defaults.
 # Names taken from the x3:ap executable version 3.3.
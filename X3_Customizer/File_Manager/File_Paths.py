@@ -230,6 +230,14 @@ def Unpacked_Path_to_Packed_Path(path):
     return path.rsplit('.',1)[0] + packed_extension
 
 
+def Is_Packed_Path(path):
+    '''
+    Returns True if the given path, of any path type, has a packed
+     extension (pck, pbd, pbb).
+    '''
+    return path.rsplit('.',1)[-1] in ['pck','pbd','pbb']
+
+
 def Get_Backed_Up_Sys_Path(sys_path):
     '''
     Returns the path for a backed up version of a file specified
@@ -13,11 +13,16 @@ Note on newline encoding:
     be system dependent.
 '''
 import os
+import re
+import shutil
+import itertools
+import copy
 from .. import Common
 Settings = Common.Settings
 from collections import OrderedDict, defaultdict
 from . import File_Fields
 from .File_Paths import *
+from .T_Table import T_Table
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 
@@ -46,7 +51,8 @@ class Game_File:
       - Bool, if True then this file should be treated as modified,
         to be written out.
       - Files only read should leave this flag False.
-      - Pending development; defaults True for now.
+      - Defaults True; file types which track their own edits (eg. xml
+        and t files) start False and set this when edited.
     '''
     def __init__(
             s,
@@ -83,26 +89,69 @@ class Game_File:
 class XML_File(Game_File):
     '''
     Simple XML file contents holder with encoding and text.
+    Text is decoded from the original binary when first requested.
+
+    Once an ElementTree is requested, it is kept as the model for the
+    file contents, and is shared by all transforms editing the file
+    through Get_XML_Tree and Update_From_XML_Node. Text is then only
+    regenerated from the tree when next requested (eg. at output).
+    Text updates through Update_From_Text will discard the tree.
+
+    Similarly, a list of the text lines may be requested with Get_Lines,
+    and edited in place by index for line based edits, followed by
+    Update_From_Lines. The lines are joined back into text only when
+    the text is next requested.
+
+    Since the tree and lines are edited in place, a snapshot of the
+    contents may be saved for each transform using the file, to be
+    restored if that transform fails partway through its edits.
+    Snapshots only copy the tree or lines when they are next handed
+    out for editing, and only if there is no matching text to restore
+    from instead. A copy is reused by later snapshots until the
+    contents are next updated, so only transforms following an edit
+    pay for a new copy.
 
     Attributes:
-    * text
-      - Raw text for this file.
+    * binary
+      - Original binary contents for this file. Unmodified files are
+        written out from this directly.
+    * _text
+      - Raw text for this file, or None if not yet decoded or if out
+        of date with an edited _xml_tree.
+    * _xml_tree
+      - ElementTree parsed from the text, or None if not yet parsed.
+    * _xml_header
+      - String, the first line of the text (normally the xml
+        declaration), which is kept when regenerating text from the
+        tree.
+    * _line_list
+      - List of strings, the lines of the text without newlines, or
+        None if not yet split.
+    * _snapshot_list
+      - List of dicts, the saved contents to restore for each nested
+        transform using this file, innermost last, keyed by the
+        attribute names along with the transform 'level'.
+    * _snapshot_copy_dict
+      - Dict, keyed by attribute name ('_xml_tree' or '_line_list'),
+        holding the copy given to snapshots of that object, while it
+        still matches the current contents.
     * encoding
       - String indicating the encoding type of the xml.
     '''
     def __init__(s, file_binary, **kwargs):
         super().__init__(**kwargs)
-        
+        s.binary = file_binary
         # Get the encoding to use, since xml files are sensitive to this.
         s.encoding = s.Find_Encoding(file_binary)
-        # Translate to text with this encoding.
-        # Note: when using 'open()' to read a file, python will convert
-        #  line endings to \n even if they were \r\n. Python strings also
-        #  use a bare \n, so doing string searches on file contents
-        #  requires the file be normalized to \n. When using bytes.decode,
-        #  it does not do newline conversion, so that is done explicitly
-        #  here.
-        s._text = file_binary.decode(s.encoding).replace('\r\n','\n')
+        # Defer translating to text until needed, since some files are
+        #  large (eg. language files) and may only be checked for
+        #  existence.
+        s._text = None
+        s._xml_tree = None
+        s._xml_header = None
+        s._line_list = None
+        s._snapshot_list = []
+        s._snapshot_copy_dict = {}
 
         # -Removed; use text instead of xml.
         ## Parse the xml.
@@ -125,6 +174,26 @@ class XML_File(Game_File):
         '''
         Returns the text for this xml file.
         '''
+        # If the tree was edited, regenerate the text from it.
+        if s._text == None and s._xml_tree != None:
+            s._text = (s._xml_header + '\n' 
+                       + ET.tostring(s._xml_tree.getroot(), 
+                                     encoding = 'unicode'))
+            assert s._text.count('<?xml') == 1
+
+        # If the lines were edited, join them back together.
+        if s._text == None and s._line_list != None:
+            s._text = '\n'.join(s._line_list)
+
+        if s._text == None:
+            # Translate to text with this encoding.
+            # Note: when using 'open()' to read a file, python will convert
+            #  line endings to \n even if they were \r\n. Python strings also
+            #  use a bare \n, so doing string searches on file contents
+            #  requires the file be normalized to \n. When using bytes.decode,
+            #  it does not do newline conversion, so that is done explicitly
+            #  here.
+            s._text = s.binary.decode(s.encoding).replace('\r\n','\n')
         return s._text
 
 
@@ -135,32 +204,166 @@ class XML_File(Game_File):
         '''
         s.modified = True
         s._text = new_text
+        # Any parsed tree or lines are now out of date.
+        s._xml_tree = None
+        s._line_list = None
+        s._snapshot_copy_dict.clear()
+
+
+    def Get_Lines(s):
+        '''
+        Return the list of lines of the text for this file, without
+        newlines, splitting the current text if needed.
+        The list is shared by all callers; edits to it should be followed
+        by Update_From_Lines.
+        '''
+        if s._line_list == None:
+            # Split on newlines directly, so that joining them back
+            #  gives the same text.
+            s._line_list = s.Get_Text().split('\n')
+        s._Separate_Snapshots('_line_list', list)
+        return s._line_list
+
+
+    def Update_From_Lines(s, line_list = None):
+        '''
+        Update the current contents from the edited list of lines from
+        Get_Lines, or from a new line_list if given.
+        The text will be regenerated from the lines when next requested.
+        '''
+        if line_list != None:
+            s._line_list = line_list
+        assert s._line_list != None
+        s.modified = True
+        s._text = None
+        # Any parsed tree is now out of date.
+        s._xml_tree = None
+        s._snapshot_copy_dict.clear()
 
 
     def Get_XML_Tree(s):
         '''
-        Return an ElementTree after parsing the current text
-        as xml.
+        Return the ElementTree for this file, parsing the current text
+        as xml if needed.
+        The tree is shared by all callers; edits to it should be followed
+        by Update_From_XML_Node.
         '''        
-        node = ET.fromstring(s._text)
-        if not isinstance(node, ET.ElementTree):
-            node = ET.ElementTree(node)
-        return node
+        if s._xml_tree == None:
+            text = s.Get_Text()
+            node = ET.fromstring(text)
+            if not isinstance(node, ET.ElementTree):
+                node = ET.ElementTree(node)
+            s._xml_tree = node
+            s._xml_header = text.splitlines()[0]
+        s._Separate_Snapshots('_xml_tree', copy.deepcopy)
+        return s._xml_tree
 
 
     def Update_From_XML_Node(s, element_root):
         '''
-        Update the current text from an xml node, either
-         Element or ElementTree.
-        First line will be left unchanged.
+        Update the current contents from an xml node, either
+         Element or ElementTree, normally the edited tree from
+         Get_XML_Tree.
+        The text will be regenerated from the node when next requested,
+         with the first line left unchanged.
         '''
         # Normalize to be the root Element.
         if isinstance(element_root, ET.ElementTree):
             element_root = element_root.getroot()
+        # If this node is not the current tree, it replaces it.
+        if s._xml_tree == None or s._xml_tree.getroot() is not element_root:
+            if s._xml_tree == None:
+                s._xml_header = s.Get_Text().splitlines()[0]
+            s._xml_tree = ET.ElementTree(element_root)
         s.modified = True
-        s._text = (s._text.splitlines()[0] + '\n' 
-                   + ET.tostring(element_root, encoding = 'unicode'))
-        assert s._text.count('<?xml') == 1
+        s._text = None
+        # Any split lines are now out of date.
+        s._line_list = None
+        s._snapshot_copy_dict.clear()
+
+
+    def Save_Snapshot(s, level):
+        '''
+        Save the current contents, to be restored with Restore_Snapshot
+        if the transform at the given nesting level (1 for the outermost)
+        fails. Does nothing if this level already has a snapshot.
+        '''
+        if s._snapshot_list and s._snapshot_list[-1]['level'] == level:
+            return
+        # An enclosing transform may have edited the tree or lines in
+        #  place without an update yet, so existing copies may not match.
+        if s._snapshot_list:
+            s._snapshot_copy_dict.clear()
+        s._snapshot_list.append({
+            'level'       : level,
+            'modified'    : s.modified,
+            '_text'       : s._text,
+            '_xml_tree'   : s._xml_tree,
+            '_xml_header' : s._xml_header,
+            '_line_list'  : s._line_list,
+            })
+
+
+    def Restore_Snapshot(s, level):
+        '''
+        Restore the contents saved for the transform at the given level,
+        if it saved any, dropping the snapshot.
+        '''
+        if not s._snapshot_list or s._snapshot_list[-1]['level'] != level:
+            return
+        snapshot = s._snapshot_list.pop()
+        s.modified    = snapshot['modified']
+        s._text       = snapshot['_text']
+        s._xml_tree   = snapshot['_xml_tree']
+        s._xml_header = snapshot['_xml_header']
+        s._line_list  = snapshot['_line_list']
+        # The restored objects may be the snapshot copies, which will
+        #  now be edited.
+        s._snapshot_copy_dict.clear()
+
+
+    def Commit_Snapshot(s, level):
+        '''
+        Drop the snapshot saved for the transform at the given level,
+        after it completed. If this is a nested transform, the snapshot
+        is passed to the enclosing transform if that has none of its own,
+        so that the edits are still undone should that one fail.
+        '''
+        if not s._snapshot_list or s._snapshot_list[-1]['level'] != level:
+            return
+        snapshot = s._snapshot_list.pop()
+        if level > 1 and (not s._snapshot_list 
+        or s._snapshot_list[-1]['level'] < level - 1):
+            snapshot['level'] = level - 1
+            s._snapshot_list.append(snapshot)
+
+
+    def _Separate_Snapshots(s, attribute, copy_function):
+        '''
+        Called before handing out the tree or line list for editing,
+        to separate them from any snapshots holding the same object.
+        Snapshots with text drop the object, to be rebuilt from the
+        text if restored; others are given a copy, made once and
+        reused until the contents are next updated.
+
+        * attribute
+          - String, name of the attribute holding the object.
+        * copy_function
+          - Function which returns a copy of the object.
+        '''
+        current = getattr(s, attribute)
+        for snapshot in s._snapshot_list:
+            if snapshot[attribute] is not current:
+                continue
+            if snapshot['_text'] != None:
+                snapshot[attribute] = None
+            else:
+                # Snapshots never edit their copy, so one copy can be
+                #  shared by all snapshots of the same contents, eg.
+                #  across transforms that only read the tree.
+                if attribute not in s._snapshot_copy_dict:
+                    s._snapshot_copy_dict[attribute] = copy_function(current)
+                snapshot[attribute] = s._snapshot_copy_dict[attribute]
 
 
     @staticmethod
@@ -179,9 +382,15 @@ class XML_File(Game_File):
         #  (eg. utf-8 wasn't used to write an xml file declared as iso-8859
         #   or similar).
 
+        # Only the first line is needed, so pick it out of the binary
+        #  without decoding the rest of the file.
+        line_end = file_binary.find(b'\n')
+        if line_end != -1:
+            file_binary = file_binary[ : line_end]
+
         # Convert binary to text; always treating as utf-8 (since this
         #  seems to be the most reliable, and is generally the default).
-        file_text = file_binary.decode('utf-8').replace('\r\n','\n')
+        file_text = file_binary.decode('utf-8')
 
         # Get the first line by using split lines in a loop, and break early.
         for line in file_text.splitlines():
@@ -219,9 +428,13 @@ class XML_File(Game_File):
         '''
         Returns a bytearray with the file contents.
         '''
-        binary = bytearray(s._text.encode(encoding = s.encoding))
+        # Unmodified files keep their original binary.
+        if not s.modified:
+            return bytearray(s.binary)
+        text = s.Get_Text()
+        binary = bytearray(text.encode(encoding = s.encoding))
         # To be safe, add a newline at the end if there.
-        if not s._text.endswith('\n'):
+        if not text.endswith('\n'):
             binary += '\n'.encode(encoding = s.encoding)
         return binary
 
@@ -230,14 +443,21 @@ class XML_File(Game_File):
         '''
         Write these contents to the target file_path.
         '''
+        # Unmodified files keep their original binary.
+        if not s.modified:
+            with open(file_path, 'wb') as file:
+                file.write(s.binary)
+            return
+
         # Open with the right encoding.
+        text = s.Get_Text()
         with open(file_path, 'w', encoding = s.encoding) as file:   
             # Just write as raw text.
-            file.write(s._text)
+            file.write(text)
             # To be safe, add a newline at the end if there isn't
             #  one, since some files require this (eg. bods) to
             #  be read correctly.
-            if not s._text.endswith('\n'):
+            if not text.endswith('\n'):
                 file.write('\n')
     
         #-Removed; use text instead of xml.
@@ -246,37 +466,560 @@ class XML_File(Game_File):
         return
 
 
+# Patterns used when indexing language files.
+# Page nodes, capturing the page id.
+_page_id_re = re.compile(r'<page\b[^>]*?\sid="(\d+)"')
+# Page titles, when present.
+_page_title_re = re.compile(r'\stitle="([^"]*)"')
+# Empty page nodes (eg. <page id="1"/>), capturing the tag up to the '/>'.
+_page_empty_re = re.compile(r'(<page\b[^>]*?)\s*/>')
+# Text nodes, capturing the id, the opening tag end (which is '/>' for
+#  empty nodes), and the text up to the closing tag, if on this line.
+_t_node_re = re.compile(r'<t\s+id="(\d+)"[^>]*?(/?>)(?:(.*?)</t>)?', re.DOTALL)
+
+
+class Language_File(XML_File):
+    '''
+    Language file holding text pages, from the 't' folder, eg.
+    't/0001-L044.xml'. Inherits from XML_File, and provides lookups
+    and edits of the text nodes by page id and text id.
+
+    Text nodes are indexed on first use, with a single pass over the
+    file lines, recording the line holding each node. Nodes are then
+    read and edited through their line, leaving all other lines with
+    their original formatting (including comments). New nodes are
+    added to the end of their page, and new pages to the end of
+    the file.
+    Node text is the raw xml text, with any entities still escaped.
+
+    Note: edited lines may hold multiple xml lines (eg. with added
+    nodes, or for a node whose text spans lines), separated by
+    newlines.
+
+    Attributes:
+    * _index_line_list
+      - The list of lines (from Get_Lines) that the index was built on,
+        or None if the index is not built.
+    * _page_dict
+      - OrderedDict, keyed by page id int, holding a dict with 'title'
+        (string or None), 'line' (the index of the line opening the
+        page), 'end' (the index of the line closing the page, or None
+        if the page is empty or not closed), 'indent' (string to put
+        before added nodes) and 't_ids' (list of text id ints in order).
+    * _t_line_dict
+      - Dict, keyed by (page id, text id) tuple, holding the index of
+        the line with that node.
+    * _language_end
+      - Int, the index of the line closing the language node, or None
+        if not found.
+    '''
+    def __init__(s, file_binary, **kwargs):
+        super().__init__(file_binary, **kwargs)
+        s._index_line_list = None
+        s._page_dict = None
+        s._t_line_dict = None
+        s._language_end = None
+
+
+    def Build_Index(s):
+        '''
+        Build the index of pages and text nodes from the current lines,
+        if not already built on them.
+        '''
+        line_list = s.Get_Lines()
+        if s._index_line_list is line_list:
+            return
+
+        s._page_dict = OrderedDict()
+        s._t_line_dict = {}
+        s._language_end = None
+        # Pack any text nodes spanning lines into single lines, so that
+        #  each node can be edited through one line. This builds a new
+        #  list, which joins to the same text.
+        new_line_list = []
+        this_page = None
+        this_page_id = None
+        line_iter = iter(line_list)
+        for line in line_iter:
+            # Join lines until the last node closes.
+            if '<t ' in line:
+                while s._Ends_In_Open_Node(line):
+                    next_line = next(line_iter, None)
+                    if next_line == None:
+                        break
+                    line = line + '\n' + next_line
+            index = len(new_line_list)
+            new_line_list.append(line)
+
+            if '<page' in line:
+                match = _page_id_re.search(line)
+                if match != None:
+                    this_page_id = int(match.group(1))
+                    title_match = _page_title_re.search(line)
+                    this_page = s._page_dict.setdefault(this_page_id, {
+                        'title'  : title_match.group(1) if title_match else None,
+                        'line'   : index,
+                        'end'    : None,
+                        'indent' : '    ',
+                        't_ids'  : [],
+                        })
+                    # Empty pages have no nodes or closing tag.
+                    if _page_empty_re.search(line) != None:
+                        this_page = None
+
+            if this_page != None and '<t ' in line:
+                for match in _t_node_re.finditer(line):
+                    t_id = int(match.group(1))
+                    key = (this_page_id, t_id)
+                    # If a text id repeats, keep the first.
+                    if key in s._t_line_dict:
+                        continue
+                    s._t_line_dict[key] = index
+                    this_page['t_ids'].append(t_id)
+                # Match the indentation of the last node when adding more.
+                this_page['indent'] = line[ : len(line) - len(line.lstrip())]
+
+            if this_page != None and '</page>' in line:
+                this_page['end'] = index
+                this_page = None
+
+            if '</language>' in line:
+                s._language_end = index
+
+        # Swap in the new lines, if any were joined.
+        if len(new_line_list) != len(line_list):
+            line_list[:] = new_line_list
+        s._index_line_list = line_list
+
+
+    def Update_From_Lines(s, line_list = None):
+        '''
+        Update the current contents from the edited list of lines from
+        Get_Lines, or from a new line_list if given.
+        The index will be rebuilt when next needed.
+        '''
+        super().Update_From_Lines(line_list)
+        s._index_line_list = None
+
+
+    def Get_Page_Ids(s, title = None):
+        '''
+        Returns a list of page ids in the file, in order.
+
+        * title
+          - Optional string; if given, only pages with this title
+            are returned.
+        '''
+        s.Build_Index()
+        return [page_id for page_id, page in s._page_dict.items()
+                if title == None or page['title'] == title]
+
+
+    def Get_Text_Ids(s, page_id):
+        '''
+        Returns a list of text ids in the given page, in order,
+        or an empty list if the page is not present.
+        '''
+        s.Build_Index()
+        if page_id not in s._page_dict:
+            return []
+        return list(s._page_dict[page_id]['t_ids'])
+
+
+    def Get_Entry(s, page_id, t_id):
+        '''
+        Returns the raw text of the node with the given page id and text
+        id, or None if not found.
+        '''
+        s.Build_Index()
+        key = (int(page_id), int(t_id))
+        if key not in s._t_line_dict:
+            return None
+        match = s._Find_Node(s._index_line_list[s._t_line_dict[key]], key[1])
+        # Empty nodes (eg. <t id="1"/>) have no text.
+        return match.group(3) or ''
+
+
+    def Set_Entry(s, page_id, t_id, text):
+        '''
+        Sets the raw text of the node with the given page id and text
+        id, adding the node (and page) if not found.
+        '''
+        s.Build_Index()
+        page_id = int(page_id)
+        t_id = int(t_id)
+        key = (page_id, t_id)
+        line_list = s._index_line_list
+
+        if key in s._t_line_dict:
+            # Replace the text of the existing node, keeping its tag.
+            index = s._t_line_dict[key]
+            line = line_list[index]
+            match = s._Find_Node(line, t_id)
+            if match.group(2) == '/>':
+                new_node = '<t id="{}">{}</t>'.format(t_id, text)
+                line_list[index] = line[ : match.start()] + new_node + line[match.end() : ]
+            else:
+                line_list[index] = line[ : match.start(3)] + text + line[match.end(3) : ]
+
+        else:
+            if page_id not in s._page_dict:
+                s._Add_Page(page_id)
+            page = s._page_dict[page_id]
+            # Put the node just before the page closing tag, on its own
+            #  line, as part of the line holding the closing tag.
+            if page['end'] == None:
+                s._Expand_Page(page_id)
+            index = page['end']
+            line = line_list[index]
+            new_node = page['indent'] + '<t id="{}">{}</t>'.format(t_id, text)
+            end_pos = line.rfind('</page>')
+            # Find where the closing tag's own line starts.
+            tag_line_start = line.rfind('\n', 0, end_pos) + 1
+            if line[tag_line_start : end_pos].strip():
+                # The tag follows other content; split it to a new line.
+                line_list[index] = (line[ : end_pos] + '\n' + new_node 
+                                    + '\n' + line[end_pos : ])
+            else:
+                line_list[index] = (line[ : tag_line_start] + new_node 
+                                    + '\n' + line[tag_line_start : ])
+            s._t_line_dict[key] = index
+            page['t_ids'].append(t_id)
+
+        # Record the change, without dropping the index.
+        super().Update_From_Lines()
+        s._index_line_list = line_list
+
+
+    @staticmethod
+    def _Ends_In_Open_Node(line):
+        '''
+        Returns True if the last text node on the line is not closed.
+        '''
+        match = None
+        for match in _t_node_re.finditer(line):
+            pass
+        return (match != None 
+                and match.group(2) == '>' 
+                and match.group(3) == None)
+
+
+    def _Find_Node(s, line, t_id):
+        '''
+        Returns the regex match for the node with the given text id
+        on the given line.
+        '''
+        for match in _t_node_re.finditer(line):
+            if int(match.group(1)) == t_id:
+                return match
+        raise Exception('Text id {} not found on its indexed line'.format(t_id))
+
+
+    def _Expand_Page(s, page_id):
+        '''
+        Expands an empty page node (eg. <page id="1"/>) into an opening
+        and closing tag, so that nodes can be added to it.
+        Raises an exception if the page is not empty but has no closing
+        tag.
+        '''
+        page = s._page_dict[page_id]
+        line_list = s._index_line_list
+        index = page['line']
+        line = line_list[index]
+        match = _page_empty_re.search(line)
+        if match == None:
+            raise Exception('Page {} in {} has no closing tag'.format(
+                page_id, s.virtual_path))
+        # Put the closing tag on its own line, as part of the page line,
+        #  matching the page indentation.
+        tag_line_start = line.rfind('\n', 0, match.start()) + 1
+        indent = line[tag_line_start : match.start()]
+        if indent.strip():
+            indent = ''
+        line_list[index] = (line[ : match.start()] + match.group(1) + '>\n' 
+                            + indent + '</page>' + line[match.end() : ])
+        page['end'] = index
+        page['indent'] = indent + '  '
+
+
+    def _Add_Page(s, page_id):
+        '''
+        Adds a new, empty page before the end of the language node.
+        '''
+        if s._language_end == None:
+            raise Exception('Language node end not found in {}'.format(
+                s.virtual_path))
+        # Insert lines for the new page. Since the language end is near
+        #  the end of the file, few lines need to move.
+        line_list = s._index_line_list
+        index = s._language_end
+        line_list.insert(index, '  <page id="{}" title="" descr="0">'.format(page_id))
+        line_list.insert(index + 1, '  </page>')
+        s._page_dict[page_id] = {
+            'title'  : '',
+            'line'   : index,
+            'end'    : index + 1,
+            'indent' : '    ',
+            't_ids'  : [],
+            }
+        s._language_end = index + 2
+
+
+# Attributes within a universe object line, capturing the name and value.
+_attribute_re = re.compile(r'(\w+)="([^"]*)"')
+
+
+class Universe_File(XML_File):
+    '''
+    Universe map file, 'maps/x3_universe.xml'. Inherits from XML_File,
+    and provides lookups and edits of sectors by their x,y coordinates.
+
+    Sectors are indexed on first use, with a single pass over the file
+    lines. Each sector is an object line with a 'size' field, eg.
+     <o t="1" x="14" y="10" r="18" size="15000000" m="0" qtrade="50">
+    followed by lines for the objects in the sector, and a closing line.
+    Sector fields are read and edited through the sector line, and the
+    sector objects as a block of text, leaving all other lines with
+    their original formatting.
+
+    Attributes:
+    * _index_line_list
+      - The list of lines (from Get_Lines) that the index was built on,
+        or None if the index is not built.
+    * _sector_dict
+      - OrderedDict, keyed by (x, y) int tuple, holding a dict with
+        'line' (the index of the sector line), 'end' (the index of the
+        line closing the sector) and 'fields' (OrderedDict of the raw
+        text field values of the sector line, keyed by field name, eg.
+        'r' for race, 'm' for music, 'size', 'qtrade').
+    '''
+    def __init__(s, file_binary, **kwargs):
+        super().__init__(file_binary, **kwargs)
+        s._index_line_list = None
+        s._sector_dict = None
+
+
+    def Build_Index(s):
+        '''
+        Build the index of sectors from the current lines, if not
+        already built on them.
+        '''
+        line_list = s.Get_Lines()
+        if s._index_line_list is line_list:
+            return
+
+        s._sector_dict = OrderedDict()
+        # Find the sector lines, expecting every sector line to have
+        #  a 'size' field.
+        # This is the only check made on most lines, the object lines.
+        sector_line_indices = [index for index, line in enumerate(line_list)
+                               if 'size=' in line]
+
+        for sector_number, index in enumerate(sector_line_indices):
+            line = line_list[index]
+            fields = OrderedDict(_attribute_re.findall(line))
+            if 'x' not in fields or 'y' not in fields:
+                continue
+
+            # Sectors without objects may be closed on their line.
+            if line.rstrip().endswith('/>'):
+                end = index + 1
+            else:
+                # The last closing line before the next sector (or the end
+                #  of the universe) closes this sector.
+                if sector_number + 1 < len(sector_line_indices):
+                    end = sector_line_indices[sector_number + 1] - 1
+                else:
+                    end = len(line_list) - 1
+                while end > index + 1 and '</o>' not in line_list[end]:
+                    end -= 1
+
+            key = (int(fields['x']), int(fields['y']))
+            s._sector_dict.setdefault(key, {
+                'line'   : index,
+                'end'    : end,
+                'fields' : fields,
+                })
+
+        s._index_line_list = line_list
+
+
+    def Update_From_Lines(s, line_list = None):
+        '''
+        Update the current contents from the edited list of lines from
+        Get_Lines, or from a new line_list if given.
+        The index will be rebuilt when next needed.
+        '''
+        super().Update_From_Lines(line_list)
+        s._index_line_list = None
+
+
+    def Get_Sector_Keys(s):
+        '''
+        Returns a list of (x, y) tuples for the sectors in the file,
+        in order.
+        '''
+        s.Build_Index()
+        return list(s._sector_dict.keys())
+
+
+    def Get_Sector_Fields(s, x, y):
+        '''
+        Returns a dict of the raw text field values of the sector
+        with the given coordinates, keyed by field name, or None if
+        the sector is not found.
+        The dict should not be edited; use Set_Sector_Field instead.
+        '''
+        s.Build_Index()
+        sector = s._sector_dict.get((int(x), int(y)))
+        if sector == None:
+            return None
+        return sector['fields']
+
+
+    def Set_Sector_Field(s, x, y, field, value):
+        '''
+        Sets the value of an existing field of the sector with the
+        given coordinates.
+        '''
+        s.Build_Index()
+        sector = s._sector_dict[(int(x), int(y))]
+        line_list = s._index_line_list
+        line = line_list[sector['line']]
+        value = str(value)
+        new_line, count = re.subn(
+            r'(\s{}=")[^"]*"'.format(re.escape(field)),
+            lambda match: match.group(1) + value + '"',
+            line, count = 1)
+        if count == 0:
+            raise Exception('Field {} not found for sector {},{}'.format(
+                field, x, y))
+        line_list[sector['line']] = new_line
+        sector['fields'][field] = value
+
+        # Record the change, without dropping the index.
+        super().Update_From_Lines()
+        s._index_line_list = line_list
+
+
+    def Get_Sector_Object_Text(s, x, y):
+        '''
+        Returns the text of the object lines of the sector with the
+        given coordinates, between the sector line and its closing line,
+        or None if the sector is not found.
+        '''
+        s.Build_Index()
+        sector = s._sector_dict.get((int(x), int(y)))
+        if sector == None:
+            return None
+        return '\n'.join(
+            s._index_line_list[sector['line'] + 1 : sector['end']])
+
+
+    def Set_Sector_Object_Text(s, x, y, text):
+        '''
+        Replaces the object lines of the sector with the given
+        coordinates with the given text, which may be empty to
+        remove all objects.
+        '''
+        s.Build_Index()
+        sector = s._sector_dict[(int(x), int(y))]
+        line_list = s._index_line_list
+        new_line_list = text.split('\n') if text else []
+        start = sector['line'] + 1
+        end = sector['end']
+
+        # Sectors closed on their line have no closing line to put the
+        #  objects before, so expand the tag and add a closing line.
+        line = line_list[sector['line']]
+        closed_on_line = line.rstrip().endswith('/>')
+        if closed_on_line:
+            if not new_line_list:
+                return
+            tag_end = line.rfind('/>')
+            line_list[sector['line']] = (line[ : tag_end].rstrip() + '>' 
+                                         + line[tag_end + 2 : ])
+            indent = line[ : len(line) - len(line.lstrip())]
+            new_line_list.append(indent + '</o>')
+
+        line_list[start : end] = new_line_list
+
+        # Shift the line indices of this and later sectors by the change
+        #  in line count.
+        offset = len(new_line_list) - (end - start)
+        if offset:
+            for other_sector in s._sector_dict.values():
+                if other_sector['line'] > sector['line']:
+                    other_sector['line'] += offset
+                if other_sector['end'] >= end:
+                    other_sector['end'] += offset
+        if closed_on_line:
+            sector['end'] = start + len(new_line_list) - 1
+
+        # Record the change, without dropping the index.
+        super().Update_From_Lines()
+        s._index_line_list = line_list
+
+
 # TODO: rename to something other than 'T', which gets confused with
 #  text files (in a t folder).
 class T_File(Game_File):
     '''
-    T file contents holder, as a list of OrderedDict objects.
+    T file contents holder, as a list of line rows.
     Represents files found in the 'types' folder.
-    Class exists mainly to clarify naming for now, and for any
-    future attribute expansion.
+    Line contents are stored in a column-backed T_Table, and each line
+    is accessed through a T_Row, which acts like an OrderedDict of the
+    labelled line fields.
 
     Attributes:
     * text
       - Raw text for this file.
+    * table
+      - T_Table holding the line contents.
     * line_dict_list
-      - List of OrderedDict objects, each holding the labelled 
+      - List of T_Row objects, each holding the labelled 
         contents of a line.
+      - Numeric fields may be read and written as numbers through
+        the T_Row Get_Typed and Set_Typed methods.
       - This includes all lines, with headers.
     * data_dict_list
       - As above, but only holding lines that have data, skipping 
         headers. This is used for transform editing.
+    * line_span_list
+      - List of (start, end) offsets into text for each originally
+        parsed line, used to write out lines which were not edited.
+
+    Contents are parsed from file_binary, unless a parsed_state is
+    given, as returned by Get_Parsed_State on an unedited file.
     '''
-    def __init__(s, file_binary, **kwargs):
+    def __init__(s, file_binary = None, parsed_state = None, **kwargs):
         super().__init__(**kwargs)
         s.text = None
-        s.line_dict_list = []
+        # Numeric field types are given by file name, if known.
+        s.table = T_Table(File_Fields.T_file_name_field_type_dict_dict.get(s.name))
+        # The table maintains the full row list.
+        s.line_dict_list = s.table.row_list
         s.data_dict_list = []
+        s.line_span_list = []
         assert s.virtual_path.startswith('types/')
                 
-        # Field ordering could be done with named tuples, but in practice
-        #  it is  probably easiest to just use ordered dicts.
-        # Indices without names will be keyed by the index integer.
+        if parsed_state != None:
+            s.Set_Parsed_State(parsed_state)
+        else:
+            s.Parse(file_binary)
 
+        # Lines so far match the original text; start tracking edits
+        #  from here, which will flag this file as modified.
+        s.table.dirty_index_set.clear()
+        s.table.owner = s
+        s.modified = False
+
+
+    def Parse(s, file_binary):
+        '''
+        Parse the lines of the given file binary into the table.
+        Indices without names will be keyed by the index integer.
+        '''
         # Get the file text. Treat as default utf-8.
         # Store a copy of raw text, in case it is ever wanted anywhere.
         # General expectation is that this isn't used, except maybe
@@ -289,78 +1032,99 @@ class T_File(Game_File):
         # Since lines end in semicolons, the last entry will generally 
         #  be a simple new line.
         data_list_list = []
+        # Track the text offset of each line, for later writeout of
+        #  unedited lines.
+        line_end = 0
         # Keep line endings when splitting (True arg to splitlines).
         for line in s.text.splitlines(True):
+            line_start = line_end
+            line_end += len(line)
             # Comment lines (//) are ignored.
             if line.startswith('//'):
                 continue
             # Split the entries.
             data_list_list.append(line.split(';'))
+            s.line_span_list.append((line_start, line_end))
             
 
         # Lookup the fields for this file name.
-        field_dict = File_Fields.T_file_name_field_dict_dict[s.name]
-
-        # Loop over the lines, aiming to annotate the entries with field
-        #  names.
+        field_dict_name = s.name
+        # Note: the line may be a TC format or AP format, in the
+        #  case of the jobs file.
+        # If the fields_dict specifies a line count for an AP
+        #  format, and that format is seen here, it will provide
+        #  some special insertion points for new AP fields.
+        # The default field_dict is for the TC format in this
+        #  case, with no extra lines.
+        # This is triggered on the first data line which has a length
+        #  matching an AP file, and only swaps once.
+        ap_line_length = File_Fields.T_file_name_field_dict_dict[
+            field_dict_name].get('lines_ap')
+
+        # Loop over the lines, looking up the field names to annotate
+        #  their entries with.
+        line_keys_list = []
         for data_list in data_list_list:
 
-            # Create an ordered dict for this line to hold the fields.
-            this_dict = OrderedDict()
-
-            # Note: the line may be a TC format or AP format, in the
-            #  case of the jobs file.
-            # If the fields_dict specifies a line count for an AP
-            #  format, and that format is seen here, it will provide
-            #  some special insertion points for new AP fields.
-            # The default field_dict is for the TC format in this
-            #  case, with no extra lines.
-            # (This is inside the loop, so it gets triggered on the first
-            #  data line which has a length matching an AP file).
-            if ('lines_ap' in field_dict
-            and len(data_list) == field_dict['lines_ap']):
+            if len(data_list) == ap_line_length:
                 # Switch to the ap field dict.
-                # This will only swap once; afterward there is no
-                #  'lines_ap' field in field_dict, and these checks
-                #  are skipped.
-                field_dict = File_Fields.T_file_name_field_dict_dict[
-                    field_dict['ap_name']]
-                        
-
-            # Step through the fields, with an index counter.
-            for index, field_string in enumerate(data_list):
-
-                # If this index has a field name, use it, otherwise use 
-                #  the index for a key.
-                this_key = index
-                # Only do the named key check when the line is considered
-                #  a data line; don't do this for headers/comments.
-                if len(data_list) >= field_dict['min_data_entries']:
-                    if index in field_dict:
-                        this_key = field_dict[index]
-                    # Also check negative indices.
-                    negative_index = index - len(data_list)
-                    if negative_index in field_dict:
-                        this_key = field_dict[negative_index]
-                        # Error if both matched; something went wrong in that
-                        #  case.
-                        assert index not in field_dict
-
-                # Record in the ordered dict.
-                # Values will not be converted to ints, since some might 
-                #  need to stay strings.
-                # Int conversion should happen upon use elsewhere.
-                this_dict[this_key] = field_string
-                                
-
-            # Add this line dict to the list that tracks all lines.
-            s.line_dict_list.append(this_dict)
-            # Conditionally add this line dict to the data tracking list,
-            #  skipping if the line is too short.
-            if len(this_dict) >= field_dict['min_data_entries']:
-                s.data_dict_list.append(this_dict)
+                field_dict_name = File_Fields.T_file_name_field_dict_dict[
+                    field_dict_name]['ap_name']
+                ap_line_length = None
+
+            # Get the precompiled (keys, is_data_line) for lines of this
+            #  length.
+            line_keys_list.append(File_Fields.Get_T_File_Line_Keys(
+                field_dict_name, len(data_list)))
+
+        # Add the lines to the table, which tracks all lines.
+        # Consecutive lines with the same keys (normally most of the
+        #  file) are added together, letting the table fill its columns
+        #  in one pass instead of a field at a time.
+        # Values will not be converted to ints, since some might 
+        #  need to stay strings.
+        # Int conversion should happen upon use elsewhere, through
+        #  the rows' Get_Typed method which caches the result.
+        for (key_tuple, is_data_line), line_group in itertools.groupby(
+                zip(line_keys_list, data_list_list), key = lambda x: x[0]):
+            these_rows = s.table.Add_Lines(
+                key_tuple, [data_list for _, data_list in line_group])
+            # Conditionally add these lines to the data tracking list,
+            #  skipping if the lines are too short.
+            if is_data_line:
+                s.data_dict_list.extend(these_rows)
+
+
+    def Get_Parsed_State(s):
+        '''
+        Returns a dict holding the parsed contents of this file, which
+        may be pickled and later passed to the constructor to skip
+        parsing. Should only be used on unedited files.
+        '''
+        assert not s.modified
+        return {
+            'text'             : s.text,
+            'line_span_list'   : s.line_span_list,
+            'column_dict'      : s.table.column_dict,
+            'line_keys_list'   : s.table.line_keys_list,
+            # Record data lines by index.
+            'data_index_list'  : [x.index for x in s.data_dict_list],
+            }
+
+
+    def Set_Parsed_State(s, parsed_state):
+        '''
+        Fill in the contents of this file from a dict returned by
+        Get_Parsed_State.
+        '''
+        s.text = parsed_state['text']
+        s.line_span_list = parsed_state['line_span_list']
+        s.table.Set_Lines(parsed_state['column_dict'],
+                          parsed_state['line_keys_list'])
+        s.data_dict_list = [s.line_dict_list[x] 
+                            for x in parsed_state['data_index_list']]
+
 
-                
     def Get_Text(s):
         '''
         Returns the text for this file.
@@ -375,48 +1139,138 @@ class T_File(Game_File):
         return s.data_dict_list
     
     
-    def Get_Binary(s):
+    def Get_Output_Text(s):
         '''
-        Returns a bytearray with the file contents.
+        Returns the current text for this file, as used when writing.
+        Lines which were not edited are taken from the original text,
+        and others are rebuilt from their fields.
+        Comment lines are not included.
         '''
-        binary = bytearray()
-        # Loop over the lines.
-        for line_dict in s.line_dict_list:
-
-            # Convert the line fields to a list.
-            field_list = line_dict.values()
-            # Join with semicolons.
-            this_line = ';'.join(field_list)
+        text_list = []
+        dirty_index_set = s.table.dirty_index_set
+        line_span_list = s.line_span_list
+        # Track the current run of unedited lines, which are contiguous
+        #  in the original text unless split by comments.
+        run_start = run_end = None
+
+        for index, line_dict in enumerate(s.line_dict_list):
+            # Unedited original lines extend or start a text run.
+            if index < len(line_span_list) and index not in dirty_index_set:
+                line_start, line_end = line_span_list[index]
+                if line_start != run_end:
+                    if run_start != None:
+                        text_list.append(s.text[run_start : run_end])
+                    run_start = line_start
+                run_end = line_end
+                continue
 
-            # The last entry of each sublist is alrady a new line, so
+            # Close off any run.
+            if run_start != None:
+                text_list.append(s.text[run_start : run_end])
+                run_start = run_end = None
+            # Join the fields with semicolons.
+            # The last entry of each line is already a new line, so
             #  no new line needed here.
-            # Encode and store.
-            binary += this_line.replace('\n','\r\n').encode()
-        return binary
+            text_list.append(';'.join(line_dict.values()))
+
+        if run_start != None:
+            text_list.append(s.text[run_start : run_end])
+        return ''.join(text_list)
+
+
+    def Get_Binary(s):
+        '''
+        Returns a bytearray with the file contents.
+        '''
+        return bytearray(s.Get_Output_Text().replace('\n','\r\n').encode())
 
 
     def Write_File(s, file_path):
         '''
         Write these contents to the target file_path.
         '''
-        # Open the file to write to.
         with open(file_path, 'w') as file:
-            # Loop over the lines.
-            for line_dict in s.line_dict_list:
-    
-                # Convert the line fields to a list.
-                field_list = line_dict.values()
-                # Join with semicolons.
-                this_line = ';'.join(field_list)
-    
-                # Write to the file.
-                # The last entry of each sublist is alrady a new line, so
-                #  no new line needed here.
-                file.write(this_line)
-            
+            file.write(s.Get_Output_Text())
         return
                
 
+    def Scale_Fields(
+            s,
+            keys,
+            scaling_factor = 1,
+            adjustment_factors_dict = {},
+            group_keys = ('subtype',),
+            round_func = None,
+        ):
+        '''
+        Scales numeric fields of the data lines as a bulk update, with
+        multipliers picked per line, and each field scaled as a column.
+        Returns a list of (line dict, key, old value, new value) tuples
+        for the scaled fields.
+        Lines are only scaled if matched in adjustment_factors_dict, or
+        if scaling_factor is not 1.
+
+        * keys
+          - List of field keys to scale.
+        * scaling_factor
+          - Multiplier for lines not matched in adjustment_factors_dict.
+        * adjustment_factors_dict
+          - Dict keyed by field value (eg. ship type), holding the
+            multiplier for lines with that value in a group_keys field.
+        * group_keys
+          - Field keys of values to look up in adjustment_factors_dict,
+            in priority order.
+        * round_func
+          - Optional function applied to each scaled number, returning
+            either the number to store, or a formatted field string.
+            Numbers are formatted with str(), after conversion to the
+            field type if known.
+        '''
+        # Pick out the lines to scale, and their multipliers.
+        # Group fields are read from their columns directly, so bring
+        #  them up to date first.
+        if s.table.unformatted_dict:
+            s.table.Format_Values()
+        group_column_list = [s.table.column_dict.get(x, []) for x in group_keys]
+        index_list = []
+        factor_list = []
+        for line_dict in s.data_dict_list:
+            index = line_dict.index
+            factor = None
+            for column in group_column_list:
+                if (index < len(column) 
+                and column[index] in adjustment_factors_dict):
+                    factor = adjustment_factors_dict[column[index]]
+                    break
+            if factor == None:
+                if scaling_factor == 1:
+                    continue
+                factor = scaling_factor
+            index_list.append(index)
+            factor_list.append(factor)
+
+        result_list = []
+        for key in keys:
+            for index, value, new_value in s.table.Scale_Values(
+                    key, index_list, factor_list, round_func):
+                result_list.append(
+                    (s.line_dict_list[index], key, value, new_value))
+        return result_list
+
+
+    def Index(s, key):
+        '''
+        Returns a dict, keyed by the values of the given field, holding
+        lists of the lines with each value, in line order.
+        Eg. Index('subtype')['SG_SH_M5'] when used on the Tships file
+        will return all M5 entries.
+        The index is built on first use, and kept up to date as lines
+        are edited or added afterward. It should not be edited directly.
+        For named fields, only data lines are included.
+        '''
+        return s.table.Get_Index(key)
+
+
     def Find(s, key, value):
         '''
         Finds and returns the line dict that matches the given key:value
@@ -425,9 +1279,11 @@ class T_File(Game_File):
         Raises an exception is the key is not valid for this file
         type; otherwise returns None if a value match is not found.
         '''
-        for line_dict in s.data_dict_list:
-            if line_dict[key] == value:
-                return line_dict
+        if key not in s.table.column_dict:
+            raise KeyError(key)
+        line_dict_list = s.Index(key).get(value)
+        if line_dict_list:
+            return line_dict_list[0]
         return None
 
     
@@ -436,7 +1292,10 @@ class T_File(Game_File):
         Convenience function to add new lines to a t file.
 
         * new_entry_list
-          - List of OrderedDict entries matching the tfile's line format.
+          - List of entries matching the tfile's line format, either
+            OrderedDicts or T_Rows (eg. copies of existing rows).
+          - T_Row entries are bound to this file, so that later edits
+            through them are seen.
         '''
         # Return early if the list is empty.
         if not new_entry_list:
@@ -470,8 +1329,8 @@ class T_File(Game_File):
         # These need to go in both the data and line lists, data for future
         # visibility to this and other transforms, lines to be seen at
         # writeout.
-        s.data_dict_list += new_entry_list
-        s.line_dict_list += new_entry_list
+        # (The table adds the rows to the line list.)
+        s.data_dict_list += [s.table.Add_Row(x) for x in new_entry_list]
 
         # Find the header line.
         for line_dict in s.line_dict_list:
@@ -504,22 +1363,8 @@ class Globals_File(T_File):
     Globals.txt file object. Inherits from T_File, and provides more
     convenient wayts to access fields, including support for defaults
     when a field is not present.
-
-    New attributes:
-    * named_lines_dict
-      - Dict, keyed by global field name, holding the OrderedDict line
-        entry.
+    Fields are looked up through the T_File index on 'name'.
     '''
-    def __init__(s, *args, **kwargs):
-        # Init the standard t file.
-        super().__init__(**kwargs)
-
-        # Build a dict matching fields names to line entries.
-        s.named_lines_dict = {
-            x['name'] : x for x in s.data_dict_list
-            }
-
-        return
 
 
     def Get_Field(s, field_name):
@@ -527,8 +1372,9 @@ class Globals_File(T_File):
         Return the value for a given field. If the field is not found,
         a default is returned. Values is returned as a string.
         '''
-        if field_name in s.named_lines_dict:
-            value = s.named_lines_dict[field_name]['value']
+        line_dict = s.Find('name', field_name)
+        if line_dict != None:
+            value = line_dict['value']
         else:
             # The fields should be present in the defaults, at least.
             assert field_name in File_Fields.Global_Defaults
@@ -550,8 +1396,9 @@ class Globals_File(T_File):
         prior to this call.
         '''
         # Do a direct update if the line is present.
-        if field_name in s.named_lines_dict:
-            s.named_lines_dict[field_name]['value'] = str(value)
+        line_dict = s.Find('name', field_name)
+        if line_dict != None:
+            line_dict['value'] = str(value)
         else:
             # Add a new line.
             this_line = OrderedDict()
@@ -658,93 +1505,61 @@ class Misc_File(Game_File):
         return
 
 
-#-Removed for now; this would need to be paired up with something
-# the loads the text (eg. a script) and override other text being
-# replaced, and it might be easier for now just to do direct
-# edits.         
-#class Page_Text_File(Game_File):
-#    '''
-#    A file to be placed in the addon/t folder, defining text strings.
-#    Preferably, all override or new text strings should share this one file,
-#    which the game will automatically use to override strings in other files.
-#
-#    Pending development to read in such files.
-#
-#    Attributes:
-#    * page_id_string_dict
-#      - Two layer dict; outer key is text page number, inner key is
-#        line number, and value is the string.
-#    '''
-#    def __init__(self, **kwargs):
-#        super().__init__(**kwargs)
-#        self.page_id_string_dict = defaultdict(dict)
-#        # Can treat as unmodified unless an item is added.
-#        self.modified = False
-#
-#
-#    def Add_Line(self, page, line, value):
-#        '''
-#        Record a new string at the given page and item id.
-#        '''
-#        self.page_id_string_dict[page][line] = value
-#        # Set modified, so this gets written out.
-#        self.modified = True
-#
-#
-#    def Read_Data(self):
-#        '''
-#        Returns self instead of captured data.  Use Add_Line to add
-#        or change entries.
-#        '''
-#        return self
-#
-#
-#    def Write_File(self, file_path):
-#        '''
-#        Encode these contents into xml and write to the file_path.
-#        '''
-#        # Output format should look like:
-#        # <?xml version="1.0" encoding="UTF-8"?>
-#        # <language id="44">
-#        # 	<page id="7778">
-#		#     <t id="61000">some string</t>
-#	    #   </page>
-#        # </language>
-#
-#        # Could do xml nodes, but raw strings is probably fine.
-#        output_lines = [
-#            '<?xml version="1.0" encoding="UTF-8"?>',
-#            '<language id="44">',
-#            ]
-#
-#        # Work through the pages and lines, sorted.
-#        for page, line_string_dict in sorted(self.page_id_string_dict.items()):
-#
-#            # Open the page node.
-#            output_lines.append('  <page id="{}">'.format(page))
-#
-#            # Fill in the lines.
-#            for line, string in sorted(line_string_dict.items()):
-#                output_lines.append('    <t id="{}">{}</t>'.format(
-#                    line, string))
-#
-#            # Close the page node.
-#            output_lines.append('  </page>')
-#        
-#
-#        # Close the language node.
-#        output_lines += [
-#            '</language>',
-#            ]
-#        
-#        # Open with the right encoding; match utf-8 used in the
-#        #  xml header.
-#        with open(file_path, 'w', encoding = 'utf-8') as file:
-#
-#            # Write the lines.
-#            file.write('\n'.join(output_lines))
-#
-#            # To be safe, add a newline at the end.
-#            file.write('\n')
-#
-#        return
\ No newline at end of file
+class Raw_File(Game_File):
+    '''
+    Passthrough container for a loose file copied without modification.
+    Only the path to the original file is kept, and its bytes are read
+    when written out. Packed files (pck, pbd, pbb) keep their packed
+    name and bytes, so they pass through without being unpacked and
+    packed again.
+
+    Attributes:
+    * packed
+      - Bool, True if the original file is packed.
+    '''
+    def __init__(s, **kwargs):
+        super().__init__(**kwargs)
+        assert s.file_source_path != None
+        s.packed = Is_Packed_Path(s.virtual_path)
+
+
+    def Get_Binary(s):
+        '''
+        Returns a bytes object with the original file contents, still
+        packed if the file is packed.
+        '''
+        with open(s.file_source_path, 'rb') as file:
+            return file.read()
+
+
+    def Write_File(s, file_path):
+        '''
+        Copy the original file to the target file_path.
+        '''
+        shutil.copyfile(s.file_source_path, file_path)
+
+
+class Page_Text_File(Language_File):
+    '''
+    A file to be placed in the addon/t folder, defining text strings.
+    All override or new text strings from transforms should share this one
+    file, which the game will automatically use to override strings in
+    other files with lower numbers.
+
+    This starts as an empty language node, with entries added through
+    Set_Entry, and is only written out if an entry is added.
+    The language id is taken from the file name, eg. 44 for
+    't/9997-L044.xml'.
+    '''
+    def __init__(s, virtual_path, **kwargs):
+        language_id = int(virtual_path.split('-L')[-1].split('.')[0])
+        text = '\n'.join([
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<language id="{}">'.format(language_id),
+            '</language>',
+            '',
+            ])
+        super().__init__(
+            file_binary = text.encode('utf-8'),
+            virtual_path = virtual_path,
+            **kwargs)
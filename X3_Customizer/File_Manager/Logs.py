@@ -5,6 +5,7 @@ import os
 import json
 from ..Common.Settings import Settings
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from .File_Paths import *
 
 # General messages printout by transforms or during runtime.
@@ -49,6 +50,14 @@ class Log:
       - When from an older run, these files should be considered as sources,
         and should be renamed back to their base version by the newer run
         if it is otherwise not writing out a matching customized file.
+    * catalog_entry_hash_dict
+      - Dict, keyed by the cat path of each entry in the written catalog,
+        holding the hash of the entry contents before packing.
+      - Used to find catalog entries which can be reused as-is by a
+        newer run.
+    * catalog_compression_level
+      - Int, the compression level used for the written catalog, or
+        None if no catalog was written.
     '''
     def __init__(s):
         # Always default to the current highest version.
@@ -57,6 +66,8 @@ class Log:
         s.version = Change_Log.Get_Version()
         s.file_paths_written_hash_dict = {}
         s.file_paths_renamed_dict = {}
+        s.catalog_entry_hash_dict = {}
+        s.catalog_compression_level = None
         
 
     def Load(s):
@@ -95,18 +106,35 @@ class Log:
             s.file_paths_renamed_dict[
                 Relative_Path_to_System_Path(source_relative_path)
                 ] = Relative_Path_to_System_Path(dest_relative_path)
+
+        # Handle catalog entries; these may be missing from older logs.
+        # Entry paths are already relative, being cat paths.
+        s.catalog_entry_hash_dict = log_dict.get(
+            'catalog_entry_hash_dict', {})
+        s.catalog_compression_level = log_dict.get(
+            'catalog_compression_level', None)
             
 
+        # Get updated hashes for the prior written files.
+        # These may include large dat files, so when loading eagerly
+        #  spread them across threads (hashlib releases the GIL on
+        #  large updates).
+        file_paths = list(s.file_paths_written_hash_dict.keys())
+        if Settings.eager_catalog_loading and len(file_paths) > 1:
+            with ThreadPoolExecutor(
+                    max_workers = Settings.Get_Parallel_Workers()) as executor:
+                new_hash_list = list(executor.map(s.Get_File_Hash, file_paths))
+        else:
+            new_hash_list = [s.Get_File_Hash(x) for x in file_paths]
+
         # Check for hash mismatches in the prior written files.
         hash_mismatched_file_paths = []
-        for file_path, hash in s.file_paths_written_hash_dict.items():
+        for file_path, new_hash in zip(file_paths, new_hash_list):
             # If the old hash is None, something weird happened and
             #  the file was not found after being written; this may
             #  come from test code that disabled writeouts, and this
             #  can be ignored.
-
-            # Get an updated hash.
-            new_hash = s.Get_File_Hash(file_path)
+            hash = s.file_paths_written_hash_dict[file_path]
 
             # If the file is no longer found, hash will be None and this
             #  should be treated as a mismatch (though it probably
@@ -164,6 +192,10 @@ class Log:
             log_dict['file_paths_renamed_dict'][
                 System_Path_to_Relative_Path(source_abs_path)
                 ] = System_Path_to_Relative_Path(dest_abs_path)
+
+        # Handle catalog entries.
+        log_dict['catalog_entry_hash_dict'] = s.catalog_entry_hash_dict
+        log_dict['catalog_compression_level'] = s.catalog_compression_level
             
         # Write the json, with indents for readability.
         with open(Settings.Get_Log_File_Path(), 'w') as file:
@@ -180,10 +212,10 @@ class Log:
         # Can use sha256, which seems to be the current default over
         #  ones like md5.        
         hash = hashlib.sha256()
-        # Presumably manually buffering a file will help with hashing
-        #  it, but can keep things simple for now and do a full read.
+        # Read in chunks, to limit memory use on large dat files.
         with open(path, 'rb') as file:
-            hash.update(file.read())
+            for chunk in iter(lambda: file.read(2**20), b''):
+                hash.update(chunk)
         return hash.hexdigest()
 
 
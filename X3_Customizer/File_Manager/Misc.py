@@ -42,6 +42,10 @@ Transform_list = []
 # This is filled in by the decorator.
 Transforms_names_run = set()
 
+# Stack of names of the transforms currently running, innermost last.
+# This is filled in by the decorator.
+Transform_name_stack = []
+
 def Transform_Was_Run_Before(transform_name):
     '''
     Returns True if the named transform has been run.
@@ -72,12 +76,12 @@ def Init():
     # Initialize the file system, now that paths are set in settings.
     Source_Reader.Init()
     
-    #-Removed for now.
-    ## Generate an initial dummy file for all page text overrides.
-    #game_file = Page_Text_File(
-    #    virtual_path = Settings.Get_Page_Text_File_Path(),
-    #    )
-    #Add_File(game_file)
+    # Generate an initial empty file for all page text overrides.
+    # This is only written out if a transform adds text to it.
+    game_file = Page_Text_File(
+        virtual_path = Settings.Get_Page_Text_File_Path(),
+        )
+    Add_File(game_file)
 
     return
 
@@ -221,43 +225,45 @@ def Transform_Wrapper(
             Transforms_names_run.add(func.__name__)
             
             # Loop over the required files.
+            # This only checks that they can be found; the actual loading
+            #  is left to the transform, when it calls Load_File.
             for file_name in func._file_names:
-                # Do a test load; if succesful, the file was found.
                 try:
-                    Load_File(file_name)
-                # Catch file problems.
-                except Common.File_Missing_Exception:
-                    print('Skipped {}, required file {} not found or is empty.'.format(
-                        func.__name__,
-                        file_name
-                        ))
-                    # Return nothing and skip the call.
-                    return
-                # Catch gzip problems.
-                except Common.Gzip_Exception:
-                    print('Skipped {}, required file {} failed during unzipping.'.format(
-                        func.__name__,
-                        file_name
-                        ))
-                    # Return nothing and skip the call.
-                    return
+                    found = File_Exists(file_name)
                 except Exception as ex:
                     # Dev mode will reraise the exception.
                     if Settings.developer:
                         raise ex
                     else:
                         print('Skipped {}, unhandled exception.'.format(
-                            func.__name__,
-                            file_name
+                            func.__name__
                             ))
                     return
+                if not found:
+                    print('Skipped {}, required file {} not found or is empty.'.format(
+                        func.__name__,
+                        file_name
+                        ))
+                    # Return nothing and skip the call.
+                    return
 
             # Call the transform function, looking for exceptions.
             # This will be the generally clean fallback when anything
             #  goes wrong, so that other transforms can still be
             #  attempted.
             try:
-                results = func(*args, **kwargs)
+                Transform_name_stack.append(func.__name__)
+                try:
+                    results = func(*args, **kwargs)
+                except BaseException:
+                    # Undo partial edits to any xml files loaded by
+                    #  this transform.
+                    Close_File_Snapshots(len(Transform_name_stack), False)
+                    raise
+                else:
+                    Close_File_Snapshots(len(Transform_name_stack), True)
+                finally:
+                    Transform_name_stack.pop()
 
                 # If here, ran successfully.
                 # (This may not be the case in dev mode, but that will
@@ -271,6 +277,19 @@ def Transform_Wrapper(
                 #  here, though currently this is expected to always be None.
                 return results
 
+            # Catch problems with loading a required file, which may
+            #  still occur for files that were found (eg. empty LU
+            #  dummy files).
+            except Common.File_Missing_Exception:
+                print('Skipped {}, required file not found or is empty.'.format(
+                    func.__name__
+                    ))
+            # Catch gzip problems.
+            except Common.Gzip_Exception:
+                print('Skipped {}, required file failed during unzipping.'.format(
+                    func.__name__
+                    ))
+
             except Exception as ex:
                 # When set to catch exceptions, just print a nice message.
                 if not Settings.developer:
@@ -292,6 +311,21 @@ def Transform_Wrapper(
     return inner_decorator
 
 
+def Close_File_Snapshots(level, success):
+    '''
+    Handles the file snapshots saved for a transform at the given
+    nesting level (1 for the outermost) once it finishes, committing
+    them if it was a success, else restoring the files.
+    '''
+    for game_file in File_dict.values():
+        if not isinstance(game_file, XML_File):
+            continue
+        if success:
+            game_file.Commit_Snapshot(level)
+        else:
+            game_file.Restore_Snapshot(level)
+
+
 def Set_Transform_Category(function, category):
     '''
     Sets the documentation category for the given function, similar
@@ -303,6 +337,25 @@ def Set_Transform_Category(function, category):
     function._category = category
 
 
+def File_Exists(file_name):
+    '''
+    Returns True if the given file is loaded or can be found in the
+     source folder, loose files, or catalogs, without reading its
+     contents.
+
+    * file_name
+      - Name of the file, using the cat_path style (forward slashes,
+        no 'addon' folder).
+    '''
+    # It is possible Init was never run if this is called outside of
+    #  a transform, eg. by inspection code.
+    if First_call:
+        Init()
+    if file_name in File_dict:
+        return True
+    return Source_Reader.File_Exists(file_name)
+
+
 def Load_File(file_name,
               # TODO: rename this to be more generic.
               return_game_file = False, 
@@ -333,9 +386,13 @@ def Load_File(file_name,
     '''
     # Special replacement: if the file_name is 'text_override', swap
     #  to the name indicated by settings.
-    # -Removed for now.
-    #if file_name == 'text_override':
-    #    file_name = Settings.Get_Page_Text_File_Path()
+    if file_name == 'text_override':
+        file_name = Settings.Get_Page_Text_File_Path()
+
+    # Run any queued row operations on the file, so that the contents
+    #  are up to date.
+    if Pending_row_operations:
+        Run_Row_Operations(file_name)
 
     # If the file is not loaded, handle loading.
     if file_name not in File_dict:
@@ -356,6 +413,11 @@ def Load_File(file_name,
         # Store the contents in the File_dict.
         Add_File(game_file)
 
+    # When loaded by a transform, xml files save their contents, to be
+    #  restored should the transform fail partway through its edits.
+    if Transform_name_stack and isinstance(File_dict[file_name], XML_File):
+        File_dict[file_name].Save_Snapshot(len(Transform_name_stack))
+
 
     # Return the file contents.
     if return_game_file:
@@ -365,6 +427,100 @@ def Load_File(file_name,
     else:
         return File_dict[file_name].Read_Data()
 
+
+# Row operations queued for fused execution, as lists of
+#  [file name, transform name, row function], in order of queueing.
+# The row function is set to None if it raised an exception.
+Pending_row_operations = []
+
+def Apply_Row_Operation(file_name, row_function):
+    '''
+    Applies a function to each data line of a t file, in line order.
+    For use by transforms which edit each line on its own, without
+    looking at other lines or files.
+    If Settings.fuse_row_transforms is True, the function is queued
+    instead, and queued functions for the file are run together in
+    a single pass over its lines when they are next needed.
+
+    * file_name
+      - Name of the t file, using the cat_path style.
+    * row_function
+      - Function taking a line dict, to edit it in place.
+    '''
+    # Load now if needed, so that missing file problems go to the
+    #  calling transform.
+    # This skips Load_File for loaded files, so that queued operations
+    #  on them are not run early.
+    if file_name not in File_dict:
+        Load_File(file_name)
+    if not Settings.fuse_row_transforms:
+        for line_dict in File_dict[file_name].Read_Data():
+            row_function(line_dict)
+        return
+
+    transform_name = Transform_name_stack[-1] if Transform_name_stack else None
+    Pending_row_operations.append([file_name, transform_name, row_function])
+
+
+def Run_Row_Operations(file_name = None):
+    '''
+    Runs queued row operations, for the given file or all files.
+    Operations on a file are run in one pass over its lines, each line
+    going through the operations in order of queueing. Since each
+    operation only works on its own line, this matches running the
+    operations one after another.
+    An operation that raises an exception is skipped for the remaining
+    lines, leaving prior lines edited, as if it had failed partway
+    through a normal loop.
+    In developer mode, the first such exception is reraised once the
+    other operations have run, naming the transform that queued it.
+    '''
+    global Pending_row_operations
+    # Pick out the operations to run, by file, leaving others queued.
+    file_operations_dict = OrderedDict()
+    remaining_operations = []
+    for operation in Pending_row_operations:
+        if file_name == None or operation[0] == file_name:
+            file_operations_dict.setdefault(operation[0], []).append(operation)
+        else:
+            remaining_operations.append(operation)
+    Pending_row_operations = remaining_operations
+
+    # Exceptions from operations, as (transform name, exception).
+    # These are held until all operations have run, since this may be
+    #  called from the Load_File of a later transform, and the other
+    #  operations taken off the queue would otherwise be lost.
+    failure_list = []
+    for this_file_name, operation_list in file_operations_dict.items():
+        for line_dict in File_dict[this_file_name].Read_Data():
+            for operation in operation_list:
+                if operation[2] == None:
+                    continue
+                try:
+                    operation[2](line_dict)
+                except Exception as ex:
+                    failure_list.append((operation[1], ex))
+                    if not Settings.developer:
+                        print('Skipped {} due to a {} exception.'.format(
+                            operation[1],
+                            type(ex).__name__
+                            ))
+                    operation[2] = None
+
+    # Dev mode will reraise the first exception, noting its transform
+    #  since it otherwise shows up in whichever transform ran this.
+    if failure_list and Settings.developer:
+        transform_name, ex = failure_list[0]
+        raise Exception('Queued row operation of {} failed with {}: {}'.format(
+            transform_name,
+            type(ex).__name__,
+            ex
+            )) from ex
+
+
+# Path to a catalog from a prior run that Cleanup kept in place, to be
+#  updated incrementally by Write_Files, or None.
+Kept_prior_cat_path = None
           
 def Cleanup():
     '''
@@ -383,10 +539,39 @@ def Cleanup():
     if First_call:
         Init()
 
+    # Release any dat files held open by the catalog readers, since
+    #  source reading should be finished by this point.
+    Source_Reader.Close_Catalogs()
+
+    # When doing incremental catalog output, keep the prior catalog so
+    #  that its unchanged entries can be copied by Write_Files.
+    # This requires the prior catalog to still be the highest numbered
+    #  one, else it would be replaced by a dummy anyway, and both its
+    #  cat and dat to be unchanged since the prior run.
+    global Kept_prior_cat_path
+    kept_paths = []
+    prior_cat_path = Source_Reader.prior_customizer_cat_path
+    if (Settings.incremental_catalog_output
+    and Settings.output_to_catalog
+    and prior_cat_path != None
+    and not Source_Reader.prior_customizer_cat_needs_dummy
+    and Log_Old.File_Is_From_Last_Run(prior_cat_path.replace('.cat','.dat'))):
+        Kept_prior_cat_path = prior_cat_path
+        kept_paths = [prior_cat_path, prior_cat_path.replace('.cat','.dat')]
+
+        # Carry the kept files over to the new log, reusing the checked
+        #  hashes, so that they are still recognized as customizer output
+        #  if this run stops early.
+        for path in kept_paths:
+            Log_New.file_paths_written_hash_dict[path] = (
+                Log_Old.file_paths_written_hash_dict[path])
+
     # Find all files generated on a prior run, that still appear to be
     #  from that run (eg. were not changed externally), and remove
     #  them.
     for path in Log_Old.Get_File_Paths_From_Last_Run():
+        if path in kept_paths:
+            continue
         if os.path.exists(path):
             os.remove(path)
 
@@ -435,23 +620,30 @@ def Add_Source_Folder_Copies():
     #  are intended to be moved into the main folders, whether transformed
     #  or not, in keeping with behavior of older versions of the customizer.
     # These will do direct copies.
+    # Note: files loaded by transforms are keyed by their unpacked path,
+    #  so also gather their packed paths, to avoid copying an original
+    #  pck over the modified version.
+    # Files loaded but left unmodified are not written, so they still
+    #  get copied here.
+    paths_written = set(x for x, y in File_dict.items() if y.modified)
+    packed_paths_written = set(
+        Unpacked_Path_to_Packed_Path(x) for x in paths_written)
     for virtual_path, sys_path in Source_Reader.source_file_path_dict.items():
         # Skip files already written.
-        if virtual_path in File_dict:
+        if virtual_path in paths_written or virtual_path in packed_paths_written:
             continue
 
         # TODO:
         # Skip files which do not match anything in the game cat files,
         #  to avoid copying any misc stuff (backed up files, notes, etc.).
-        # This will need a function created to search cat files without
-        #  loading from them.
-
-        # Read the binary.
-        with open(sys_path, 'rb') as file:
-            binary = file.read()
+        # Source_Reader.Find_Catalog_Entry can check this without loading
+        #  from the cats, though new files the user intends to add (eg.
+        #  new models) would need to be kept somehow.
 
-        # Create the game file.
-        Add_File(Misc_File(binary = binary, virtual_path = virtual_path))
+        # Create the game file, which passes through the original bytes
+        #  when written, without holding them in memory until then.
+        Add_File(Raw_File(virtual_path = virtual_path,
+                          file_source_path = sys_path))
 
                 
 def Write_Files():
@@ -462,6 +654,9 @@ def Write_Files():
     Existing files which may conflict with the new writes will be renamed,
      including files of the same name as well as their .pck versions.
     '''
+    # Finish any queued row operations, since they may modify files.
+    Run_Row_Operations()
+
     # Add copies of leftover files from the user source folder.
     # Do this before the proper writeout, so it can reuse functionality.
     Add_Source_Folder_Copies()
@@ -478,10 +673,19 @@ def Write_Files():
             Settings.Get_Addon_Folder(),
             Source_Reader.Get_Next_Higher_Cat_Index() + '.cat')
     # Note: this path may be the same as used in a prior run, but
-    #  the prior cat file should have been removed by cleanup.
-    assert not os.path.exists(cat_path)
+    #  the prior cat file should have been removed by cleanup, unless
+    #  kept for incremental output.
+    assert not os.path.exists(cat_path) or cat_path == Kept_prior_cat_path
     cat_writer = Cat_Writer.Cat_Writer(cat_path)
 
+    # Allow reuse of entries from a kept prior catalog, if its entries
+    #  were packed the same way.
+    if (Kept_prior_cat_path != None
+    and os.path.exists(Kept_prior_cat_path)
+    and Log_Old.catalog_compression_level == Settings.compression_level):
+        cat_writer.Set_Prior_Catalog(
+            Kept_prior_cat_path, Log_Old.catalog_entry_hash_dict)
+
 
     # Loop over the files that were loaded.
     for file_name, file_object in File_dict.items():
@@ -561,13 +765,30 @@ def Write_Files():
     if cat_writer.game_files:
         cat_writer.Write()
 
-        # Log both the cat and dat files as written.
+        # Log both the cat and dat files as written, along with the
+        #  entry hashes for a later incremental write.
         Log_New.Record_File_Path_Written(cat_path)
         Log_New.Record_File_Path_Written(cat_path.replace('.cat','.dat'))
+        Log_New.catalog_entry_hash_dict = cat_writer.entry_hash_dict
+        Log_New.catalog_compression_level = Settings.compression_level
 
         # Refresh the log file.
         Log_New.Store()
 
+    # Remove a kept prior catalog if it was not overwritten, eg. when
+    #  nothing went to the catalog this run.
+    elif cat_writer.prior_cat_reader != None:
+        cat_writer.prior_cat_reader.Close()
+
+    if (Kept_prior_cat_path != None
+    and (Kept_prior_cat_path != cat_path or not cat_writer.game_files)):
+        for path in [Kept_prior_cat_path,
+                     Kept_prior_cat_path.replace('.cat','.dat')]:
+            if os.path.exists(path):
+                os.remove(path)
+            Log_New.file_paths_written_hash_dict.pop(path, None)
+        Log_New.Store()
+
     return
 
 
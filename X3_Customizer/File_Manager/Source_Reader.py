@@ -12,8 +12,12 @@ from collections import OrderedDict
 from .File_Types import *
 from .File_Paths import *
 from .Cat_Reader import *
+from .Cat_Cache import Cat_Cache
+from .T_File_Cache import T_File_Cache
+from . import Xor_Codec
 from .. import Common
 import gzip
+from concurrent.futures import ThreadPoolExecutor
 
 '''
 Notes on X3 Plugin Manager generated TWareT.pck file:
@@ -60,9 +64,11 @@ class Source_Reader_class:
     by matching a hash in the prior run's log) will be skipped.
     Files which were backed up on a prior run will be checked.
     
-    Cat files will be parsed as they are reached in the search order,
-    not before, to avoid excessive startup time when deeper cat files
-    may never be needed.
+    Cat files will be parsed the first time a file is searched for in
+    the catalogs, not during Init, to avoid startup time in runs that
+    never read from them (eg. cleanup). At that point all catalogs are
+    merged into a single index, so that later lookups do not need to
+    step through each catalog.
 
     Attributes:
     * source_file_path_dict
@@ -78,12 +84,13 @@ class Source_Reader_class:
         by priority, where the first entry is the highest priority cat.
       - Early catalogs are from the addon folder, later catalogs are from
         the base x3 folder.
-      - Dict entries are initially None, and get replaced with Catalog_Files
-        as the cats are searched.
-    * file_to_cat_dict
-      - Dict, keyed by file name, with the Cat_Reader object that holds
-        the file with the highest priority.
-      - Used for code result reuse, and is not an exhaustive list.
+      - Dict entries are initially None, and get replaced with Cat_Readers
+        when the catalog index is built.
+    * catalog_index_dict
+      - Dict, keyed by cat path (packed or unpacked, as named in the
+        catalogs), holding the Cat_Entry from the highest priority
+        catalog containing that path.
+      - None until built on the first catalog lookup.
     * prior_customizer_cat_path
       - String, path for any catalog file from a prior customizer run.
       - The dat file has a matched path, changing extension.
@@ -100,7 +107,7 @@ class Source_Reader_class:
     def __init__(s):
         s.source_file_path_dict = {}
         s.catalog_file_dict = OrderedDict()
-        s.file_to_cat_dict = {}
+        s.catalog_index_dict = None
         s.prior_customizer_cat_path = None
         s.prior_customizer_cat_needs_dummy = False
 
@@ -157,6 +164,14 @@ class Source_Reader_class:
         #  first since it is lower priority.
         for path in [Settings.Get_X3_Folder(), Settings.Get_Addon_Folder()]:
 
+            # List the folder once, to avoid a file system check for every
+            #  cat index. Names are lowercased, since windows file names
+            #  are not case sensitive.
+            if os.path.isdir(path):
+                folder_file_names = set(x.lower() for x in os.listdir(path))
+            else:
+                folder_file_names = set()
+
             # Loop until a cat index not found.
             cat_index = 1
             while 1:
@@ -168,7 +183,7 @@ class Source_Reader_class:
                 cat_path = os.path.join(path, cat_name)
 
                 # Stop if the cat file is not found.
-                if not os.path.exists(cat_path):
+                if cat_name not in folder_file_names:
                     break
 
                 # Record the path if the cat is not from a prior run.
@@ -206,10 +221,109 @@ class Source_Reader_class:
         # Fill in dict entries with the list paths, in reverse order.
         for path in reversed(cat_dir_list_low_to_high):
             s.catalog_file_dict[path] = None
+
+        # Clear any index from a prior Init; it will be rebuilt on the
+        #  next lookup, or right away if loading eagerly.
+        s.catalog_index_dict = None
+        if Settings.eager_catalog_loading:
+            s.Build_Catalog_Index()
             
         return
 
 
+    def Build_Catalog_Index(s):
+        '''
+        Parses all catalogs, and fills in catalog_index_dict with the
+        highest priority entry for every file path they contain.
+        '''
+        s.catalog_index_dict = {}
+
+        # Create readers for any cats not yet parsed.
+        # When loading eagerly, parse them across threads, mainly to
+        #  overlap file reads; the readers are put back in priority order
+        #  either way.
+        unparsed_cat_files = [cat_file for cat_file, cat_reader 
+                              in s.catalog_file_dict.items()
+                              if cat_reader == None]
+        if Settings.eager_catalog_loading and len(unparsed_cat_files) > 1:
+            with ThreadPoolExecutor(
+                    max_workers = Settings.Get_Parallel_Workers()) as executor:
+                cat_readers = list(executor.map(Cat_Reader, unparsed_cat_files))
+        else:
+            cat_readers = [Cat_Reader(x) for x in unparsed_cat_files]
+        for cat_file, cat_reader in zip(unparsed_cat_files, cat_readers):
+            s.catalog_file_dict[cat_file] = cat_reader
+
+        # Loop over the cats in priority order, highest first.
+        for priority, (cat_file, cat_reader) in enumerate(
+                s.catalog_file_dict.items()):
+
+            for cat_path, size in cat_reader.file_size_dict.items():
+                # Skip paths already claimed by a higher priority cat.
+                if cat_path in s.catalog_index_dict:
+                    continue
+                s.catalog_index_dict[cat_path] = Cat_Entry(
+                    cat_reader = cat_reader,
+                    cat_path   = cat_path,
+                    offset     = cat_reader.file_offset_dict[cat_path],
+                    size       = size,
+                    packed     = Is_Packed_Path(cat_path),
+                    priority   = priority,
+                    )
+
+        # Save any newly parsed catalogs for the next run.
+        Cat_Cache.Store()
+        return
+
+
+    def Find_Catalog_Entry(s, virtual_path):
+        '''
+        Returns the Cat_Entry for the highest priority catalog version
+        of the given file, or None if no catalog holds it.
+        Packed versions take precedence over unpacked versions
+        found in the same catalog.
+
+        * virtual_path
+          - String, virtual path of the file to look up, using the
+            unpacked extension.
+        '''
+        if s.catalog_index_dict == None:
+            s.Build_Catalog_Index()
+
+        # Get the cat versions of the file path.
+        cat_path = Virtual_Path_to_Cat_Path(virtual_path)
+        cat_path_pck = Unpacked_Path_to_Packed_Path(cat_path)
+
+        # Check the pck and standard versions, keeping the one from the
+        #  higher priority cat; the pck is checked first so that it wins
+        #  ties within one cat.
+        # (It is unclear on how the game handles a cat with both, though
+        #  it should be fine since the cats are expected to not mix packed
+        #  and unpacked versions.)
+        best_entry = None
+        for test_cat_path in [cat_path_pck, cat_path]:
+            # Skip empty packed paths.
+            if test_cat_path == None:
+                continue
+            entry = s.catalog_index_dict.get(test_cat_path)
+            if entry == None:
+                continue
+            if best_entry == None or entry.priority < best_entry.priority:
+                best_entry = entry
+        return best_entry
+
+
+    def Close_Catalogs(s):
+        '''
+        Closes any open dat files or memory maps held by the parsed
+        catalogs. Catalogs may still be read afterwards, reopening
+        their dat files as needed.
+        '''
+        for cat_reader in s.catalog_file_dict.values():
+            if cat_reader != None:
+                cat_reader.Close()
+
+
     def Get_Next_Higher_Cat_Index(s):
         '''
         Returns a 2-digit string, the next catalog index, 1 higher than
@@ -266,12 +380,11 @@ class Source_Reader_class:
             #  going on, but in short, the first byte xors with 0xC8
             #  to get a magic value to Xor with all other bytes, then
             #  that is all decompressed with gzip.
-            magic = file_binary[0] ^ 0xC8
-            file_binary = bytearray(x ^ magic for x in file_binary)
+            # The codec drops the first (magic) byte.
+            file_binary = Xor_Codec.Xor_Magic(file_binary)
 
             try:
-                # Toss the first byte for this.
-                decompressed_binary = gzip.decompress(file_binary[1:])
+                decompressed_binary = gzip.decompress(file_binary)
             except Exception as ex:
                 if Settings.developer:
                     # Dev mode will give a little extra info.
@@ -284,51 +397,33 @@ class Source_Reader_class:
         return decompressed_binary
 
 
-    def Read(s, 
-             virtual_path,
-             error_if_not_found = True,
-             copy_to_source_folder = False
-             ):
+    def Find_Source(s, virtual_path):
         '''
-        Returns a Game_File including the contents read from the
-         source folder or unpacked from a cat file.
-        Contents may be binary or text, depending on the Game_File subclass.
-        This will search for packed versions as well, automatically unzipping
-         the contents.
-        If the file contents are empty, this returns None; this may occur
-         for LU dummy files.
-         
+        Finds where the contents of a file would be read from, checking
+         the source folder, then loose files, then the cat/dat pairs,
+         without reading the file itself.
+        Returns a tuple of (file_source_path, cat_entry, is_zipped), or
+         None if the file is not found.
+        
         * virtual_path
           - String, virtual path of the file to look up.
           - For files which may be gzipped into a pck file, give the
             expected non-zipped extension (.xml, .txt, etc.).
-        * error_if_not_found
-          - Bool, if True an exception will be thrown if the file cannot
-            be found, otherwise None is returned.
-        * copy_to_source_folder
-          - Bool, if True and the file is read from a cat/dat pair, then
-            a copy of the data will be placed into the source folder.
-          - The copy is made after any unzipping is applied.
-          - Pending development.
+
+        Returned values:
+        * file_source_path
+          - String, sys path of the loose file or cat file holding
+            the contents.
+        * cat_entry
+          - Cat_Entry for the contents if in a catalog, else None.
+        * is_zipped
+          - Bool, True if the contents were found in a packed form,
+            and need unzipping.
         '''
-        # Grab the extension.
-        file_extension = virtual_path.rsplit('.',1)[1]
         # Determine the name for a possibly packed version.
         # This is None if the file is not expected to be packed.
         virtual_path_pck = Unpacked_Path_to_Packed_Path(virtual_path)
 
-        # Flag to indicate if the binary was loaded from a pck file, and
-        #  needs unzipping.
-        file_binary_is_zipped = False
-        
-
-        # Binary data read from a file.
-        # Once a source is found, this will be filled in, so later
-        #  source checks can be skipped once this is not None.
-        file_binary = None
-        # For debug, the path of the file sourced from, maybe a cat.
-        file_source_path = None
-
         # Check the source folder.
         # This could do a full path check, but will reuse the parsed
         #  files found during Init.
@@ -341,22 +436,15 @@ class Source_Reader_class:
             if test_virtual_path not in s.source_file_path_dict:
                 continue
 
-            # Open the file and grab the binary data.
-            # If this needs to be treated as text, it will be
-            #  reinterpretted elsewhere.
-            file_source_path = s.source_file_path_dict[test_virtual_path]
-            with open(file_source_path, 'rb') as file:
-                file_binary = file.read()
-                # If it was pck, clarify as zipped.
-                file_binary_is_zipped = test_virtual_path == virtual_path_pck
-                
-            # Don't check the other suffix after a match is found.
-            break
+            # If it was pck, clarify as zipped.
+            return (s.source_file_path_dict[test_virtual_path],
+                    None,
+                    test_virtual_path == virtual_path_pck)
 
 
         # Check for a loose file outside the source folder, unless
         #  this is disabled in the settings.
-        if file_binary == None and Settings.ignore_loose_files == False:
+        if Settings.ignore_loose_files == False:
             sys_path = Virtual_Path_to_System_Path(virtual_path)
             sys_path_pck = Unpacked_Path_to_Packed_Path(sys_path)
 
@@ -392,64 +480,100 @@ class Source_Reader_class:
                 if file_path_to_source == None:
                     continue
 
-                # Load from the selected file.
-                file_source_path = file_path_to_source
-                with open(file_path_to_source, 'rb') as file:
-                    file_binary = file.read()
-                    # If it was pck, clarify as zipped.
-                    # (Use the test_sys_path, since the actual path may
-                    #  have a backup extension.)
-                    file_binary_is_zipped = test_sys_path == sys_path_pck
+                # If it was pck, clarify as zipped.
+                # (Use the test_sys_path, since the actual path may
+                #  have a backup extension.)
+                return (file_path_to_source,
+                        None,
+                        test_sys_path == sys_path_pck)
 
 
-        # If still no binary found, check the cat/dat pairs.
+        # Check the cat/dat pairs.
         # Special check: if looking for a script, they are never
         #  in the cat/dats, so can skip checks early.
         # Note: it is possible unpacked versions of files (with a packed
         #  version) are not recognized in catalogs by the game, but this
         #  will look for them anyway.
-        if (file_binary == None
-        and not virtual_path.startswith('scripts/')):
-
-            # Get the cat versions of the file path.
-            cat_path = Virtual_Path_to_Cat_Path(virtual_path)
-            cat_path_pck = Unpacked_Path_to_Packed_Path(cat_path)
-
-            # Loop over the cats in priority order.
-            for cat_file, cat_reader in s.catalog_file_dict.items():
-
-                # If the reader hasn't been created, make it.
-                if cat_reader == None:
-                    cat_reader = Cat_Reader(cat_file)
-                    s.catalog_file_dict[cat_file] = cat_reader
-
-                # Loop over the pck and standard versions.
-                # Note: this is done in the inner loop, checking each cat
-                #  for a pck or non-pck before moving on to the next.
-                # (It is unclear on how the game handles this, though it
-                #  should be fine since the cats are expected to not
-                #  mix packed and unpacked versions.)
-                for test_cat_path in [cat_path_pck, cat_path]:
-                    
-                    # Skip empty packed paths.
-                    if test_cat_path == None:
-                        continue
-
-                    # Check the cat for the file.
-                    file_binary = cat_reader.Read(test_cat_path)
-                    if file_binary == None:
-                        continue
-
-                    # If it returned something, then it matched, so can
-                    #  stop searching.
-                    file_source_path = cat_file
-                    # If it was pck, clarify as zipped.
-                    file_binary_is_zipped = test_cat_path == cat_path_pck
-                    break
+        if not virtual_path.startswith('scripts/'):
 
-                # Stop looping over cats once a match found.
-                if file_binary != None:
-                    break
+            # Look up the highest priority catalog holding the file.
+            cat_entry = s.Find_Catalog_Entry(virtual_path)
+            if cat_entry != None:
+                # If it was pck, clarify as zipped.
+                return (cat_entry.cat_reader.cat_path,
+                        cat_entry,
+                        cat_entry.packed)
+
+        return None
+
+
+    def File_Exists(s, virtual_path):
+        '''
+        Returns True if a non-empty source for the given file is found,
+        checking the source folder, loose files, and catalogs, without
+        reading any file contents.
+        Note: a found file may still fail to load, eg. if it is a packed
+        empty LU dummy file, or cannot be unzipped.
+
+        * virtual_path
+          - String, virtual path of the file to look up.
+        '''
+        source = s.Find_Source(virtual_path)
+        if source == None:
+            return False
+        file_source_path, cat_entry, _ = source
+        # Empty files are treated as missing, as in Read.
+        if cat_entry != None:
+            return cat_entry.size > 0
+        return os.path.getsize(file_source_path) > 0
+
+
+    def Read(s, 
+             virtual_path,
+             error_if_not_found = True,
+             copy_to_source_folder = False
+             ):
+        '''
+        Returns a Game_File including the contents read from the
+         source folder or unpacked from a cat file.
+        Contents may be binary or text, depending on the Game_File subclass.
+        This will search for packed versions as well, automatically unzipping
+         the contents.
+        If the file contents are empty, this returns None; this may occur
+         for LU dummy files.
+         
+        * virtual_path
+          - String, virtual path of the file to look up.
+          - For files which may be gzipped into a pck file, give the
+            expected non-zipped extension (.xml, .txt, etc.).
+        * error_if_not_found
+          - Bool, if True an exception will be thrown if the file cannot
+            be found, otherwise None is returned.
+        * copy_to_source_folder
+          - Bool, if True and the file is read from a cat/dat pair, then
+            a copy of the data will be placed into the source folder.
+          - The copy is made after any unzipping is applied.
+          - Pending development.
+        '''
+        # Grab the extension.
+        file_extension = virtual_path.rsplit('.',1)[1]
+
+        # Binary data read from a file.
+        file_binary = None
+        # For debug, the path of the file sourced from, maybe a cat.
+        file_source_path = None
+
+        # Look up where the file is, and read its binary data.
+        # If this needs to be treated as text, it will be
+        #  reinterpretted elsewhere.
+        source = s.Find_Source(virtual_path)
+        if source != None:
+            file_source_path, cat_entry, file_binary_is_zipped = source
+            if cat_entry != None:
+                file_binary = cat_entry.cat_reader.Read(cat_entry.cat_path)
+            else:
+                with open(file_source_path, 'rb') as file:
+                    file_binary = file.read()
 
 
         # If no binary was found, error.
@@ -474,6 +598,10 @@ class Source_Reader_class:
         # Some special lookups will be done for select files.
         if virtual_path == 'types/Globals.txt':
             game_file_class = Globals_File       
+        elif virtual_path.startswith('t/') and file_extension == 'xml':
+            game_file_class = Language_File
+        elif virtual_path == 'maps/x3_universe.xml':
+            game_file_class = Universe_File
         elif file_extension == 'xml':
             game_file_class = XML_File         
         elif file_extension == 'obj':
@@ -483,14 +611,23 @@ class Source_Reader_class:
         else:
             raise Exception('File type for {} not understood.'.format(virtual_path))
 
-        # Construct the game file.
+        # T files may have their parsed contents cached from a prior run.
+        game_file = None
+        if game_file_class == T_File:
+            game_file = T_File_Cache.Get(
+                file_binary, virtual_path, file_source_path)
+
+        # Construct the game file, if not cached.
         # These will also record the path used, to help know where to place
         #  an edited file in the folder structure.
-        game_file = game_file_class(
-            file_binary = file_binary,
-            virtual_path = virtual_path,
-            file_source_path = file_source_path,
-            )
+        if game_file == None:
+            game_file = game_file_class(
+                file_binary = file_binary,
+                virtual_path = virtual_path,
+                file_source_path = file_source_path,
+                )
+            if game_file_class == T_File:
+                T_File_Cache.Record(game_file, file_binary)
 
         if Settings.write_file_source_paths_to_message_log:
             Write_Summary_Line(
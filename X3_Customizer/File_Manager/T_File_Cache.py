@@ -0,0 +1,145 @@
+'''
+Support for caching parsed t file contents across runs.
+
+The same t files (TShips, TBullets, Jobs, etc.) are typically read
+unchanged on every run, and splitting them into labelled fields takes
+a good share of the time spent loading them. When enabled, the parsed
+contents of each t file are pickled to a folder in the log folder.
+
+Each cache entry is keyed by a hash of the source file contents along
+with the File_Fields entries used to label that file, so that changes
+to either the source or the known fields will miss the cache and parse
+the file again. Only the latest entry for each t file name is kept.
+Entries that fail to load for any reason are ignored.
+'''
+import os
+import pickle
+import hashlib
+from ..Common.Settings import Settings
+from . import File_Fields
+from .File_Types import T_File
+
+# Version of the cache format; entries of other versions are ignored.
+_cache_version = 1
+
+# Extension for cache entry files.
+_entry_extension = '.pickle'
+
+
+class T_File_Cache_class:
+    '''
+    Cache of parsed t file contents.
+
+    Attributes:
+    * schema_hash_dict
+      - Dict, keyed by t file name, holding a hash string of the
+        File_Fields entries for that file.
+    '''
+    def __init__(s):
+        s.schema_hash_dict = {}
+
+
+    def Get_Schema_Hash(s, name):
+        '''
+        Returns a hash string of the field names and types in File_Fields
+        that apply to the given t file name, along with the cache version.
+        '''
+        if name not in s.schema_hash_dict:
+            field_dict = File_Fields.T_file_name_field_dict_dict.get(name, {})
+            schema_list = [
+                _cache_version,
+                sorted(field_dict.items(), key = str),
+                sorted(File_Fields.T_file_name_field_type_dict_dict.get(
+                    name, {}).items()),
+                ]
+            # Include the ap variant of the fields, if there is one.
+            if 'ap_name' in field_dict:
+                schema_list.append(sorted(
+                    File_Fields.T_file_name_field_dict_dict[
+                        field_dict['ap_name']].items(), key = str))
+            s.schema_hash_dict[name] = hashlib.sha256(
+                repr(schema_list).encode()).hexdigest()
+        return s.schema_hash_dict[name]
+
+
+    def Get_Entry_Path(s, name, file_binary):
+        '''
+        Returns the sys path for the cache entry of the given t file name
+        and source binary.
+        '''
+        hasher = hashlib.sha256(s.Get_Schema_Hash(name).encode())
+        hasher.update(file_binary)
+        return os.path.join(Settings.Get_T_File_Cache_Folder_Path(),
+                            name + '.' + hasher.hexdigest() + _entry_extension)
+
+
+    def Get(s, file_binary, virtual_path, file_source_path = None):
+        '''
+        Returns a T_File restored from the cache for the given source
+        binary, or None if caching is disabled or there is no entry.
+        '''
+        if not Settings.use_t_file_cache:
+            return None
+        name = virtual_path.split('/')[-1]
+        entry_path = s.Get_Entry_Path(name, file_binary)
+        if not os.path.exists(entry_path):
+            return None
+        try:
+            with open(entry_path, 'rb') as file:
+                parsed_state = pickle.load(file)
+            return T_File(
+                parsed_state = parsed_state,
+                virtual_path = virtual_path,
+                file_source_path = file_source_path,
+                )
+        except Exception:
+            if Settings.verbose:
+                print('T file cache entry {} could not be read;'
+                      ' parsing the file fresh.'.format(entry_path))
+            return None
+
+
+    def Record(s, t_file, file_binary):
+        '''
+        Record the parsed contents of a newly read t_file, parsed from
+        the given source binary, replacing any older entries for files
+        of the same name.
+        Problems writing the entry (eg. a read-only or full disk) are
+        reported as a warning, leaving the file uncached.
+        '''
+        if not Settings.use_t_file_cache:
+            return
+        entry_path = s.Get_Entry_Path(t_file.name, file_binary)
+        folder, entry_name = os.path.split(entry_path)
+        temp_path = entry_path + '.tmp'
+        try:
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+            # Remove stale entries for this file name.
+            for old_entry_name in os.listdir(folder):
+                if (old_entry_name != entry_name
+                and old_entry_name.endswith(_entry_extension)
+                and old_entry_name.rsplit('.', 2)[0] == t_file.name):
+                    os.remove(os.path.join(folder, old_entry_name))
+
+            # Write to a temp file and swap it in, so that an interrupted
+            #  write does not leave a partial entry.
+            with open(temp_path, 'wb') as file:
+                pickle.dump(t_file.Get_Parsed_State(), file,
+                            protocol = pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, entry_path)
+        except Exception as ex:
+            print('Warning: t file cache entry {} could not be written'
+                  ' due to a {} exception.'.format(
+                      entry_path, type(ex).__name__))
+            # Clean out any temp file left over from the error.
+            try:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            except Exception:
+                pass
+
+
+# Single, global copy of the cache.
+T_File_Cache = T_File_Cache_class()
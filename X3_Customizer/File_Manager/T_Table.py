@@ -0,0 +1,571 @@
+'''
+Compact storage for t file contents.
+
+T files can be large (eg. TShips with ~1000 lines of 60+ fields), and
+representing every line as its own OrderedDict makes for a very large
+number of small objects. Instead, a T_Table stores field values in
+columns, one list per field key, and hands out T_Row views which
+act like an OrderedDict of a single line.
+
+Lines in a table do not all have the same fields (eg. header lines,
+or ware lists of differing lengths), so each line records a tuple
+of its field keys in order. Lines with the same keys share the same
+tuple object.
+
+Tables can also build hash indexes on a field, mapping each field
+value to the rows holding it, for constant time lookups. Once built,
+an index is updated on every edit to its field, and as lines are added.
+
+Field values may also be accessed as numbers through Get_Typed_Value
+and Set_Typed_Value (or the T_Row Get_Typed and Set_Typed methods).
+Parsed numbers are cached, so that repeated reads do not parse the
+field string again, and numbers that are set are only formatted back
+into field strings when the text is next needed, eg. when writing the
+file. Fields that are never set as numbers keep their original strings.
+
+Fields can also be scaled in bulk with Scale_Values, which works over
+a column at once, using numpy for the arithmetic when available.
+
+Lines that are edited or added are recorded as dirty, so that the
+owner of a table (eg. a T_File) can reuse the original text of the
+other lines when writing out, and can tell that it was modified.
+'''
+import copy
+
+# Conditional import of numpy, used to speed up bulk scaling.
+try:
+    import numpy
+    Numpy_available = True
+except:
+    Numpy_available = False
+
+
+class T_Table:
+    '''
+    Column-backed storage for the lines of a t file.
+
+    Attributes:
+    * column_dict
+      - Dict, keyed by field key (a field name, or an integer index
+        for unnamed fields), holding a list of field strings indexed
+        by line.
+      - Lines without the field hold None. Columns may be shorter than
+        the line count, in which case later lines do not have the field.
+    * line_keys_list
+      - List holding, for each line, a tuple of its field keys in order.
+    * row_list
+      - List of T_Row views, one for each line.
+    * keys_tuple_dict
+      - Dict keyed and valued by key tuples, used to share identical
+        tuples between lines.
+    * index_dict_dict
+      - Dict, keyed by field key, holding the index built for that field.
+      - Each index is a dict keyed by field string, holding a list of
+        the T_Rows with that value, in line order.
+    * field_type_dict
+      - Dict, keyed by field key, holding the type (eg. int) to convert
+        numbers to when they are set on the field.
+      - Fields are always parsed as int if possible, else float, so
+        that numbers read keep the form of their original string.
+    * typed_column_dict
+      - Dict, keyed by field key, holding a list of parsed field numbers
+        indexed by line, with None for lines not yet parsed.
+    * unformatted_dict
+      - Dict, keyed by field key, holding a set of the line indices
+        whose field string is out of date with a number that was set.
+    * dirty_index_set
+      - Set of the indices of lines that were edited or added.
+    * owner
+      - Optional object with a 'modified' attribute, which will be set
+        True on any line edit or addition.
+    '''
+    def __init__(s, field_type_dict = None):
+        s.column_dict = {}
+        s.line_keys_list = []
+        s.row_list = []
+        s.keys_tuple_dict = {}
+        s.index_dict_dict = {}
+        s.field_type_dict = field_type_dict if field_type_dict != None else {}
+        s.typed_column_dict = {}
+        s.unformatted_dict = {}
+        s.dirty_index_set = set()
+        s.owner = None
+
+
+    def Set_Lines(s, column_dict, line_keys_list):
+        '''
+        Fill an empty table with lines given as field string columns
+        and per-line key tuples, as in the column_dict and line_keys_list
+        attributes of another table (eg. one restored from a cache).
+        The new lines are not marked dirty.
+        '''
+        assert not s.line_keys_list
+        s.column_dict = column_dict
+        s.line_keys_list = [s.Get_Keys_Tuple(x) for x in line_keys_list]
+        s.row_list.extend(T_Row(s, index)
+                          for index in range(len(s.line_keys_list)))
+
+
+    def Get_Keys_Tuple(s, keys):
+        '''
+        Returns a shared tuple matching the given iterable of keys.
+        '''
+        keys = tuple(keys)
+        return s.keys_tuple_dict.setdefault(keys, keys)
+
+
+    def Get_Column(s, key, length, column_dict = None):
+        '''
+        Returns the column list for the given key, created if needed,
+        and padded with None to at least the given length.
+        Columns are taken from column_dict if given, else from the
+        field string columns.
+        '''
+        if column_dict == None:
+            column_dict = s.column_dict
+        column = column_dict.get(key)
+        if column == None:
+            column = column_dict[key] = []
+        if len(column) < length:
+            column.extend([None] * (length - len(column)))
+        return column
+
+
+    def Mark_Dirty(s, index):
+        '''
+        Records the line at the given index as edited, and flags the
+        owner as modified.
+        '''
+        s.dirty_index_set.add(index)
+        if s.owner != None:
+            s.owner.modified = True
+
+
+    def Add_Line(s, keys, values, row = None):
+        '''
+        Add a line to the end of the table.
+        Returns the T_Row view for the line.
+
+        * keys
+          - Iterable of field keys, in order.
+        * values
+          - Iterable of field strings, matching the keys.
+        * row
+          - Optional T_Row to bind to the new line, eg. a row detached
+            from another table; if None, a new T_Row is created.
+        '''
+        index = len(s.line_keys_list)
+        keys = s.Get_Keys_Tuple(keys)
+        column_dict = s.column_dict
+        for key, value in zip(keys, values):
+            # Columns are normally filled up to this line already, so
+            #  only fall back on Get_Column when that isn't the case.
+            column = column_dict.get(key)
+            if column == None or len(column) != index:
+                column = s.Get_Column(key, index)
+            column.append(value)
+        s.line_keys_list.append(keys)
+        s.Mark_Dirty(index)
+
+        if row == None:
+            row = T_Row(s, index)
+        else:
+            row.table = s
+            row.index = index
+        s.row_list.append(row)
+
+        # Update any indexes on this line's fields. Since this is the last
+        #  line, it goes at the end of the row lists.
+        for key, index_dict in s.index_dict_dict.items():
+            if key in keys:
+                value = s.column_dict[key][index]
+                index_dict.setdefault(value, []).append(row)
+        return row
+
+
+    def Add_Lines(s, keys, values_list):
+        '''
+        Add several lines with the same field keys to the end of the
+        table, filling each column for all of them at once.
+        This is quicker than Add_Line when parsing a file, since most
+        lines in a t file share the same keys.
+        Returns a list of the T_Row views for the lines.
+
+        * keys
+          - Iterable of field keys, in order.
+        * values_list
+          - List of lists of field strings, one for each line, each
+            matching the keys.
+        '''
+        start = len(s.line_keys_list)
+        end = start + len(values_list)
+        keys = s.Get_Keys_Tuple(keys)
+        # Transpose the lines into columns, and append each to its
+        #  field column.
+        for key, column_values in zip(keys, zip(*values_list)):
+            s.Get_Column(key, start).extend(column_values)
+        s.line_keys_list.extend([keys] * len(values_list))
+
+        rows = [T_Row(s, index) for index in range(start, end)]
+        s.row_list.extend(rows)
+        s.dirty_index_set.update(range(start, end))
+        if rows and s.owner != None:
+            s.owner.modified = True
+
+        # Update any indexes on these lines' fields.
+        for key, index_dict in s.index_dict_dict.items():
+            if key in keys:
+                column = s.column_dict[key]
+                for row in rows:
+                    index_dict.setdefault(column[row.index], []).append(row)
+        return rows
+
+
+    def Add_Row(s, entry):
+        '''
+        Add a line to the end of the table from an existing entry.
+        Returns the T_Row view for the line.
+
+        * entry
+          - T_Row or OrderedDict holding the line fields.
+          - A T_Row from another table (eg. a detached copy) is rebound
+            to this table, so that references to it see this table's
+            line; other entries have their fields copied into a new row.
+        '''
+        if isinstance(entry, T_Row) and entry.table is not s:
+            return s.Add_Line(list(entry.keys()), entry.values(), row = entry)
+        return s.Add_Line(list(entry.keys()), list(entry.values()))
+
+
+    def Get_Value(s, index, key):
+        '''
+        Returns the field string for a line and key.
+        Raises a KeyError if the line does not have the field.
+        '''
+        column = s.column_dict.get(key)
+        if column == None or index >= len(column) or column[index] == None:
+            raise KeyError(key)
+        # Bring the string up to date if a number was set.
+        if key in s.unformatted_dict and index in s.unformatted_dict[key]:
+            s.Format_Value(index, key)
+        return column[index]
+
+
+    def Set_Value(s, index, key, value):
+        '''
+        Sets the field string for a line and key. If the line does
+        not have the field, it is added after the existing fields.
+        '''
+        column = s.Get_Column(key, index + 1)
+        # Bring the old string up to date if a number was set.
+        if key in s.unformatted_dict and index in s.unformatted_dict[key]:
+            s.Format_Value(index, key)
+        old_value = column[index]
+        # Skip if nothing changes, leaving the line clean.
+        if old_value == value:
+            return
+        if old_value == None:
+            s.line_keys_list[index] = s.Get_Keys_Tuple(
+                s.line_keys_list[index] + (key,))
+        column[index] = value
+        s.Clear_Typed_Value(index, key)
+        s.Mark_Dirty(index)
+
+        if key in s.index_dict_dict:
+            if old_value != None:
+                s.Unindex_Row(key, old_value, index)
+            s.Index_Row(key, value, index)
+
+
+    def Delete_Value(s, index, key):
+        '''
+        Removes a field from a line.
+        Raises a KeyError if the line does not have the field.
+        '''
+        # Error check through the normal lookup.
+        old_value = s.Get_Value(index, key)
+        s.column_dict[key][index] = None
+        s.line_keys_list[index] = s.Get_Keys_Tuple(
+            x for x in s.line_keys_list[index] if x != key)
+        s.Clear_Typed_Value(index, key)
+        s.Mark_Dirty(index)
+
+        if key in s.index_dict_dict:
+            s.Unindex_Row(key, old_value, index)
+
+
+    def Get_Values(s, index):
+        '''
+        Returns a list of the field strings for a line, in order.
+        '''
+        # Bring all strings up to date if any numbers were set.
+        if s.unformatted_dict:
+            s.Format_Values()
+        column_dict = s.column_dict
+        return [column_dict[key][index] for key in s.line_keys_list[index]]
+
+
+    def Get_Typed_Value(s, index, key):
+        '''
+        Returns the field for a line and key as a number, parsing the
+        field string on first use, as an int if possible, else a float.
+        Raises a KeyError if the line does not have the field, or a
+        ValueError if the field string is not a number.
+        '''
+        typed_column = s.typed_column_dict.get(key)
+        if typed_column != None and index < len(typed_column):
+            value = typed_column[index]
+            if value != None:
+                return value
+
+        # Fields may be int or float; try both.
+        # The field type is not used here, since some fields hold both
+        #  forms (eg. a float field written as '1'), and the number
+        #  should format back to the same string.
+        text = s.Get_Value(index, key)
+        try:
+            value = int(text)
+        except ValueError:
+            value = float(text)
+        s.Get_Column(key, index + 1, s.typed_column_dict)[index] = value
+        return value
+
+
+    def Set_Typed_Value(s, index, key, value):
+        '''
+        Sets the field for a line and key from a number, converted to
+        the field type if one is known. The field string is formatted
+        when next needed, using str() of the number.
+        If the line does not have the field, it is added after the
+        existing fields.
+        '''
+        field_type = s.field_type_dict.get(key)
+        if field_type != None:
+            value = field_type(value)
+
+        # Skip if this matches the number already recorded, leaving
+        #  the line clean.
+        typed_column = s.typed_column_dict.get(key)
+        if (typed_column != None and index < len(typed_column)
+        and type(typed_column[index]) == type(value)
+        and typed_column[index] == value):
+            return
+
+        column = s.column_dict.get(key)
+        if (column == None or index >= len(column) or column[index] == None
+        or key in s.index_dict_dict):
+            # New fields and indexed fields get their strings right away,
+            #  to keep line keys and indexes up to date.
+            s.Set_Value(index, key, str(value))
+        else:
+            s.unformatted_dict.setdefault(key, set()).add(index)
+            s.Mark_Dirty(index)
+        s.Get_Column(key, index + 1, s.typed_column_dict)[index] = value
+
+
+    def Clear_Typed_Value(s, index, key):
+        '''
+        Drops any number recorded for a line and key, eg. after the
+        field string was changed.
+        '''
+        typed_column = s.typed_column_dict.get(key)
+        if typed_column != None and index < len(typed_column):
+            typed_column[index] = None
+        unformatted_set = s.unformatted_dict.get(key)
+        if unformatted_set != None:
+            unformatted_set.discard(index)
+            if not unformatted_set:
+                del(s.unformatted_dict[key])
+
+
+    def Format_Value(s, index, key):
+        '''
+        Updates the field string for a line and key from the number
+        that was set for it.
+        '''
+        s.column_dict[key][index] = str(s.typed_column_dict[key][index])
+        unformatted_set = s.unformatted_dict[key]
+        unformatted_set.discard(index)
+        if not unformatted_set:
+            del(s.unformatted_dict[key])
+
+
+    def Format_Values(s):
+        '''
+        Updates all field strings that are out of date with numbers
+        that were set.
+        '''
+        for key, unformatted_set in s.unformatted_dict.items():
+            column = s.column_dict[key]
+            typed_column = s.typed_column_dict[key]
+            for index in unformatted_set:
+                column[index] = str(typed_column[index])
+        s.unformatted_dict.clear()
+
+
+    def Scale_Values(s, key, index_list, factor_list, round_func = None):
+        '''
+        Scales the numbers of a field for many lines at once.
+        Returns a list of (index, old value, new value) tuples.
+
+        * key
+          - Field key to scale.
+        * index_list
+          - List of line indices to scale.
+        * factor_list
+          - List of multipliers, one for each line index.
+        * round_func
+          - Optional function applied to each scaled number, returning
+            either the number to store, or a formatted field string.
+        '''
+        value_list = [s.Get_Typed_Value(index, key) for index in index_list]
+
+        if Numpy_available:
+            # Convert back to python numbers for rounding and formatting.
+            new_value_list = (numpy.array(value_list) 
+                              * numpy.array(factor_list)).tolist()
+        else:
+            new_value_list = [x * y for x, y in zip(value_list, factor_list)]
+
+        if round_func != None:
+            new_value_list = [round_func(x) for x in new_value_list]
+
+        for index, new_value in zip(index_list, new_value_list):
+            if isinstance(new_value, str):
+                s.Set_Value(index, key, new_value)
+            else:
+                s.Set_Typed_Value(index, key, new_value)
+        return list(zip(index_list, value_list, new_value_list))
+
+
+    def Get_Index(s, key):
+        '''
+        Returns the index for a field key, building it on first use.
+        The index is a dict keyed by field string, holding a list of the
+        T_Rows with that value, in line order. It should not be edited
+        directly.
+        '''
+        if key not in s.index_dict_dict:
+            if key in s.unformatted_dict:
+                s.Format_Values()
+            index_dict = {}
+            row_list = s.row_list
+            for index, value in enumerate(s.column_dict.get(key, [])):
+                if value == None:
+                    continue
+                index_dict.setdefault(value, []).append(row_list[index])
+            s.index_dict_dict[key] = index_dict
+        return s.index_dict_dict[key]
+
+
+    def Index_Row(s, key, value, index):
+        '''
+        Adds the row for a line to the index for a field key, under the
+        given value, keeping the row list in line order.
+        '''
+        this_row_list = s.index_dict_dict[key].setdefault(value, [])
+        position = len(this_row_list)
+        while position > 0 and this_row_list[position - 1].index > index:
+            position -= 1
+        this_row_list.insert(position, s.row_list[index])
+
+
+    def Unindex_Row(s, key, value, index):
+        '''
+        Removes the row for a line from the index for a field key, where
+        it was recorded under the given value.
+        '''
+        index_dict = s.index_dict_dict[key]
+        this_row_list = index_dict[value]
+        this_row_list.remove(s.row_list[index])
+        if not this_row_list:
+            del(index_dict[value])
+
+
+class T_Row:
+    '''
+    View of a single line in a T_Table, supporting the uses of an
+    OrderedDict of the line fields: lookup, assignment and deletion
+    by key, iteration over keys in order, keys/values/items, get,
+    len, and membership checks.
+
+    Copies made with copy.copy or copy.deepcopy are detached from the
+    original table, holding their own single line table, and may be
+    added to a t file with T_File.Add_Entries.
+
+    Attributes:
+    * table
+      - T_Table holding the line.
+    * index
+      - Int, index of the line in the table.
+
+    Transforms may also annotate rows with extra attributes (eg.
+    template_name on new ship variants); these go in an instance dict
+    which is only created when used.
+    '''
+    __slots__ = ('table', 'index', '__dict__')
+
+    def __init__(s, table, index):
+        s.table = table
+        s.index = index
+
+    def __getitem__(s, key):
+        return s.table.Get_Value(s.index, key)
+
+    def __setitem__(s, key, value):
+        s.table.Set_Value(s.index, key, value)
+
+    def __delitem__(s, key):
+        s.table.Delete_Value(s.index, key)
+
+    def __contains__(s, key):
+        return key in s.table.line_keys_list[s.index]
+
+    def __iter__(s):
+        return iter(s.table.line_keys_list[s.index])
+
+    def __len__(s):
+        return len(s.table.line_keys_list[s.index])
+
+    def __repr__(s):
+        return 'T_Row({})'.format(list(s.items()))
+
+    def keys(s):
+        'Returns a tuple of the field keys, in order.'
+        return s.table.line_keys_list[s.index]
+
+    def values(s):
+        'Returns a list of the field strings, in order.'
+        return s.table.Get_Values(s.index)
+
+    def items(s):
+        'Returns a list of (key, field string) tuples, in order.'
+        return list(zip(s.keys(), s.values()))
+
+    def get(s, key, default = None):
+        'Returns the field string for the key, or default if not present.'
+        if key in s:
+            return s[key]
+        return default
+
+    def Get_Typed(s, key):
+        'Returns the field for the key as a number, parsed once and cached.'
+        return s.table.Get_Typed_Value(s.index, key)
+
+    def Set_Typed(s, key, value):
+        'Sets the field for the key from a number.'
+        s.table.Set_Typed_Value(s.index, key, value)
+
+    def __copy__(s):
+        # Build a separate single line table for the copy, keeping
+        #  the field types.
+        new_row = T_Table(s.table.field_type_dict).Add_Line(
+            s.keys(), s.values())
+        new_row.__dict__.update(s.__dict__)
+        return new_row
+
+    def __deepcopy__(s, memo):
+        new_row = T_Table(s.table.field_type_dict).Add_Line(
+            s.keys(), copy.deepcopy(s.values(), memo))
+        new_row.__dict__.update(copy.deepcopy(s.__dict__, memo))
+        return new_row
@@ -0,0 +1,141 @@
+'''
+Support for the xor encodings used by cat/dat pairs and some loose
+pck files.
+See Cat_Reader for details on catalog files.
+
+There are three encodings in use:
+* Cat files are xored with a running value, starting at 0xDB and
+  incrementing (mod 256) on each byte.
+* Dat files are xored with a fixed 0x33.
+* Older, x2 style pck files (eg. as generated by the X3 Plugin Manager)
+  start with a magic byte; that byte xored with 0xC8 gives the value
+  to xor all following bytes with.
+
+Xor is its own inverse, so the same functions handle both encoding
+and decoding.
+
+Note: python loops over individual bytes are quite slow for multi-MB
+files (eg. x3story.obj), so these functions avoid them:
+* Fixed xors use a 256-entry translation table with bytes.translate.
+* Running xors tile a precomputed 256-byte key stream across the
+  data, and apply it using python's big integer xor.
+'''
+
+# Translation tables for fixed xor values, keyed by xor value.
+# Filled in on first use of each value.
+_xor_table_dict = {}
+
+def _Get_Xor_Table(xor_value):
+    '''
+    Returns a 256-byte translation table which xors each byte
+    with xor_value.
+    '''
+    if xor_value not in _xor_table_dict:
+        _xor_table_dict[xor_value] = bytes(
+            x ^ xor_value for x in range(256))
+    return _xor_table_dict[xor_value]
+
+
+# Key streams for running xors, keyed by starting xor value.
+# Each holds one full 256-byte period of the running value.
+_key_stream_dict = {}
+
+def _Get_Key_Stream(start_value):
+    '''
+    Returns a 256-byte key stream for a running xor that starts at
+    start_value and increments on each byte.
+    '''
+    if start_value not in _key_stream_dict:
+        _key_stream_dict[start_value] = bytes(
+            (start_value + x) % 256 for x in range(256))
+    return _key_stream_dict[start_value]
+
+
+def Xor_Fixed(binary, xor_value = 0x33):
+    '''
+    Xor every byte of the binary with a fixed value.
+    Returns a new bytearray.
+
+    * binary
+      - Bytes, bytearray, or other buffer (eg. memoryview) to xor.
+    * xor_value
+      - Int, the value to xor with. Defaults to 0x33, as used
+        in dat files.
+    '''
+    # bytearray.translate returns a new bytearray, which transforms
+    #  may rely on for mutability (mainly obj code).
+    # Other buffer types (bytes, memoryview) need a conversion first.
+    if not isinstance(binary, bytearray):
+        binary = bytearray(binary)
+    return binary.translate(_Get_Xor_Table(xor_value))
+
+
+def Xor_Running(binary, start_value = 0xDB):
+    '''
+    Xor the binary with a running value which increments on each byte.
+    Returns a new bytearray.
+
+    * binary
+      - Bytes, bytearray, or other buffer to xor.
+    * start_value
+      - Int, the xor value for the first byte. Defaults to 0xDB, as
+        used in cat files.
+    '''
+    length = len(binary)
+    if length == 0:
+        return bytearray()
+
+    # Tile the key stream to cover the full binary, then trim.
+    key_stream = _Get_Key_Stream(start_value)
+    key = (key_stream * (length // 256 + 1))[:length]
+
+    # Xor as big integers; byte order just needs to be consistent.
+    result = (int.from_bytes(binary, 'big')
+              ^ int.from_bytes(key, 'big'))
+    return bytearray(result.to_bytes(length, 'big'))
+
+
+def Xor_Magic(binary):
+    '''
+    Decode an x2 style binary, where the first byte xored with 0xC8
+    gives a magic value to xor all following bytes with.
+    Returns a new bytearray, with the magic byte removed.
+
+    * binary
+      - Bytes, bytearray, or other buffer to decode.
+    '''
+    magic = binary[0] ^ 0xC8
+    return Xor_Fixed(memoryview(binary)[1:], magic)
+
+
+def Decode_Cat(binary):
+    '''
+    Decode cat file binary into text.
+    Returns a raw text string, with one character per byte.
+    '''
+    # Latin-1 maps each byte directly to the same character code.
+    return Xor_Running(binary).decode('latin-1')
+
+
+def Encode_Cat(binary):
+    '''
+    Encode cat binary using a running xor.
+    Returns a bytearray.
+    '''
+    return Xor_Running(binary)
+
+
+def Decode_Dat(binary):
+    '''
+    Decode dat binary, xored with 0x33.
+    Returns a bytearray.
+    '''
+    return Xor_Fixed(binary, 0x33)
+
+
+def Encode_Dat(binary):
+    '''
+    Encode dat binary using an xor with 0x33.
+    Returns a bytearray.
+    '''
+    return Xor_Fixed(binary, 0x33)
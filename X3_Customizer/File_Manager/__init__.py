@@ -1,6 +1,8 @@
 
 # Support easy import of some key functions used by transforms.
 from .Misc import Load_File
+from .Misc import File_Exists
+from .Misc import Apply_Row_Operation
 from .Misc import Transform_Wrapper
 from .Misc import Cleanup
 from .Misc import Write_Files
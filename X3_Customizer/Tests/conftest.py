@@ -0,0 +1,11 @@
+'''
+Test setup: makes the X3_Customizer package importable, along with its
+top level modules (eg. Change_Log) which are imported by name.
+'''
+import sys
+from pathlib import Path
+
+package_dir = Path(__file__).resolve().parent.parent
+for path in [str(package_dir.parent), str(package_dir)]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,122 @@
+'''
+Checks storing of the catalog cache file.
+'''
+import json
+import os
+import pytest
+from X3_Customizer.Common.Settings import Settings
+from X3_Customizer.File_Manager import Cat_Cache
+
+
+@pytest.fixture
+def log_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(Settings, 'path_to_log_folder', str(tmp_path))
+    return tmp_path
+
+
+def _Make_Cache(entries):
+    cache = Cat_Cache.Cat_Cache_class()
+    cache.loaded = True
+    cache.modified = True
+    cache.cat_dict = {'addon/01.cat' : {'entries' : entries}}
+    cache.cat_paths_used = {'addon/01.cat'}
+    return cache
+
+
+def test_store_and_load(log_folder):
+    _Make_Cache([['types/TShips.pck', 10]]).Store()
+    assert os.listdir(str(log_folder)) == [Settings.catalog_cache_file_name]
+
+    cache = Cat_Cache.Cat_Cache_class()
+    cache.Load()
+    assert cache.cat_dict['addon/01.cat']['entries'] == [['types/TShips.pck', 10]]
+
+
+def test_interrupted_store(log_folder, monkeypatch):
+    _Make_Cache([['types/TShips.pck', 10]]).Store()
+    path = Settings.Get_Catalog_Cache_File_Path()
+    with open(path) as file:
+        original_text = file.read()
+
+    # Fail partway through writing a new cache.
+    def Failing_Dump(obj, file):
+        file.write('{"version": ')
+        raise KeyboardInterrupt()
+    monkeypatch.setattr(json, 'dump', Failing_Dump)
+    with pytest.raises(KeyboardInterrupt):
+        _Make_Cache([['types/TBullets.pck', 20]]).Store()
+
+    # The prior cache is intact, and no temp file is left behind.
+    with open(path) as file:
+        assert file.read() == original_text
+    assert os.listdir(str(log_folder)) == [Settings.catalog_cache_file_name]
+
+
+@pytest.fixture
+def cat_path(log_folder, monkeypatch):
+    '''
+    Sets up a cat file in an x3 folder, with the catalog cache on.
+    Returns the cat path.
+    '''
+    monkeypatch.setattr(Settings, 'path_to_x3_folder', str(log_folder))
+    monkeypatch.setattr(Settings, 'use_catalog_cache', True)
+    (log_folder / 'addon').mkdir()
+    path = log_folder / 'addon' / '01.cat'
+    path.write_bytes(b'01.dat\r\ntypes/TShips.pck 10\r\n')
+    return str(path)
+
+
+def _Record_And_Store(cat_path, entries):
+    cache = Cat_Cache.Cat_Cache_class()
+    cache.Record(cat_path, entries)
+    cache.Store()
+
+
+@pytest.mark.parametrize('edit', ['size', 'mtime', 'header'])
+def test_stale_entry_is_rebuilt(cat_path, edit):
+    _Record_And_Store(cat_path, [('types/TShips.pck', 10)])
+    assert Cat_Cache.Cat_Cache_class().Get(cat_path) == [('types/TShips.pck', 10)]
+
+    # Change the cat, keeping the other stats the same.
+    stat = os.stat(cat_path)
+    with open(cat_path, 'rb') as file:
+        binary = file.read()
+    if edit == 'size':
+        binary += b'types/TBullets.pck 20\r\n'
+    elif edit == 'header':
+        binary = binary.replace(b'10', b'20')
+    with open(cat_path, 'wb') as file:
+        file.write(binary)
+    if edit == 'mtime':
+        os.utime(cat_path, ns = (stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    else:
+        os.utime(cat_path, ns = (stat.st_atime_ns, stat.st_mtime_ns))
+
+    # The stale entry is dropped from the stored cache, and replaced
+    #  once the cat is parsed again.
+    cache = Cat_Cache.Cat_Cache_class()
+    assert cache.Get(cat_path) == None
+    cache.Store()
+    assert Cat_Cache.Cat_Cache_class().Get(cat_path) == None
+
+    _Record_And_Store(cat_path, [('types/TShips.pck', 20)])
+    assert Cat_Cache.Cat_Cache_class().Get(cat_path) == [('types/TShips.pck', 20)]
+
+
+@pytest.mark.parametrize('cache_text', [
+    '{"version": 1, "cat_dict": {"addon/01.cat"',
+    'not json',
+    '{"version": 1, "cat_dict": []}',
+    '{"version": 0, "cat_dict": {}}',
+    '{"version": 1, "cat_dict": {"addon/01.cat": {"size": 1}}}',
+    ])
+def test_corrupt_cache_is_rebuilt(cat_path, cache_text):
+    with open(Settings.Get_Catalog_Cache_File_Path(), 'w') as file:
+        file.write(cache_text)
+
+    # A bad cache reads as empty, and is replaced when stored.
+    cache = Cat_Cache.Cat_Cache_class()
+    assert cache.Get(cat_path) == None
+    cache.Record(cat_path, [('types/TShips.pck', 10)])
+    cache.Store()
+    assert Cat_Cache.Cat_Cache_class().Get(cat_path) == [('types/TShips.pck', 10)]
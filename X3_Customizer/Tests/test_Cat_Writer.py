@@ -0,0 +1,63 @@
+'''
+Checks writing of cat/dat pairs.
+'''
+import random
+import pytest
+from X3_Customizer.Common.Settings import Settings
+from X3_Customizer.File_Manager import File_Types
+from X3_Customizer.File_Manager.Cat_Writer import Cat_Writer
+
+
+def _Make_Files(count = 40):
+    '''
+    Returns a list of Misc_Files with mixed packed and unpacked paths,
+    and contents of varied size and compressibility.
+    '''
+    rng = random.Random(7)
+    game_files = []
+    for index in range(count):
+        if index % 3 == 0:
+            # Unpacked; random bytes.
+            virtual_path = 'objects/test_{}.pbx'.format(index)
+            binary = bytes(rng.getrandbits(8)
+                           for _ in range(rng.randint(0, 5000)))
+        else:
+            # Packed; repetitive text.
+            virtual_path = 'types/test_{}.txt'.format(index)
+            binary = ('{};'.format(index) * rng.randint(1, 20000)).encode()
+        game_files.append(File_Types.Misc_File(
+            virtual_path = virtual_path, binary = binary))
+    return game_files
+
+
+def _Write_Catalog(cat_path, game_files):
+    '''
+    Writes the game_files to a catalog at cat_path, and returns the
+    (cat bytes, dat bytes).
+    '''
+    cat_writer = Cat_Writer(cat_path)
+    for game_file in game_files:
+        cat_writer.Add_File(game_file)
+    cat_writer.Write()
+    return cat_path.read_bytes(), cat_path.with_suffix('.dat').read_bytes()
+
+
+@pytest.mark.parametrize('compression_level', [1, 9])
+def test_parallel_packing_is_deterministic(tmp_path, monkeypatch,
+                                           compression_level):
+    monkeypatch.setattr(Settings, 'compression_level', compression_level)
+    game_files = _Make_Files()
+
+    # Write to the same file name in separate folders, since the cat
+    #  names its dat.
+    for folder in ['serial', 'parallel']:
+        (tmp_path / folder).mkdir()
+
+    monkeypatch.setattr(Settings, 'parallel_workers', 1)
+    serial_bytes = _Write_Catalog(tmp_path / 'serial' / '01.cat', game_files)
+
+    monkeypatch.setattr(Settings, 'parallel_workers', 4)
+    parallel_bytes = _Write_Catalog(tmp_path / 'parallel' / '01.cat', game_files)
+
+    assert len(serial_bytes[1]) > 0
+    assert serial_bytes == parallel_bytes
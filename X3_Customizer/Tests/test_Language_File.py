@@ -0,0 +1,113 @@
+'''
+Checks language file indexing and text edits.
+'''
+import pytest
+from X3_Customizer.File_Manager.File_Types import Language_File
+
+file_text = '\n'.join([
+    '<?xml version="1.0" encoding="UTF-8" ?>',
+    '<language id="44">',
+    '  <!-- A comment, <t id="9">not a node</t> -->',
+    '  <page id="17" title="Boron" descr="0">',
+    '    <t id="1"/>',
+    '    <t id="2">first',
+    'second</t>',
+    '    <t id="3">three</t>',
+    '  </page>',
+    '  <page id="20" title="Empty" descr="0"/>',
+    '</language>',
+    ''])
+
+
+def _Make_File(text = file_text):
+    return Language_File(text.encode(), virtual_path = 't/0001-L044.xml')
+
+
+def test_index():
+    language_file = _Make_File()
+    assert language_file.Get_Page_Ids() == [17, 20]
+    assert language_file.Get_Page_Ids(title = 'Boron') == [17]
+    assert language_file.Get_Text_Ids(17) == [1, 2, 3]
+    assert language_file.Get_Text_Ids(20) == []
+    assert language_file.Get_Entry(17, 1) == ''
+    assert language_file.Get_Entry(17, 2) == 'first\nsecond'
+    assert language_file.Get_Entry(17, 3) == 'three'
+    assert language_file.Get_Entry(17, 4) == None
+    # Lines are unchanged by indexing.
+    assert language_file.Get_Binary() == file_text.encode()
+
+
+@pytest.mark.parametrize('t_id, new_text', [
+    # Empty node.
+    (1, '    <t id="1">new</t>'),
+    # Node spanning lines.
+    (2, '    <t id="2">new</t>'),
+    (3, '    <t id="3">new</t>'),
+    ])
+def test_edit_existing_node(t_id, new_text):
+    language_file = _Make_File()
+    language_file.Set_Entry(17, t_id, 'new')
+    assert language_file.Get_Entry(17, t_id) == 'new'
+    assert language_file.modified
+
+    # Only the edited node changes in the output.
+    old_node = {
+        1 : '    <t id="1"/>',
+        2 : '    <t id="2">first\nsecond</t>',
+        3 : '    <t id="3">three</t>',
+        }[t_id]
+    assert language_file.Get_Binary() == file_text.replace(
+        old_node, new_text).encode()
+
+
+def test_add_nodes_and_pages():
+    language_file = _Make_File()
+    # Add to an existing page, to an empty page, and to a new page, with
+    #  several edits to check that the index stays in line.
+    language_file.Set_Entry(17, 4, 'four')
+    language_file.Set_Entry(20, 1, 'one')
+    language_file.Set_Entry(30, 1, 'new page')
+    language_file.Set_Entry(17, 5, 'five')
+    language_file.Set_Entry(17, 2, 'two')
+    language_file.Set_Entry(30, 2, 'more')
+
+    assert language_file.Get_Page_Ids() == [17, 20, 30]
+    assert language_file.Get_Text_Ids(17) == [1, 2, 3, 4, 5]
+    assert language_file.Get_Entry(17, 3) == 'three'
+    assert language_file.Get_Entry(20, 1) == 'one'
+    assert language_file.Get_Entry(30, 2) == 'more'
+
+    expected_text = '\n'.join([
+        '<?xml version="1.0" encoding="UTF-8" ?>',
+        '<language id="44">',
+        '  <!-- A comment, <t id="9">not a node</t> -->',
+        '  <page id="17" title="Boron" descr="0">',
+        '    <t id="1"/>',
+        '    <t id="2">two</t>',
+        '    <t id="3">three</t>',
+        '    <t id="4">four</t>',
+        '    <t id="5">five</t>',
+        '  </page>',
+        '  <page id="20" title="Empty" descr="0">',
+        '    <t id="1">one</t>',
+        '  </page>',
+        '  <page id="30" title="" descr="0">',
+        '    <t id="1">new page</t>',
+        '    <t id="2">more</t>',
+        '  </page>',
+        '</language>',
+        ''])
+    assert language_file.Get_Binary() == expected_text.encode()
+
+    # The edited text indexes the same when reloaded.
+    reloaded_file = _Make_File(expected_text)
+    assert reloaded_file.Get_Text_Ids(17) == [1, 2, 3, 4, 5]
+    assert reloaded_file.Get_Text_Ids(30) == [1, 2]
+
+
+def test_unclosed_page():
+    language_file = _Make_File(file_text.replace('  </page>\n', ''))
+    assert language_file.Get_Entry(17, 3) == 'three'
+    language_file.Set_Entry(17, 3, 'new')
+    with pytest.raises(Exception, match = 'Page 17 .* no closing tag'):
+        language_file.Set_Entry(17, 4, 'four')
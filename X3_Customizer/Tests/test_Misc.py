@@ -0,0 +1,394 @@
+'''
+Checks file writeout handling across customizer runs.
+'''
+import os
+import sys
+import gzip
+import pytest
+from X3_Customizer.Common.Settings import Settings
+from X3_Customizer.File_Manager import Misc
+from X3_Customizer.File_Manager import Logs
+from X3_Customizer.File_Manager import Cat_Writer
+from X3_Customizer.File_Manager import File_Types
+from X3_Customizer.File_Manager.Cat_Reader import Cat_Reader
+from X3_Customizer.File_Manager.Source_Reader import Source_Reader_class
+
+Source_Reader_module = sys.modules['X3_Customizer.File_Manager.Source_Reader']
+
+
+@pytest.fixture
+def game_folder(tmp_path, monkeypatch):
+    '''
+    Sets up an x3 folder with a single game catalog, and points the
+    Settings at it. Returns a function which sets up the folder at
+    a given path, since some tests compare against a second folder.
+    '''
+    monkeypatch.setattr(Settings, 'use_catalog_cache', False)
+    monkeypatch.setattr(Settings, 'use_t_file_cache', False)
+    monkeypatch.setattr(Settings, 'parallel_workers', 1)
+    monkeypatch.setattr(Settings, 'path_to_source_folder', None)
+    monkeypatch.setattr(Settings, 'path_to_output_folder', None)
+    monkeypatch.setattr(Settings, 'log_file_name', 'X3_Customizer_log.json')
+
+    def Use_Folder(path):
+        addon_path = path / 'addon'
+        addon_path.mkdir(parents = True)
+        cat_writer = Cat_Writer.Cat_Writer(addon_path / '01.cat')
+        cat_writer.Add_File(File_Types.Misc_File(
+            virtual_path = 'types/Base.txt', text = 'base'))
+        cat_writer.Write()
+
+        monkeypatch.setattr(Settings, 'path_to_x3_folder', str(path))
+        monkeypatch.setattr(Settings, 'path_to_addon_folder', str(addon_path))
+        monkeypatch.setattr(Settings, 'path_to_log_folder', str(addon_path))
+        return addon_path
+
+    return Use_Folder
+
+
+@pytest.fixture
+def pack_counter(monkeypatch):
+    '''
+    Counts the entries gzipped by the Cat_Writer.
+    '''
+    counter = {'count' : 0}
+    original_function = Cat_Writer.Gzip_Compress
+    def Counted_Gzip_Compress(binary):
+        counter['count'] += 1
+        return original_function(binary)
+    monkeypatch.setattr(Cat_Writer, 'Gzip_Compress', Counted_Gzip_Compress)
+    return counter
+
+
+def _Run(monkeypatch, file_text_dict, transform = None):
+    '''
+    Does a customizer run that writes out files with the given
+    contents, keyed by virtual path, starting from fresh module state
+    as a new process would. If given, the transform function is called
+    after the files are added.
+    '''
+    log_old = Logs.Log()
+    log_new = Logs.Log()
+    source_reader = Source_Reader_class()
+    monkeypatch.setattr(Logs, 'Log_Old', log_old)
+    monkeypatch.setattr(Logs, 'Log_New', log_new)
+    monkeypatch.setattr(Source_Reader_module, 'Log_Old', log_old)
+    monkeypatch.setattr(Misc, 'Log_Old', log_old)
+    monkeypatch.setattr(Misc, 'Log_New', log_new)
+    monkeypatch.setattr(Misc, 'Source_Reader', source_reader)
+    monkeypatch.setattr(Misc, 'First_call', True)
+    monkeypatch.setattr(Misc, 'File_dict', {})
+    monkeypatch.setattr(Misc, 'Kept_prior_cat_path', None)
+
+    Misc.Init()
+    for virtual_path, text in file_text_dict.items():
+        Misc.Add_File(File_Types.Misc_File(
+            virtual_path = virtual_path, text = text))
+    if transform != None:
+        transform()
+    Misc.Cleanup()
+    Misc.Write_Files()
+
+
+def _Read_Catalog(cat_path):
+    '''
+    Returns a dict of the catalog contents, keyed by cat path.
+    '''
+    cat_reader = Cat_Reader(str(cat_path))
+    try:
+        return {x : bytes(cat_reader.Read(x))
+                for x in cat_reader.file_size_dict}
+    finally:
+        cat_reader.Close()
+
+
+first_files = {
+    'types/TShips.txt'   : 'ships;' * 1000,
+    'types/TLaser.txt'   : 'lasers;' * 1000,
+    'types/TMissiles.txt': 'missiles;' * 1000,
+    }
+second_files = dict(first_files, **{
+    'types/TLaser.txt'   : 'edited lasers;' * 1000,
+    })
+
+
+def _Fresh_Catalog_Bytes(path, monkeypatch, use_folder, file_text_dict):
+    '''
+    Does a single run in a new game folder, and returns the bytes of
+    its (cat, dat).
+    '''
+    addon_path = use_folder(path)
+    _Run(monkeypatch, file_text_dict)
+    return ((addon_path / '02.cat').read_bytes(),
+            (addon_path / '02.dat').read_bytes())
+
+
+def test_incremental_catalog(tmp_path, monkeypatch, game_folder, pack_counter):
+    addon_path = game_folder(tmp_path / 'game')
+    pack_counter['count'] = 0
+    _Run(monkeypatch, first_files)
+    assert pack_counter['count'] == 3
+
+    # Only the edited file gets packed again.
+    pack_counter['count'] = 0
+    _Run(monkeypatch, second_files)
+    assert pack_counter['count'] == 1
+
+    incremental_bytes = ((addon_path / '02.cat').read_bytes(),
+                         (addon_path / '02.dat').read_bytes())
+    assert not (addon_path / '03.cat').exists()
+    assert incremental_bytes == _Fresh_Catalog_Bytes(
+        tmp_path / 'fresh', monkeypatch, game_folder, second_files)
+
+
+def test_incremental_catalog_prior_cat_deleted(
+        tmp_path, monkeypatch, game_folder, pack_counter):
+    addon_path = game_folder(tmp_path / 'game')
+    _Run(monkeypatch, first_files)
+    os.remove(str(addon_path / '02.cat'))
+
+    # Everything is packed again, and the orphaned dat is replaced.
+    pack_counter['count'] = 0
+    _Run(monkeypatch, second_files)
+    assert pack_counter['count'] == 3
+
+    written_bytes = ((addon_path / '02.cat').read_bytes(),
+                     (addon_path / '02.dat').read_bytes())
+    assert written_bytes == _Fresh_Catalog_Bytes(
+        tmp_path / 'fresh', monkeypatch, game_folder, second_files)
+
+
+def test_incremental_catalog_prior_cat_edited(
+        tmp_path, monkeypatch, game_folder, pack_counter):
+    addon_path = game_folder(tmp_path / 'game')
+    _Run(monkeypatch, first_files)
+
+    # Hand edit the cat to drop its last entry.
+    cat_path = addon_path / '02.cat'
+    cat_text = Cat_Reader.Decode_Cat(cat_path.read_bytes())
+    cat_lines = cat_text.splitlines()
+    edited_cat_text = '\n'.join(cat_lines[:-1]) + '\n'
+    cat_path.write_bytes(Cat_Writer.Cat_Writer.Encode_Cat(
+        edited_cat_text.encode()))
+    edited_cat_bytes = cat_path.read_bytes()
+
+    # The edited cat is treated as a user catalog and left alone, and
+    #  nothing is copied from it; output moves to the next index.
+    pack_counter['count'] = 0
+    _Run(monkeypatch, second_files)
+    assert pack_counter['count'] == 3
+    assert cat_path.read_bytes() == edited_cat_bytes
+
+    new_contents = _Read_Catalog(addon_path / '03.cat')
+    assert new_contents == {
+        'addon/' + x.replace('.txt','.pck') : Cat_Writer.Gzip_Compress(
+            (y + '\n').encode())
+        for x, y in second_files.items()}
+
+
+def test_incremental_catalog_compression_level_changed(
+        tmp_path, monkeypatch, game_folder, pack_counter):
+    addon_path = game_folder(tmp_path / 'game')
+    _Run(monkeypatch, first_files)
+
+    # Entries packed at the old level are not reused.
+    monkeypatch.setattr(Settings, 'compression_level', 1)
+    pack_counter['count'] = 0
+    _Run(monkeypatch, second_files)
+    assert pack_counter['count'] == 3
+
+    written_bytes = ((addon_path / '02.cat').read_bytes(),
+                     (addon_path / '02.dat').read_bytes())
+    assert written_bytes == _Fresh_Catalog_Bytes(
+        tmp_path / 'fresh', monkeypatch, game_folder, second_files)
+
+
+@pytest.fixture
+def xml_file(monkeypatch):
+    '''
+    Sets up a loaded xml file, with transforms able to run.
+    '''
+    monkeypatch.setattr(Misc, 'First_call', False)
+    monkeypatch.setattr(Misc, 'File_dict', {})
+    monkeypatch.setattr(Misc, 'Transform_list', [])
+    monkeypatch.setattr(Settings, 'developer', False)
+    monkeypatch.setattr(Settings, 'skip_all_transforms', False)
+    game_file = File_Types.XML_File(
+        b'<?xml version="1.0" encoding="UTF-8" ?>\n'
+        b'<root>\n  <a v="1" />\n  <b v="2" />\n</root>\n',
+        virtual_path = 'director/test.xml')
+    Misc.Add_File(game_file)
+    return game_file
+
+
+def _Set_Tree_Value(tag, value):
+    xml_file = Misc.Load_File('director/test.xml')
+    xml_root = xml_file.Get_XML_Tree().getroot()
+    xml_root.find(tag).set('v', value)
+    xml_file.Update_From_XML_Node(xml_root)
+
+
+def test_failed_transform_is_undone(xml_file):
+    original_binary = xml_file.Get_Binary()
+
+    @Misc.Transform_Wrapper()
+    def Good_Transform():
+        _Set_Tree_Value('a', '10')
+
+    @Misc.Transform_Wrapper()
+    def Bad_Transform():
+        _Set_Tree_Value('b', '20')
+        raise Exception('test')
+
+    @Misc.Transform_Wrapper()
+    def Bad_Line_Transform():
+        line_list = Misc.Load_File('director/test.xml').Get_Lines()
+        line_list[2] = line_list[2].replace('"10"', '"30"')
+        raise Exception('test')
+
+    Bad_Transform()
+    assert not xml_file.modified
+    assert xml_file.Get_Binary() == original_binary
+
+    # A failure after a good edit keeps the good edit only.
+    Good_Transform()
+    Bad_Transform()
+    Bad_Line_Transform()
+    assert xml_file.modified
+    xml_root = xml_file.Get_XML_Tree().getroot()
+    assert xml_root.find('a').get('v') == '10'
+    assert xml_root.find('b').get('v') == '2'
+    assert '"30"' not in xml_file.Get_Text()
+    assert xml_file._snapshot_list == []
+
+
+def test_failed_nested_transform_is_undone(xml_file):
+
+    @Misc.Transform_Wrapper()
+    def Inner_Transform(tag, value, fail):
+        _Set_Tree_Value(tag, value)
+        if fail:
+            raise Exception('test')
+
+    @Misc.Transform_Wrapper()
+    def Outer_Transform(fail):
+        Inner_Transform('a', '10', False)
+        Inner_Transform('b', '20', True)
+        if fail:
+            raise Exception('test')
+
+    # The failed inner edit is undone, the good one kept.
+    Outer_Transform(False)
+    xml_root = xml_file.Get_XML_Tree().getroot()
+    assert xml_root.find('a').get('v') == '10'
+    assert xml_root.find('b').get('v') == '2'
+
+    # All edits are undone when the outer transform fails, including
+    #  those of a completed inner transform.
+    _Set_Tree_Value('a', '1')
+    original_text = xml_file.Get_Text()
+    Outer_Transform(True)
+    assert xml_file.Get_Text() == original_text
+    assert xml_file._snapshot_list == []
+
+
+def test_snapshot_copies_are_shared(xml_file, monkeypatch):
+    copy_list = []
+    original_deepcopy = File_Types.copy.deepcopy
+    def Counted_Deepcopy(value):
+        copy_list.append(value)
+        return original_deepcopy(value)
+    monkeypatch.setattr(File_Types.copy, 'deepcopy', Counted_Deepcopy)
+
+    @Misc.Transform_Wrapper()
+    def Good_Transform():
+        _Set_Tree_Value('a', '10')
+
+    @Misc.Transform_Wrapper()
+    def Read_Transform(fail):
+        Misc.Load_File('director/test.xml').Get_XML_Tree()
+        if fail:
+            raise Exception('test')
+
+    @Misc.Transform_Wrapper()
+    def Bad_Transform():
+        _Set_Tree_Value('b', '20')
+        raise Exception('test')
+
+    # The first edit can restore from the original text, and later
+    #  transforms share one copy until the tree is next updated.
+    Good_Transform()
+    assert len(copy_list) == 0
+    Read_Transform(False)
+    Read_Transform(False)
+    Bad_Transform()
+    assert len(copy_list) == 1
+    xml_root = xml_file.Get_XML_Tree().getroot()
+    assert xml_root.find('a').get('v') == '10'
+    assert xml_root.find('b').get('v') == '2'
+
+    # Transforms after a restore or an update make a new copy.
+    Good_Transform()
+    assert len(copy_list) == 2
+    Read_Transform(True)
+    assert len(copy_list) == 3
+    assert xml_file.Get_XML_Tree().getroot().find('a').get('v') == '10'
+
+
+def test_nested_snapshot_keeps_pending_outer_edits(xml_file):
+
+    @Misc.Transform_Wrapper()
+    def Read_Transform():
+        Misc.Load_File('director/test.xml').Get_XML_Tree()
+        raise Exception('test')
+
+    @Misc.Transform_Wrapper()
+    def Outer_Transform():
+        xml_file = Misc.Load_File('director/test.xml')
+        xml_root = xml_file.Get_XML_Tree().getroot()
+        xml_root.find('a').set('v', '10')
+        # The failed inner transform should not undo this edit, even
+        #  though the tree has not been updated yet.
+        Read_Transform()
+        xml_file.Update_From_XML_Node(xml_file.Get_XML_Tree())
+
+    # Edit the tree first, so that snapshots need copies.
+    _Set_Tree_Value('b', '20')
+    Outer_Transform()
+    xml_root = xml_file.Get_XML_Tree().getroot()
+    assert xml_root.find('a').get('v') == '10'
+    assert xml_root.find('b').get('v') == '20'
+
+
+def test_source_folder_copies(game_folder, tmp_path, monkeypatch):
+    addon_path = game_folder(tmp_path / 'x3')
+    source_path = tmp_path / 'source'
+    (source_path / 'types').mkdir(parents = True)
+    t_file_text = '// TBullets\r\n1;1;\r\n' + ';'.join(['0'] * 50) + ';\r\n'
+    file_binary_dict = {
+        'types/TBullets.txt' : t_file_text.encode(),
+        'types/TLaser.txt'   : t_file_text.replace('TBullets', 'TLaser').encode(),
+        'types/TPacked.pck'  : Cat_Writer.Gzip_Compress(b'packed'),
+        }
+    for virtual_path, file_binary in file_binary_dict.items():
+        (source_path / virtual_path).write_bytes(file_binary)
+    monkeypatch.setattr(Settings, 'path_to_source_folder', str(source_path))
+
+    def Transform():
+        # Load one file without editing it, and edit another.
+        Misc.Load_File('types/TBullets.txt')
+        Misc.Load_File('types/TLaser.txt')[0]['model_file'] = '7'
+    _Run(monkeypatch, {}, Transform)
+
+    # Source files loaded but not edited are copied over unchanged, as
+    #  are those never loaded; edited files are written from their
+    #  edited contents (which drop comment lines).
+    output_dict = {x : gzip.decompress(y) for x, y in 
+                   _Read_Catalog(addon_path / '02.cat').items()}
+    assert output_dict == {
+        'addon/types/TBullets.pck' : file_binary_dict['types/TBullets.txt'],
+        'addon/types/TPacked.pck'  : b'packed',
+        'addon/types/TLaser.pck'   : file_binary_dict[
+            'types/TLaser.txt'].replace(b'\n0;', b'\n7;').replace(
+            b'// TLaser\r\n', b''),
+        }
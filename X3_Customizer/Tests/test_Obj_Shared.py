@@ -0,0 +1,116 @@
+'''
+Checks obj patch matching against separate searches for each patch.
+'''
+import random
+import re
+import pytest
+from X3_Customizer.Transforms.T_Obj_Code.Obj_Shared import Obj_Patch
+from X3_Customizer.Transforms.T_Obj_Code.Obj_Shared import Find_Matches
+
+
+def _Find_Each(binary, patch_list):
+    '''
+    Returns the match spans of each patch, from a separate finditer
+    search, as Get_Matches would do without Find_Matches.
+    '''
+    spans_list = []
+    for patch in patch_list:
+        # Same conversion as _Get_Pattern, written out to not depend
+        #  on the code being tested.
+        pattern = b''
+        for even_index in range(0, len(patch.ref_code), 2):
+            char_pair = patch.ref_code[even_index : even_index + 2]
+            if char_pair == '..':
+                pattern += b'.'
+            else:
+                pattern += re.escape(bytes.fromhex(char_pair))
+        spans_list.append([x.span() for x in
+            re.compile(pattern, flags = re.DOTALL).finditer(binary)])
+    return spans_list
+
+
+def _Check(binary, ref_code_list):
+    patch_list = [Obj_Patch(x, '') for x in ref_code_list]
+    matches_list = Find_Matches(binary, patch_list)
+    assert [[x.span() for x in matches] for matches in matches_list
+            ] == _Find_Each(binary, patch_list)
+    return matches_list
+
+
+def test_shared_prefix():
+    # Calls to a common function, with different arguments after.
+    binary = bytes.fromhex(
+        '00 86 12 34 05 01 ff'
+        '00 86 12 34 05 02 ff'
+        '86 12 34 05 01 86 12 34 05 03'
+        '86 12 34'
+        '86 12 34 05 01')
+    matches_list = _Check(binary, [
+        '8612340501',
+        '8612340502',
+        '8612340503',
+        '8612340504',
+        # Shares the prefix but is longer.
+        '861234050186',
+        ])
+    assert [len(x) for x in matches_list] == [3, 1, 1, 0, 1]
+
+
+def test_overlapping():
+    # Repeats where each patch matches overlapped with itself and with
+    #  the others.
+    binary = bytes.fromhex('55' * 4 + 'aa' * 9 + '55' * 4 + 'aa' * 3 + '55' * 4)
+    matches_list = _Check(binary, [
+        '55555555aaaa',
+        '55555555aaaaaaaa',
+        # One patch is a prefix of another.
+        '55555555',
+        '555555',
+        'aaaaaaaa',
+        'aaaaaaaaaaaaaaaa55',
+        '55aaaaaa',
+        ])
+    # Overlapped matches of a patch are not included.
+    assert [len(x) for x in matches_list] == [2, 1, 3, 3, 2, 1, 2]
+
+
+@pytest.mark.parametrize('ref_code_list', [
+    # Wildcards after the shared prefix.
+    ['86123405....01', '86123405..02', '8612340501..', '86123405......'],
+    # Wildcards in the prefix, which are kept apart.
+    ['86..3405..01', '..12340501', '8612..0501'],
+    # Wildcards matching newlines, and bytes that are regex characters.
+    ['2e2a5c0a..2b', '2e2a5c0a..0a', '2e2a5c0a2e..', '..2a5c0a'],
+    ])
+def test_wildcards(ref_code_list):
+    binary = bytes.fromhex(
+        '86 12 34 05 01 01 01'
+        '86 12 34 05 0a 02 86 12 34 05 01 0a'
+        '86 12 34 05 00 00 01 02'
+        '2e 2a 5c 0a 0a 2b 2e 2a 5c 0a 2e 0a'
+        '2e 2a 5c 0a 2e 2a 5c 0a 0a 0a')
+    matches_list = _Check(binary, ref_code_list)
+    # Every patch matches somewhere.
+    assert all(matches_list)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random(seed):
+    # Few byte values, so patches match often and overlap.
+    rng = random.Random(seed)
+    byte_values = ['00', '0a', '2e', '86']
+    binary = bytes.fromhex(''.join(
+        rng.choice(byte_values) for _ in range(2000)))
+    prefix_list = [''.join(rng.choice(byte_values) for _ in range(4))
+                   for _ in range(3)]
+    ref_code_list = []
+    for _ in range(12):
+        ref_code = rng.choice(prefix_list) + ''.join(
+            rng.choice(byte_values + ['..'])
+            for _ in range(rng.randint(0, 4)))
+        # Sometimes put a wildcard in the prefix.
+        if rng.random() < 0.2:
+            index = rng.randrange(4) * 2
+            ref_code = ref_code[ : index] + '..' + ref_code[index + 2 : ]
+        ref_code_list.append(ref_code)
+    _Check(binary, ref_code_list)
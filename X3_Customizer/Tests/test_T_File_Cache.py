@@ -0,0 +1,86 @@
+'''
+Checks the cache of parsed t files.
+'''
+import os
+import pytest
+from X3_Customizer.Common.Settings import Settings
+from X3_Customizer.File_Manager import T_File_Cache
+from X3_Customizer.File_Manager.File_Types import T_File
+
+virtual_path = 'types/TBullets.txt'
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(Settings, 'path_to_log_folder', str(tmp_path))
+    monkeypatch.setattr(Settings, 'use_t_file_cache', True)
+    return T_File_Cache.T_File_Cache_class()
+
+
+def _Make_Binary(speed):
+    line = ['0'] * 50
+    line[11] = str(speed)
+    return ('// TBullets\r\n1;1;\r\n' + ';'.join(line) + ';\r\n').encode()
+
+
+def _Load(cache, file_binary):
+    '''
+    Loads a t file through the cache as the Source_Reader does, and
+    returns it along with a bool, True if it came from the cache.
+    '''
+    t_file = cache.Get(file_binary, virtual_path)
+    if t_file != None:
+        return t_file, True
+    t_file = T_File(file_binary, virtual_path = virtual_path)
+    cache.Record(t_file, file_binary)
+    return t_file, False
+
+
+def test_cache_hit(cache):
+    file_binary = _Make_Binary(100)
+    _Load(cache, file_binary)
+    t_file, from_cache = _Load(cache, file_binary)
+    assert from_cache
+    assert t_file.Read_Data()[0]['speed'] == '100'
+    assert t_file.Get_Binary() == T_File(
+        file_binary, virtual_path = virtual_path).Get_Binary()
+
+
+def test_edited_source_misses_cache(cache):
+    _Load(cache, _Make_Binary(100))
+
+    # The edited source parses fresh, and replaces the old entry.
+    t_file, from_cache = _Load(cache, _Make_Binary(200))
+    assert not from_cache
+    assert t_file.Read_Data()[0]['speed'] == '200'
+    assert cache.Get(_Make_Binary(100), virtual_path) == None
+
+    t_file, from_cache = _Load(cache, _Make_Binary(200))
+    assert from_cache
+    assert t_file.Read_Data()[0]['speed'] == '200'
+
+
+def test_version_bump_misses_cache(cache, monkeypatch):
+    file_binary = _Make_Binary(100)
+    _Load(cache, file_binary)
+
+    monkeypatch.setattr(T_File_Cache, '_cache_version',
+                        T_File_Cache._cache_version + 1)
+    new_cache = T_File_Cache.T_File_Cache_class()
+    t_file, from_cache = _Load(new_cache, file_binary)
+    assert not from_cache
+    assert t_file.Read_Data()[0]['speed'] == '100'
+
+
+def test_failed_record_is_a_warning(cache, monkeypatch, capsys):
+    def Failing_Dump(obj, file, protocol = None):
+        raise OSError('disk full')
+    monkeypatch.setattr(T_File_Cache.pickle, 'dump', Failing_Dump)
+
+    # The file still loads, is not cached, and leaves no temp file.
+    t_file, from_cache = _Load(cache, _Make_Binary(100))
+    assert not from_cache
+    assert t_file.Read_Data()[0]['speed'] == '100'
+    assert 'Warning' in capsys.readouterr().out
+    assert os.listdir(Settings.Get_T_File_Cache_Folder_Path()) == []
+    assert cache.Get(_Make_Binary(100), virtual_path) == None
@@ -0,0 +1,172 @@
+'''
+Checks the column backed t file table.
+'''
+import pytest
+from X3_Customizer.Common.Settings import Settings
+from X3_Customizer.File_Manager import File_Fields
+from X3_Customizer.File_Manager import Misc
+from X3_Customizer.File_Manager.File_Types import T_File
+from X3_Customizer.File_Manager.T_Table import T_Table
+from X3_Customizer.Transforms import T_Ships
+
+
+def _Get_Lines(table):
+    return [list(row.items()) for row in table.row_list]
+
+
+def test_add_lines_matches_add_line():
+    line_groups = [
+        ((0, 1),               [['1', '3']]),
+        (('name', 'speed', 2), [['a', '10', ''], ['b', '20', ''],
+                                ['a', '30', '']]),
+        ((0, 'speed'),         [['x', '40']]),
+        (('name', 'speed', 2), [['c', '50', '']]),
+        ]
+
+    single_table = T_Table()
+    single_table.Get_Index('name')
+    for keys, values_list in line_groups:
+        for values in values_list:
+            single_table.Add_Line(keys, values)
+
+    group_table = T_Table()
+    group_table.Get_Index('name')
+    group_rows = []
+    for keys, values_list in line_groups:
+        group_rows += group_table.Add_Lines(keys, values_list)
+
+    assert _Get_Lines(group_table) == _Get_Lines(single_table)
+    assert group_rows == group_table.row_list
+    assert group_table.dirty_index_set == set(range(6))
+    assert [x.index for x in group_table.Get_Index('name')['a']] == [1, 3]
+    assert group_table.column_dict == single_table.column_dict
+
+
+def test_typed_values_keep_their_form():
+    table = T_Table(File_Fields.T_file_name_field_type_dict_dict['TShips.txt'])
+    row = table.Add_Line(['speed', 'weapon_recharge_factor', 'hull_strength'],
+                         ['150.5', '1', '2000'])
+
+    # An int field holding a float string reads as a float, and a float
+    #  field holding a whole number reads as an int.
+    assert row.Get_Typed('speed') == 150.5
+    assert isinstance(row.Get_Typed('speed'), float)
+    assert row.Get_Typed('weapon_recharge_factor') == 1
+    assert isinstance(row.Get_Typed('weapon_recharge_factor'), int)
+
+    # Ints set back keep their form; floats set on int fields are
+    #  truncated.
+    row.Set_Typed('weapon_recharge_factor', 2)
+    row.Set_Typed('hull_strength', 2999.9)
+    assert table.Get_Values(row.index) == ['150.5', '2', '2999']
+
+
+def _Make_TShips_Binary():
+    '''
+    Returns a TShips binary with a few ships of different classes.
+    '''
+    text = '// TShips\r\n1;20;\r\n'
+    for index, (subtype, shield_power, tunings) in enumerate([
+            ('SG_SH_M3', 400, 10),
+            ('SG_SH_M2', 2000, 0),
+            ('SG_SH_TS', 60, 5),
+            ('SG_SH_M3', 90, 8),
+            ]):
+        line = ['0'] * 150
+        line[2 : 5] = ['0.1', '0.2', '0.3']
+        line[5]  = subtype
+        line[7]  = str(1000 + index)
+        line[8]  = str(50 + index)
+        line[13] = str(shield_power)
+        line[26] = str(tunings)
+        line[27] = str(tunings)
+        line[49] = '5'
+        line[148] = 'SS_SH_{}'.format(index)
+        text += ';'.join(line) + ';\r\n'
+    return text.encode()
+
+
+@pytest.fixture
+def tships_file(monkeypatch):
+    '''
+    Sets up the File_Manager with a loaded TShips file, and returns it.
+    '''
+    t_file = T_File(_Make_TShips_Binary(), virtual_path = 'types/TShips.txt')
+    monkeypatch.setattr(Misc, 'First_call', False)
+    monkeypatch.setattr(Misc, 'File_dict', {'types/TShips.txt' : t_file})
+    monkeypatch.setattr(Misc, 'Pending_row_operations', [])
+    monkeypatch.setattr(Misc, 'Transform_name_stack', [])
+    monkeypatch.setattr(Settings, 'developer', True)
+    return t_file
+
+
+@pytest.mark.parametrize('fuse', [False, True])
+def test_fused_row_operations_match_transforms_in_turn(
+        tships_file, monkeypatch, fuse):
+    monkeypatch.setattr(Settings, 'fuse_row_transforms', fuse)
+    T_Ships.Simplify_Engine_Trails()
+    T_Ships.Standardize_Ship_Tunings(engine_tunings = 5, rudder_tunings = 5)
+    # This one also loads the file for a column edit, running any
+    #  queued operations part way through.
+    T_Ships.Adjust_Ship_Shield_Regen(
+        scaling_factor = 1.5,
+        adjustment_factors_dict = {'SG_SH_M3' : (100, 0.5, None)})
+    T_Ships.Standardize_Ship_Tunings(engine_tunings = 2, 
+                                     ship_types = ['SG_SH_TS'])
+    Misc.Run_Row_Operations()
+    assert not Misc.Pending_row_operations
+
+    # Compare to the transform edits done directly on the lines.
+    expected = T_File(_Make_TShips_Binary(), virtual_path = 'types/TShips.txt')
+    for line_dict in expected.Read_Data():
+        line_dict['particle_effect'] = (
+            '1' if line_dict['subtype'] in ['SG_SH_M3', 'SG_SH_TS'] else '0')
+        for tuning_field, field_list in [
+                ('speed_tunings' , ['speed', 'acceleration']),
+                ('rudder_tunings', ['yaw', 'pitch', 'roll'])]:
+            tunings = int(line_dict[tuning_field])
+            if tunings == 0:
+                continue
+            scaling = (1 + tunings / 10) / 1.5
+            for field in field_list:
+                value = float(line_dict[field]) * scaling
+                line_dict[field] = (str(round(value)) 
+                                    if tuning_field == 'speed_tunings' 
+                                    else '{0:.6f}'.format(value))
+            line_dict[tuning_field] = '5'
+        value = int(line_dict['shield_power'])
+        if line_dict['subtype'] == 'SG_SH_M3' and value > 100:
+            value = round((100 + (value - 100) * 0.5) / 10) * 10
+        line_dict['shield_power'] = str(round(value * 1.5 / 10) * 10)
+        if line_dict['subtype'] == 'SG_SH_TS':
+            line_dict['speed'] = str(round(
+                int(line_dict['speed']) * 1.5 / 1.2))
+            line_dict['acceleration'] = str(round(
+                int(line_dict['acceleration']) * 1.5 / 1.2))
+            line_dict['speed_tunings'] = '2'
+
+    assert tships_file.Get_Binary() == expected.Get_Binary()
+
+
+def test_failed_row_operation_names_its_transform(tships_file, monkeypatch):
+    monkeypatch.setattr(Settings, 'fuse_row_transforms', True)
+    def Bad_Edit(line_dict):
+        if line_dict['subtype'] == 'SG_SH_M2':
+            raise ValueError('bad line')
+    def Good_Edit(line_dict):
+        line_dict['particle_effect'] = '7'
+
+    Misc.Transform_name_stack.append('Bad_Transform')
+    Misc.Apply_Row_Operation('types/TShips.txt', Bad_Edit)
+    Misc.Transform_name_stack[-1] = 'Good_Transform'
+    Misc.Apply_Row_Operation('types/TShips.txt', Good_Edit)
+    Misc.Transform_name_stack.pop()
+
+    # The error names the failed transform, after the later operation
+    #  has still run on every line.
+    with pytest.raises(Exception, match = 'Bad_Transform') as exc_info:
+        Misc.Load_File('types/TShips.txt')
+    assert isinstance(exc_info.value.__cause__, ValueError)
+    assert not Misc.Pending_row_operations
+    assert all(x['particle_effect'] == '7' 
+               for x in tships_file.Read_Data())
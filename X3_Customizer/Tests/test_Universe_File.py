@@ -0,0 +1,102 @@
+'''
+Checks universe map indexing and sector edits.
+'''
+import xml.etree.ElementTree as ET
+from X3_Customizer.File_Manager.File_Types import Universe_File
+
+file_text = '\n'.join([
+    '<?xml version="1.0" encoding="UTF-8" ?>',
+    '<universe>',
+    '  <o f="0" x="0" y="0" r="1" size="2000" m="1" qtrade="1" t="1">',
+    '    <o t="2" s="1"/>',
+    '    <o t="3" s="2"/>',
+    '  </o>',
+    '  <o f="0" x="1" y="0" r="2" size="2000" m="2" qtrade="1" t="1"/>',
+    '  <o f="0" x="2" y="0" r="3" size="2000" m="3" qtrade="1" t="1">',
+    '    <o t="4" s="3">',
+    '      <o t="5" s="4"/>',
+    '    </o>',
+    '  </o>',
+    '</universe>',
+    ''])
+
+
+def _Make_File(text = file_text):
+    return Universe_File(text.encode(), virtual_path = 'maps/x3_universe.xml')
+
+
+def test_index():
+    universe_file = _Make_File()
+    assert universe_file.Get_Sector_Keys() == [(0, 0), (1, 0), (2, 0)]
+    assert universe_file.Get_Sector_Fields(1, 0)['r'] == '2'
+    assert universe_file.Get_Sector_Fields(3, 0) == None
+    assert universe_file.Get_Sector_Object_Text(0, 0) == (
+        '    <o t="2" s="1"/>\n    <o t="3" s="2"/>')
+    assert universe_file.Get_Sector_Object_Text(1, 0) == ''
+    assert universe_file.Get_Sector_Object_Text(2, 0) == (
+        '    <o t="4" s="3">\n      <o t="5" s="4"/>\n    </o>')
+    # Lines are unchanged by indexing.
+    assert universe_file.Get_Binary() == file_text.encode()
+
+
+def test_edit_sectors_after_line_count_change():
+    universe_file = _Make_File()
+    # Grow the first sector, then edit the later ones.
+    universe_file.Set_Sector_Object_Text(0, 0, '\n'.join([
+        '    <o t="2" s="1"/>',
+        '    <o t="6" s="5"/>',
+        '    <o t="6" s="6"/>',
+        '    <o t="3" s="2"/>',
+        ]))
+    universe_file.Set_Sector_Object_Text(2, 0,
+        universe_file.Get_Sector_Object_Text(2, 0).replace('s="4"', 's="7"'))
+    universe_file.Set_Sector_Field(2, 0, 'm', 30)
+    # Shrink the first sector, and edit the last again.
+    universe_file.Set_Sector_Object_Text(0, 0, '')
+    universe_file.Set_Sector_Field(2, 0, 'r', 4)
+
+    assert universe_file.Get_Sector_Object_Text(0, 0) == ''
+    assert universe_file.Get_Sector_Object_Text(2, 0) == (
+        '    <o t="4" s="3">\n      <o t="5" s="7"/>\n    </o>')
+    assert universe_file.Get_Sector_Fields(2, 0)['m'] == '30'
+
+    expected_text = '\n'.join([
+        '<?xml version="1.0" encoding="UTF-8" ?>',
+        '<universe>',
+        '  <o f="0" x="0" y="0" r="1" size="2000" m="1" qtrade="1" t="1">',
+        '  </o>',
+        '  <o f="0" x="1" y="0" r="2" size="2000" m="2" qtrade="1" t="1"/>',
+        '  <o f="0" x="2" y="0" r="4" size="2000" m="30" qtrade="1" t="1">',
+        '    <o t="4" s="3">',
+        '      <o t="5" s="7"/>',
+        '    </o>',
+        '  </o>',
+        '</universe>',
+        ''])
+    assert universe_file.Get_Binary() == expected_text.encode()
+
+
+def test_add_objects_to_closed_sector():
+    universe_file = _Make_File()
+    # Nothing to add leaves the sector alone.
+    universe_file.Set_Sector_Object_Text(1, 0, '')
+    assert not universe_file.modified
+
+    universe_file.Set_Sector_Object_Text(1, 0, '    <o t="6" s="5"/>')
+    universe_file.Set_Sector_Object_Text(2, 0, '    <o t="6" s="6"/>')
+    assert universe_file.Get_Sector_Object_Text(1, 0) == '    <o t="6" s="5"/>'
+    assert universe_file.Get_Sector_Object_Text(2, 0) == '    <o t="6" s="6"/>'
+    universe_file.Set_Sector_Object_Text(1, 0, '    <o t="6" s="7"/>')
+
+    expected_text = file_text.replace(
+        '  <o f="0" x="1" y="0" r="2" size="2000" m="2" qtrade="1" t="1"/>',
+        '  <o f="0" x="1" y="0" r="2" size="2000" m="2" qtrade="1" t="1">\n'
+        '    <o t="6" s="7"/>\n'
+        '  </o>').replace(
+        '    <o t="4" s="3">\n      <o t="5" s="4"/>\n    </o>',
+        '    <o t="6" s="6"/>')
+    assert universe_file.Get_Binary() == expected_text.encode()
+
+    # The output is valid xml, with the objects in their sectors.
+    root = ET.fromstring(universe_file.Get_Binary())
+    assert [len(x) for x in root] == [2, 1, 1]
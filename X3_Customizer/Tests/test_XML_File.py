@@ -0,0 +1,49 @@
+'''
+Checks xml file text handling.
+'''
+import pytest
+from X3_Customizer.File_Manager.File_Types import XML_File
+
+
+@pytest.mark.parametrize('file_binary', [
+    b'<?xml version="1.0" encoding="UTF-8" ?>\n<root>\n  <a />\n</root>\n',
+    b'<?xml version="1.0" encoding="UTF-8" ?>\r\n<root>\r\n  <a />\r\n</root>\r\n',
+    b'<?xml version="1.0" encoding="UTF-8" ?>\r\n<root>\r\n  <a />\r\n</root>',
+    '<?xml version="1.0" encoding="ISO-8859-1" ?>\r\n<root>\r\n  <a t="\xe9" />\r\n</root>\r\n'.encode('ISO-8859-1'),
+    ])
+def test_unchanged_lines_round_trip(file_binary, tmp_path):
+    xml_file = XML_File(file_binary, virtual_path = 'director/test.xml')
+    encoding = xml_file.encoding
+    # Modified files are written with bare newlines (as catalogs need)
+    #  and a final newline, so unchanged lines should give the original
+    #  binary after that normalization.
+    expected_binary = file_binary.replace(b'\r\n', b'\n')
+    if not expected_binary.endswith(b'\n'):
+        expected_binary += b'\n'
+
+    line_list = xml_file.Get_Lines()
+    for index, line in enumerate(line_list):
+        line_list[index] = line
+    xml_file.Update_From_Lines()
+    assert xml_file.modified
+    assert xml_file.Get_Binary() == expected_binary
+
+    # Loose files are written in text mode, with system newlines.
+    file_path = tmp_path / 'test.xml'
+    xml_file.Write_File(str(file_path))
+    with open(str(file_path), 'r', encoding = encoding) as file:
+        assert file.read() == expected_binary.decode(encoding)
+
+    # An actual edit is written out.
+    xml_file.Get_Lines()[2] = '  <b />'
+    xml_file.Update_From_Lines()
+    assert xml_file.Get_Binary() == expected_binary.replace(
+        xml_file.binary.replace(b'\r\n', b'\n').split(b'\n')[2], b'  <b />')
+
+
+def test_unmodified_file_keeps_binary():
+    file_binary = b'<?xml version="1.0" encoding="UTF-8" ?>\r\n<root />\r\n'
+    xml_file = XML_File(file_binary, virtual_path = 'director/test.xml')
+    xml_file.Get_Lines()
+    assert not xml_file.modified
+    assert xml_file.Get_Binary() == file_binary
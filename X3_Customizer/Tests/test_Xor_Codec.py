@@ -0,0 +1,83 @@
+'''
+Checks the table driven xor codecs against the per-byte loops they
+replaced in Cat_Reader, Cat_Writer and Source_Reader.
+'''
+import random
+from X3_Customizer.File_Manager import Xor_Codec
+
+
+def _Reference_Fixed(binary, xor_value):
+    return bytearray(x ^ xor_value for x in binary)
+
+def _Reference_Running(binary, xor_value = 0xDB):
+    encoded_bytes = bytearray()
+    for byte in binary:
+        encoded_bytes.append(byte ^ xor_value)
+        xor_value = (xor_value + 1) % 256
+    return encoded_bytes
+
+def _Reference_Magic(binary):
+    magic = binary[0] ^ 0xC8
+    return bytearray(x ^ magic for x in binary)[1:]
+
+
+def _Random_Buffers():
+    'Yields random buffers of various lengths, around the key period.'
+    random_gen = random.Random(1)
+    for length in [1, 2, 255, 256, 257, 511, 512, 513, 1000, 70000]:
+        yield bytes(random_gen.randrange(256) for x in range(length))
+
+
+def test_fixed():
+    for binary in _Random_Buffers():
+        for xor_value in [0x33, 0x00, 0xFF, 0x5A]:
+            result = Xor_Codec.Xor_Fixed(binary, xor_value)
+            assert isinstance(result, bytearray)
+            assert result == _Reference_Fixed(binary, xor_value)
+        # Other buffer types give the same result.
+        assert (Xor_Codec.Xor_Fixed(memoryview(binary)) 
+                == Xor_Codec.Xor_Fixed(bytearray(binary)) 
+                == _Reference_Fixed(binary, 0x33))
+
+
+def test_running():
+    for binary in _Random_Buffers():
+        for start_value in [0xDB, 0x00, 0xFF]:
+            result = Xor_Codec.Xor_Running(binary, start_value)
+            assert isinstance(result, bytearray)
+            assert result == _Reference_Running(binary, start_value)
+
+
+def test_running_wraparound():
+    # A zero buffer reads out the key stream directly, which should wrap
+    #  from 0xFF back to 0x00, and repeat with a 256 byte period.
+    key = Xor_Codec.Xor_Running(bytes(600))
+    assert key[0] == 0xDB
+    assert key[0x24] == 0xFF
+    assert key[0x25] == 0x00
+    assert key[256 : 512] == key[ : 256]
+    # Leading zero bytes in the result are kept.
+    assert Xor_Codec.Xor_Running(bytes([0xDB, 0xDC])) == bytearray(2)
+
+
+def test_magic():
+    for binary in _Random_Buffers():
+        result = Xor_Codec.Xor_Magic(binary)
+        assert isinstance(result, bytearray)
+        assert result == _Reference_Magic(binary)
+
+
+def test_empty():
+    assert Xor_Codec.Xor_Fixed(b'') == bytearray()
+    assert Xor_Codec.Xor_Running(b'') == bytearray()
+    assert Xor_Codec.Decode_Cat(b'') == ''
+    assert Xor_Codec.Encode_Dat(b'') == bytearray()
+    # Just a magic byte, with no content.
+    assert Xor_Codec.Xor_Magic(b'\x10') == bytearray()
+
+
+def test_round_trip():
+    for binary in _Random_Buffers():
+        assert Xor_Codec.Decode_Dat(Xor_Codec.Encode_Dat(binary)) == binary
+        assert (Xor_Codec.Decode_Cat(Xor_Codec.Encode_Cat(binary)) 
+                == binary.decode('latin-1'))
@@ -7,7 +7,6 @@ TODO: update code to make better use of xml nodes, as convenient.
 TODO: any special fixes for other mods, eg. New Home gate fix for
 TC plots in AP.
 '''
-import copy
 from collections import defaultdict
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
@@ -85,11 +84,11 @@ def Adjust_Generic_Missions(
 
     # Get the base file content.
     file_contents = File_Manager.Load_File('director/3.01 Generic Missions.xml')
-    # Make a copy of text for editing.
-    new_file_text = copy.copy(file_contents.Get_Text())
+    # Get the lines for editing.
+    line_list = file_contents.Get_Lines()
 
-    # Loop over the lines.
-    for line in file_contents.Get_Text().splitlines():
+    # Loop over the lines by index.
+    for index, line in enumerate(line_list):
         # Skip lines without 'chance' in them.
         if 'chance="{' not in line:
             continue
@@ -159,10 +158,10 @@ def Adjust_Generic_Missions(
 
         # Replace the original with the new line.
         # Ignore leading white space in the original, so it gets preserved.
-        new_file_text = new_file_text.replace(line.strip(), new_line)
+        line_list[index] = line.replace(line.strip(), new_line)
 
-    # Update the file text with the changes.
-    file_contents.Update_From_Text(new_file_text)
+    # Update the file with the changes.
+    file_contents.Update_From_Lines()
 
     
 # Convenience version of the above to turn off all missions.
@@ -227,11 +227,12 @@ def Set_Global(field_name, value):
     * value:
       - Int, the value to set.
     '''
-    for this_dict in File_Manager.Load_File('types/Globals.txt'):
-        if this_dict['name'] == field_name:
-            #Note: all globals are integers.
-            this_dict['value'] = str(int(value))
-            break
+    this_dict = File_Manager.Load_File('types/Globals.txt', 
+                                       return_game_file = True
+                                       ).Find('name', field_name)
+    if this_dict != None:
+        #Note: all globals are integers.
+        this_dict['value'] = str(int(value))
 
     
 @File_Manager.Transform_Wrapper('types/Globals.txt')
@@ -248,9 +249,10 @@ def Adjust_Global(field_name, scaling_factor):
     #Can return early if just multiplying by 1.
     if multiplier == 1:
         return
-    for this_dict in File_Manager.Load_File('types/Globals.txt'):
-        if this_dict['name'] == field_name:
-            new_value = int(this_dict['value']) * scaling_factor
-            #Note: all globals are integers.
-            this_dict['value'] = str(int(new_value))
-            break
+    this_dict = File_Manager.Load_File('types/Globals.txt', 
+                                       return_game_file = True
+                                       ).Find('name', field_name)
+    if this_dict != None:
+        new_value = int(this_dict['value']) * scaling_factor
+        #Note: all globals are integers.
+        this_dict['value'] = str(int(new_value))
@@ -7,6 +7,7 @@ from binascii import unhexlify as hex2bin
 from binascii import hexlify as bin2hex
 import re
 import copy
+from collections import OrderedDict
 
 from ... import Common
 from ... import File_Manager
@@ -155,7 +156,128 @@ def Int_To_Hex_String(value, byte_count):
     return bin2hex(value.to_bytes(byte_count, byteorder = 'big')).decode()
     
 
-def Get_Matches(patch):
+# Number of starting literal bytes that patches need to share to be
+#  matched together by Find_Matches.
+_shared_prefix_length = 4
+
+def _Get_Pattern(ref_code):
+    '''
+    Returns a compiled regex pattern that matches the given ref_code
+    against bytes.
+    '''
+    # Get a match pattern from the ref_code, using a bytes pattern.
+    # This needs to convert the given ref_code into a suitable
+    #  regex pattern that will match bytes.
+    ref_bytes = _String_To_Bytes(ref_code, add_escapes = True)
+    return re.compile(
+        ref_bytes,
+        # Need to set . to match newline, just in case a newline character
+        #  is in the wildcard region (which came up for hired TLs).
+        flags = re.DOTALL)
+
+
+def _Get_Literal_Prefix(ref_code):
+    '''
+    Returns the starting part of the ref_code before any wildcard.
+    '''
+    for even_index in range(0, len(ref_code), 2):
+        if ref_code[even_index : even_index + 2] == '..':
+            return ref_code[ : even_index]
+    return ref_code
+
+
+def Find_Matches(binary, patch_list):
+    '''
+    Find locations in the binary matching the ref_code of each patch.
+    Returns a list holding a list of re match objects for each patch,
+    the same as a separate re.finditer search for each patch would
+    find (eg. not including overlapped matches of a patch).
+
+    Patches whose ref_codes start with the same literal bytes (eg. at
+    various calls to a common function) are searched for together, in
+    a single pass over the binary, using a combined pattern that starts
+    with the shared bytes. Other patches are searched for separately,
+    since combining patterns that start differently loses the fast
+    literal prefix search of regex and is slower than separate passes.
+    '''
+    # Group the patches by their starting bytes, as indices into
+    #  the patch_list.
+    # Patches with too few starting literal bytes are kept apart.
+    prefix_indices_dict = OrderedDict()
+    for index, patch in enumerate(patch_list):
+        prefix = _Get_Literal_Prefix(patch.ref_code)
+        if len(prefix) < _shared_prefix_length * 2:
+            prefix = index
+        else:
+            prefix = prefix[ : _shared_prefix_length * 2]
+        prefix_indices_dict.setdefault(prefix, []).append(index)
+
+    # Patterns for each patch, and their lengths in bytes (which are
+    #  fixed, since wildcards match one byte each).
+    pattern_list = [_Get_Pattern(x.ref_code) for x in patch_list]
+    length_list = [len(x.ref_code) // 2 for x in patch_list]
+    # Sets of all start positions where each patch matches, including
+    #  overlapped ones.
+    position_set_list = [set() for x in patch_list]
+
+    for index_list in prefix_indices_dict.values():
+        if len(index_list) == 1:
+            index = index_list[0]
+            position_set_list[index].update(
+                x.start() for x in pattern_list[index].finditer(binary))
+            continue
+
+        # Build the combined pattern, from the literal prefix shared
+        #  by all patches in the group followed by a capture group with
+        #  the rest of each patch's ref_code, to identify which matched.
+        ref_code_list = [patch_list[x].ref_code for x in index_list]
+        shared_length = _shared_prefix_length * 2
+        while (shared_length + 2 <= min(len(x) for x in ref_code_list)
+        and len(set(x[ : shared_length + 2] for x in ref_code_list)) == 1
+        and ref_code_list[0][shared_length : shared_length + 2] != '..'):
+            shared_length += 2
+        combined_pattern = re.compile(
+            _String_To_Bytes(ref_code_list[0][ : shared_length], add_escapes = True)
+            + b'(?:'
+            + b'|'.join(b'(' + _String_To_Bytes(x[shared_length : ], add_escapes = True) + b')'
+                        for x in ref_code_list)
+            + b')',
+            flags = re.DOTALL)
+
+        for match in combined_pattern.finditer(binary):
+            start, end = match.span()
+            position_set_list[index_list[match.lastindex - 1]].add(start)
+            # The combined search only reports one patch at each match,
+            #  and skips to the end of that match, so also check for
+            #  patches starting within the matched span.
+            for index in index_list:
+                pattern = pattern_list[index]
+                pos = start
+                while True:
+                    sub_match = pattern.search(
+                        binary, pos, end - 1 + length_list[index])
+                    if sub_match == None:
+                        break
+                    position_set_list[index].add(sub_match.start())
+                    pos = sub_match.start() + 1
+
+    # Pick out the non-overlapped matches of each patch, in order,
+    #  matching what a separate finditer would find.
+    matches_list = []
+    for pattern, length, position_set in zip(
+            pattern_list, length_list, position_set_list):
+        matches = []
+        next_start = 0
+        for position in sorted(position_set):
+            if position < next_start:
+                continue
+            matches.append(pattern.match(binary, position))
+            next_start = position + length
+        matches_list.append(matches)
+    return matches_list
+
+
+def Get_Matches(patch, matches = None):
     '''
     Find locations in the obj code where a patch can be applied.
     Returns a list of re match objects.
@@ -164,37 +286,29 @@ def Get_Matches(patch):
     the patch where a match is found.
     Error if the number of matches is not what the patch expects, or if
     the match location doesn't match the reference code.
+
+    * matches
+      - Optional list of re match objects for this patch already found
+        by Find_Matches, to be checked instead of searching again.
     '''
     file_contents = File_Manager.Load_File(patch.file)
-
-    # Get a match pattern from the ref_code, using a bytes pattern.
-    # This needs to convert the given ref_code into a suitable
-    #  regex pattern that will match bytes.
-    ref_bytes = _String_To_Bytes(patch.ref_code, add_escapes = True)
-    pattern = re.compile(
-        ref_bytes,
-        # Need to set . to match newline, just in case a newline character
-        #  is in the wildcard region (which came up for hired TLs).
-        flags = re.DOTALL)
+    pattern = _Get_Pattern(patch.ref_code)
 
     # Get all match points.
-    # Need to use finditer for this, as it is the only one that will
-    #  return multiple matches.
     # Note: does not capture overlapped matches; this is not expected
     #  to be a problem.
-    matches = [x for x in re.finditer(
-        pattern, 
-        file_contents.binary
-        )]
+    if matches == None:
+        matches = Find_Matches(file_contents.binary, [patch])[0]
     
-    # Look up the calling transform's name for any debug printout.
-    try:
-        caller_name = inspect.stack()[1][3]
-    except:
-        caller_name = '?'
-
     # Do the error check if a non-expected number of matches found.
     if len(matches) != patch.expected_matches:
+
+        # Look up the calling transform's name for any debug printout.
+        try:
+            caller_name = inspect.stack()[1][3]
+        except:
+            caller_name = '?'
+
         # Can raise a hard or soft error depending on mode.
         # Message will be customized based on error type.
         if Common.Settings.developer:
@@ -256,12 +370,24 @@ def Apply_Obj_Patch_Group(patch_list):
     Applies a group of patches as a single unit.
     If any patch runs into an error, no patch in the group will be applied.
     '''
-    # Start with a search for matches.
+    # Start with a search for matches, for all patches on each file
+    #  together.
+    file_indices_dict = OrderedDict()
+    for index, patch in enumerate(patch_list):
+        file_indices_dict.setdefault(patch.file, []).append(index)
+    found_matches_list = [None] * len(patch_list)
+    for file_name, index_list in file_indices_dict.items():
+        file_contents = File_Manager.Load_File(file_name)
+        for index, matches in zip(index_list, Find_Matches(
+                file_contents.binary, [patch_list[x] for x in index_list])):
+            found_matches_list[index] = matches
+
+    # Check the matches.
     # These calls may raise an exception on error, or could return None
     #  in dev mode.
     matches_list = []
-    for patch in patch_list:
-        matches_list.append(Get_Matches(patch))
+    for patch, matches in zip(patch_list, found_matches_list):
+        matches_list.append(Get_Matches(patch, matches))
 
     # Return early on a None was returned.
     if None in matches_list:
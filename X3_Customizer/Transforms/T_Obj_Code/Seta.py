@@ -34,8 +34,6 @@ def Adjust_Max_Seta(
     #  obj edit.
     # Can detect the LU installation by the presence of the 8383-L044.xml
     #  t file.
-    # TODO: redirect this to a call to a module with t file edits, if
-    #  one is ever added.
     lu_text_file = File_Manager.Load_File(file_name = 't/8383-L044.xml',
                           error_if_not_found = False,
                           return_game_file = True)
@@ -62,12 +60,11 @@ def Adjust_Max_Seta(
         ##  (for now).
         #lu_text_file.Update_From_XML_Node(root_node)
 
-        text = lu_text_file.Get_Text()
-        original_text = '<t id="200">10</t>'
-        assert text.count(original_text) == 1
-        text = text.replace(original_text,
-                     '<t id="200">{}</t>'.format(speed_factor))
-        lu_text_file.Update_From_Text(text)
+        # Check the LU file has the expected value, then put the new
+        #  value in the text override file, leaving the LU file unchanged.
+        assert lu_text_file.Get_Entry(68, 200) == '10'
+        File_Manager.Load_File('text_override').Set_Entry(
+            68, 200, str(speed_factor))
 
 
     else:
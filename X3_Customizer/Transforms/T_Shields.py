@@ -18,10 +18,11 @@ def Adjust_Shield_Regen(
     * scaling_factor:
       - Multiplier to apply to all shield types.
     '''
-    for this_dict in File_Manager.Load_File('types/TShields.txt'):
+    def Edit_Line(this_dict):
         if scaling_factor != 1:
             # Grab the shield efficiency, as a float.
-            value = float(this_dict['efficiency'])
+            value = this_dict.Get_Typed('efficiency')
             new_value = value * scaling_factor
             # Put it back, with 1 decimal place.
             this_dict['efficiency'] = str('{0:.1f}'.format(new_value))
+    File_Manager.Apply_Row_Operation('types/TShields.txt', Edit_Line)
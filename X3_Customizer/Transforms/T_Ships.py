@@ -54,29 +54,27 @@ def Adjust_Ship_Hull(
       - Bool, if True (default) repair lasers will be scaled by the M6 
         hull scaling (if given), to avoid large changes in repair times.
     '''
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
-        if this_dict['subtype'] in adjustment_factors_dict or scaling_factor != 1:
-            value = int(this_dict['hull_strength'])
-            
-            # Pick the table scaling factor, or the default.
-            if this_dict['subtype'] in adjustment_factors_dict:
-                new_value = value * adjustment_factors_dict[this_dict['subtype']]
-            else:
-                new_value = value * scaling_factor
-
-            # Most hulls appear to be in the thousands, so round to nearest thousand.
-            # Skip this for ships with very small hulls, eg. fighter drones (10) and
-            #  similar, using a smaller rounding.
-            if new_value > 10000:
-                new_value = math.ceil(new_value/1000)*1000
-            elif new_value > 1000:
-                new_value = math.ceil(new_value/100)*100
-            else:
-                new_value = math.ceil(new_value/10)*10
-            # Error check on hull getting 0'd out on a ship that didn't already
-            #  have 0 hull (as in some dummy entries)
-            assert new_value != 0 or value == 0
-            this_dict['hull_strength'] = str(new_value)
+    def Round_Hull(new_value):
+        # Most hulls appear to be in the thousands, so round to nearest thousand.
+        # Skip this for ships with very small hulls, eg. fighter drones (10) and
+        #  similar, using a smaller rounding.
+        if new_value > 10000:
+            return math.ceil(new_value/1000)*1000
+        elif new_value > 1000:
+            return math.ceil(new_value/100)*100
+        else:
+            return math.ceil(new_value/10)*10
+
+    # Scale all hulls in one pass, picking the table scaling factor
+    #  by ship type, or the default.
+    tships_file = File_Manager.Load_File('types/TShips.txt', return_game_file = True)
+    for _, _, value, new_value in tships_file.Scale_Fields(
+            ['hull_strength'],
+            scaling_factor, adjustment_factors_dict,
+            round_func = Round_Hull):
+        # Error check on hull getting 0'd out on a ship that didn't already
+        #  have 0 hull (as in some dummy entries)
+        assert new_value != 0 or value == 0
 
 
     # Upscale repair lasers if M3 scaling given.
@@ -121,29 +119,17 @@ def Adjust_Ship_Speed(
     # Here, ratios will be hard set based on feel or other analysis.
     # Note: while acceleration could also be changed, since it was buffed to a lesser extent
     #  as well, it should be safe to leave it alone for now.
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
-
-        # Determine the scaling factor.
-        this_scaling_factor = scaling_factor
-        # Check for specific ship name.
-        if this_dict['name'] in adjustment_factors_dict:
-            this_scaling_factor = adjustment_factors_dict[this_dict['name']]
-        # Check for ship type.
-        elif this_dict['subtype'] in adjustment_factors_dict:
-            this_scaling_factor = adjustment_factors_dict[this_dict['subtype']]
-
-        # Adjust speed.
-        if this_scaling_factor != 1:
-            # Change both speed and acceleration, so that faster ships
-            #  are also more maneuverable.
-            for field in ['speed','acceleration']:
-                # Only really need to adjust base speed itself, not tuning count.
-                value = int(this_dict[field])
-                new_value = value * this_scaling_factor
-                # Round it off.
-                new_value = round(new_value)
-                # Put it back.
-                this_dict[field] = str(new_value)
+    tships_file = File_Manager.Load_File('types/TShips.txt', return_game_file = True)
+    # Change both speed and acceleration, so that faster ships
+    #  are also more maneuverable.
+    # Only really need to adjust base speed itself, not tuning count.
+    # The scaling factor is looked up by specific ship name first, then
+    #  by ship type. Values are rounded off.
+    tships_file.Scale_Fields(
+        ['speed','acceleration'],
+        scaling_factor, adjustment_factors_dict,
+        group_keys = ('name', 'subtype'),
+        round_func = round)
 
             
 @File_Manager.Transform_Wrapper('types/TShips.txt')
@@ -164,31 +150,26 @@ def Adjust_Ship_Laser_Recharge(
         This may cause oddities if applied to an existing save.
         Defaults False.
     '''
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
-        if this_dict['subtype'] in adjustment_factors_dict or scaling_factor != 1:
-            
-            # Pick the table scaling factor, or the default.
-            if this_dict['subtype'] in adjustment_factors_dict:
-                this_scaling = adjustment_factors_dict[this_dict['subtype']]
-            else:
-                this_scaling = scaling_factor
-
-            #  The recharge is stored as a multiplier on the ships
-            #   maximum stored energy.
-            #  When updating the maximum, only it needs to change and the
-            #   recharge will scale accordingly.
-            #  When not updating maximum, the multiplier needs to be
-            #   changed directly.
-            if adjust_energy_cap:
-                value = int(this_dict['weapon_energy'])
-                new_value = value * this_scaling
-                this_dict['weapon_energy'] = str(int(new_value))
-            else:
-                # Note that weapon recharge is a float, so do no rounding.
-                value = float(this_dict['weapon_recharge_factor'])
-                new_value = value * this_scaling
-                # Limit to 6 decimals.
-                this_dict['weapon_recharge_factor'] = str('{0:.6f}'.format(new_value))
+    tships_file = File_Manager.Load_File('types/TShips.txt', return_game_file = True)
+    #  The recharge is stored as a multiplier on the ships
+    #   maximum stored energy.
+    #  When updating the maximum, only it needs to change and the
+    #   recharge will scale accordingly.
+    #  When not updating maximum, the multiplier needs to be
+    #   changed directly.
+    # Scaling factors are picked by ship type, or the default.
+    if adjust_energy_cap:
+        tships_file.Scale_Fields(
+            ['weapon_energy'],
+            scaling_factor, adjustment_factors_dict,
+            round_func = int)
+    else:
+        # Note that weapon recharge is a float, so do no rounding.
+        # Limit to 6 decimals.
+        tships_file.Scale_Fields(
+            ['weapon_recharge_factor'],
+            scaling_factor, adjustment_factors_dict,
+            round_func = lambda x: '{0:.6f}'.format(x))
 
             
             
@@ -205,22 +186,13 @@ def Adjust_Ship_Pricing(
     * adjustment_factors_dict:
       - Dict keyed by ship type, holding a scaling factor to be applied.
     '''
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
-        if this_dict['subtype'] in adjustment_factors_dict or scaling_factor != 1:
-            # Apply change to both npc and player costs.
-            for field in ['relative_value_npc', 'relative_value_player']:
-                value = int(this_dict[field])
-
-                # Pick the table scaling factor, or the default.
-                if this_dict['subtype'] in adjustment_factors_dict:
-                    new_value = value * adjustment_factors_dict[this_dict['subtype']]
-                else:
-                    new_value = value * scaling_factor
-
-                # Round it off.
-                new_value = round(new_value)
-                # Put it back.
-                this_dict[field] = str(new_value)
+    tships_file = File_Manager.Load_File('types/TShips.txt', return_game_file = True)
+    # Apply change to both npc and player costs, picking the table
+    #  scaling factor by ship type, or the default, and rounding off.
+    tships_file.Scale_Fields(
+        ['relative_value_npc', 'relative_value_player'],
+        scaling_factor, adjustment_factors_dict,
+        round_func = round)
 
 
                 
@@ -244,13 +216,13 @@ def Adjust_Ship_Shield_Regen(
         reduction_factor applied to the difference in original and target 
         rates. Recharge rates will be capped at max_rate.
     '''
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
+    def Edit_Line(this_dict):
         if this_dict['subtype'] in adjustment_factors_dict:
             # Get the subfields from the dict.
             target, factor, max_val = adjustment_factors_dict[this_dict['subtype']]
 
             # Get the original shield power.
-            value = int(this_dict['shield_power'])
+            value = this_dict.Get_Typed('shield_power')
 
             # Only apply factor if it was over the target.
             if value > target:
@@ -262,15 +234,16 @@ def Adjust_Ship_Shield_Regen(
                 #  100 or occasionally 50. Sometimes it goes lower for light ships,
                 #  so update this to round to 10.
                 new_value = round(new_value/10)*10
-                this_dict['shield_power'] = str(int(new_value))
+                this_dict.Set_Typed('shield_power', new_value)
+    File_Manager.Apply_Row_Operation('types/TShips.txt', Edit_Line)
                 
-        # Do a global adjustment separate from the category adjustments.
-        if scaling_factor != 1:
-            value = int(this_dict['shield_power'])
-            new_value = value * scaling_factor
-            # Scale to nearest 10, as above.
-            new_value = round(new_value/10)*10
-            this_dict['shield_power'] = str(int(new_value))
+    # Do a global adjustment separate from the category adjustments.
+    # Scale to nearest 10, as above.
+    tships_file = File_Manager.Load_File('types/TShips.txt', return_game_file = True)
+    tships_file.Scale_Fields(
+        ['shield_power'],
+        scaling_factor,
+        round_func = lambda x: round(x/10)*10)
                 
 
             
@@ -348,15 +321,16 @@ def Fix_Pericles_Pricing():
     what it should be.
     Does nothing if the existing npc and player prices are matched.
     '''
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
-        if this_dict['name'] == 'SS_SH_P_M4_ENH':
-            # Verify the bug is in place, with mismatched pricing.
-            # If this was already fixed in the source file, skip this step.
-            npc_price    = int(this_dict['relative_value_npc'])
-            player_price = int(this_dict['relative_value_player'])
-            if npc_price < player_price:
-                this_dict['relative_value_npc'] = this_dict['relative_value_player']
-            break
+    this_dict = File_Manager.Load_File('types/TShips.txt', 
+                                       return_game_file = True
+                                       ).Find('name', 'SS_SH_P_M4_ENH')
+    if this_dict != None:
+        # Verify the bug is in place, with mismatched pricing.
+        # If this was already fixed in the source file, skip this step.
+        npc_price    = int(this_dict['relative_value_npc'])
+        player_price = int(this_dict['relative_value_player'])
+        if npc_price < player_price:
+            this_dict['relative_value_npc'] = this_dict['relative_value_player']
 
        
 @File_Manager.Transform_Wrapper('types/TShips.txt')
@@ -389,16 +363,17 @@ def Patch_Ship_Variant_Inconsistencies(
             ]
     # Convenience import for variant name to id conversion.
     from .T_Ships_Variants import variant_name_index_dict
+    tships_file = File_Manager.Load_File('types/TShips.txt', 
+                                         return_game_file = True)
 
     # Loop over the patches to apply.
     for patch_ship_name, base_ship_name, variant in ship_patch_tuple_list:
 
         # Find the standard name id from the base ship.
         name_id = None
-        for this_dict in File_Manager.Load_File('types/TShips.txt'):
-            if this_dict['name'] == base_ship_name:
-                name_id = this_dict['name_id']
-                break
+        this_dict = tships_file.Find('name', base_ship_name)
+        if this_dict != None:
+            name_id = this_dict['name_id']
 
         # If the base name was not found for some reason, skip ahead,
         #  since the target ship may not be from this mod state.
@@ -424,13 +399,12 @@ def Patch_Ship_Variant_Inconsistencies(
         # Find the problem ship.
         # Note: this should be safe across multiple transform calls, just
         #  writing the same fields each time.
-        for this_dict in File_Manager.Load_File('types/TShips.txt'):
-            if this_dict['name'] == patch_ship_name:
-                # Set the name to that of the base ship.
-                this_dict['name_id'] = name_id
-                # Set the variant using the standard field.
-                this_dict['variation_index'] = str(variant_name_index_dict[variant])
-                break
+        this_dict = tships_file.Find('name', patch_ship_name)
+        if this_dict != None:
+            # Set the name to that of the base ship.
+            this_dict['name_id'] = name_id
+            # Set the variant using the standard field.
+            this_dict['variation_index'] = str(variant_name_index_dict[variant])
 
                 
 @File_Manager.Transform_Wrapper('types/TShips.txt', XRM = False, LU = False)
@@ -443,20 +417,20 @@ def Boost_Truelight_Seeker_Shield_Reactor():
     If the TLS is already at least 1/5 of Centaur shielding, this
     transform is not applied.
     '''
+    tships_file = File_Manager.Load_File('types/TShips.txt', 
+                                         return_game_file = True)
     # Look for the centaur.
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
-        if this_dict['name'] == 'SS_SH_A_M6_P':
-            # Note its shield reactor.
-            centaur_shield_power = int(this_dict['shield_power'])
-            break
+    this_dict = tships_file.Find('name', 'SS_SH_A_M6_P')
+    if this_dict != None:
+        # Note its shield reactor.
+        centaur_shield_power = int(this_dict['shield_power'])
     # Look for the TLS.
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
-        if this_dict['name'] == 'SS_SH_TLS':
-            shield_power = int(this_dict['shield_power'])
-            # Apply change if not within 1/5 of the centaur shielding.
-            if shield_power < centaur_shield_power / 5:
-                this_dict['shield_power'] = str(centaur_shield_power)
-            break
+    this_dict = tships_file.Find('name', 'SS_SH_TLS')
+    if this_dict != None:
+        shield_power = int(this_dict['shield_power'])
+        # Apply change if not within 1/5 of the centaur shielding.
+        if shield_power < centaur_shield_power / 5:
+            this_dict['shield_power'] = str(centaur_shield_power)
 
         
 @File_Manager.Transform_Wrapper('types/TShips.txt')
@@ -488,12 +462,13 @@ def Simplify_Engine_Trails(
             # 'SG_SH_TL',
             'SG_SH_GO',
             ]
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
+    def Edit_Line(this_dict):
         # Light ships get a 1 if not removing trails entirely.
         if this_dict['subtype'] in light_ships and not remove_trails:
             this_dict['particle_effect'] = '1'
         else:
             this_dict['particle_effect'] = '0'
+    File_Manager.Apply_Row_Operation('types/TShips.txt', Edit_Line)
     return
            
 
@@ -536,13 +511,13 @@ def Standardize_Ship_Tunings(
     # TODO: maybe provide a script to run which resets ships to their
     #  max tunings if they went over (though would mess with overtuned
     #  ships that may exist).
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
+    def Edit_Line(this_dict):
         
         # Skip if this is not a selected ship.
         if ship_types:
             if (this_dict['subtype'] not in ship_types 
             and this_dict['name'] not in ship_types):
-                continue
+                return
 
         # Loop over the engine and rudder tunings, to share code.
         for tuning_amount, tuning_field, scaled_field_list in zip(
@@ -597,6 +572,7 @@ def Standardize_Ship_Tunings(
 
             # Update the tuning amount.
             this_dict[tuning_field] = str(tuning_amount)
+    File_Manager.Apply_Row_Operation('types/TShips.txt', Edit_Line)
 
             
 
@@ -1128,7 +1104,7 @@ def Expand_Bomber_Missiles(
         Default False. Low cargo volume of bomber missiles may be unbalanced
         on frigates.
     '''
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
+    def Edit_Line(this_dict):
         # Unpack the missile flags.
         missile_flags = Unpack_Tships_Missile_Flags(this_dict)
         
@@ -1164,6 +1140,7 @@ def Expand_Bomber_Missiles(
 
         # Repack the modified flags.
         Pack_Tships_Missile_Flags(this_dict, missile_flags)
+    File_Manager.Apply_Row_Operation('types/TShips.txt', Edit_Line)
 
     return
 
@@ -1224,11 +1201,11 @@ def Add_Ship_Cross_Faction_Missiles(
         ('SG_MISSILE_TR_TORP_CAPITAL' , 'SG_MISSILE_TORP_CAPITAL'),
         ]
 
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
+    def Edit_Line(this_dict):
         
         # Skip races not being modified.
-        if Race_code_name_dict[int(this_dict['race'])] not in race_types:
-            continue
+        if Race_code_name_dict[this_dict.Get_Typed('race')] not in race_types:
+            return
 
         # Unpack the missile flags.
         missile_flags = Unpack_Tships_Missile_Flags(this_dict)
@@ -1249,6 +1226,7 @@ def Add_Ship_Cross_Faction_Missiles(
                     
         # Repack the modified flags.
         Pack_Tships_Missile_Flags(this_dict, missile_flags)
+    File_Manager.Apply_Row_Operation('types/TShips.txt', Edit_Line)
 
     return
 
@@ -1281,12 +1259,12 @@ def Add_Ship_Boarding_Pod_Support(
         Default is ['SG_MISSILE_HEAVY','SG_MISSILE_TR_HEAVY'],
         requiring ships to already support heavy missiles.
     '''
-    for this_dict in File_Manager.Load_File('types/TShips.txt'):
+    def Edit_Line(this_dict):
         
         # Skip if this is not a ship to add the missile to.
         if (this_dict['subtype'] not in ship_types 
         and this_dict['name'] not in ship_types):
-            continue
+            return
 
         # Skip if this is not a marine supporting subtype.
         if this_dict['subtype'] not in [
@@ -1298,7 +1276,7 @@ def Add_Ship_Boarding_Pod_Support(
             'SG_SH_TM',
             'SG_SH_TL',
             ]:
-            continue
+            return
 
         # Unpack the missile flags.
         missile_flags = Unpack_Tships_Missile_Flags(this_dict)
@@ -1307,13 +1285,14 @@ def Add_Ship_Boarding_Pod_Support(
         #  does not support the missile.
         if required_missiles:
             if not any(missile_flags[x] for x in required_missiles):
-                continue
+                return
 
         # Add boarding pods.
         missile_flags['SG_MISSILE_BOARDINGPOD'] = 1
 
         # Repack the modified flags.
         Pack_Tships_Missile_Flags(this_dict, missile_flags)
+    File_Manager.Apply_Row_Operation('types/TShips.txt', Edit_Line)
 
     return
 
@@ -536,12 +536,10 @@ def Add_Ship_Variants(
     tships_file = File_Manager.Load_File('types/TShips.txt', 
                                          return_game_file = True)
 
-    # Build a list of all ship names.
+    # Get an index of all ship names.
     # This is used later to ensure generated names have no conflicts
     #  with existing names.
-    ship_names_list = []
-    for ship_dict in tships_file.Read_Data():
-        ship_names_list.append(ship_dict['name'])
+    ship_name_index = tships_file.Index('name')
 
     
     # Build a (name,race) : variant index : ship_list dictionary.
@@ -703,24 +701,24 @@ def Add_Ship_Variants(
                         # Calculate shielding for basic and variant.
                         # This has some copy/paste, but not worth trying to
                         #  set up code sharing on this.
-                        basic_shield_slots = int(basic_dict['max_shields'])
+                        basic_shield_slots = basic_dict.Get_Typed('max_shields')
                         basic_shield_size  = Flags.Shield_type_size_dict[
-                                int(basic_dict['shield_type'])]
+                                basic_dict.Get_Typed('shield_type')]
                         basic_value = basic_shield_slots * basic_shield_size
                     
-                        variant_shield_slots = int(variant_dict['max_shields'])
+                        variant_shield_slots = variant_dict.Get_Typed('max_shields')
                         variant_shield_size  = Flags.Shield_type_size_dict[
-                                int(variant_dict['shield_type'])]
+                                variant_dict.Get_Typed('shield_type')]
                         variant_value = variant_shield_slots * variant_shield_size
 
                     # Special handling on speed tuning related values.
                     elif field in ['speed', 'acceleration']:
                         # Wrap tunings into the values, to capture their variation
                         #  at the same time.
-                        basic_value   = (int(basic_dict[field]) 
-                                         * (1 + int(basic_dict['speed_tunings'])/10))
-                        variant_value = (int(variant_dict[field]) 
-                                         * (1 + int(variant_dict['speed_tunings'])/10))
+                        basic_value   = (basic_dict.Get_Typed(field) 
+                                         * (1 + basic_dict.Get_Typed('speed_tunings')/10))
+                        variant_value = (variant_dict.Get_Typed(field) 
+                                         * (1 + variant_dict.Get_Typed('speed_tunings')/10))
                     
 
                     # Special handling on rudder tuning related values.
@@ -728,10 +726,10 @@ def Add_Ship_Variants(
                     elif field in ['yaw', 'pitch', 'roll']:
                         # Wrap tunings into the values, to capture their variation
                         #  at the same time.
-                        basic_value   = (float(basic_dict[field]) 
-                                         * (1 + int(basic_dict['rudder_tunings'])/10))
-                        variant_value = (float(variant_dict[field]) 
-                                         * (1 + int(variant_dict['rudder_tunings'])/10))
+                        basic_value   = (basic_dict.Get_Typed(field) 
+                                         * (1 + basic_dict.Get_Typed('rudder_tunings')/10))
+                        variant_value = (variant_dict.Get_Typed(field) 
+                                         * (1 + variant_dict.Get_Typed('rudder_tunings')/10))
 
 
                     # -Removed; equipment is not part of base cost, so no special
@@ -748,14 +746,9 @@ def Add_Ship_Variants(
                     
                     else:
                         # Grab the field values directly.
-                        # Might be int or float, try both.
-                        # TODO: think about how to put back correctly.
-                        try:
-                            basic_value   = int(basic_dict[field])
-                            variant_value = int(variant_dict[field])
-                        except ValueError:
-                            basic_value   = float(basic_dict[field])
-                            variant_value = float(variant_dict[field])
+                        # Might be int or float; the typed lookup handles both.
+                        basic_value   = basic_dict.Get_Typed(field)
+                        variant_value = variant_dict.Get_Typed(field)
 
                     # This could be 0 in the special case of cargo size.
                     # Manually handle that case.
@@ -874,6 +867,8 @@ def Add_Ship_Variants(
     # To know the variant index, need to know the base max index.
     # Variant index is base + offset (number of variants).
     base_tships_max_index = len(tships_file.Read_Data()) - 1
+    # Look up table for the tships index of each base ship.
+    base_index_dict = {x : i for i, x in enumerate(tships_file.Read_Data())}
 
     # Loop over the ship names.
     # Each gets considered separately.
@@ -1027,7 +1022,7 @@ def Add_Ship_Variants(
             # Add the predefined suffix for the variant type.
             new_name = new_ship_dict['name'] + variant_index_suffix_dict[variant_index]
             # Toss an error if the name is taken; it shouldn't be, but be safe.
-            if new_name in ship_names_list:
+            if new_name in ship_name_index:
                 raise Exception('Variant name {} already taken.'.format(new_name))
             new_ship_dict['name'] = new_name
 
@@ -1208,9 +1203,9 @@ def Add_Ship_Variants(
                 if field == 'shielding':
                     continue
 
-                # May be float or int. Use try/except to catch this.
-                try:
-                    value = int(new_ship_dict[field])
+                # May be float or int; ints get field specific rounding.
+                value = new_ship_dict.Get_Typed(field)
+                if isinstance(value, int):
 
                     # Do any adjustment based on shield_conversion_ratios if there
                     #  was innaccuracy in the shield adjustment.
@@ -1281,12 +1276,12 @@ def Add_Ship_Variants(
                         value = round(value)
 
                     # Put it back.
-                    new_ship_dict[field] = str(int(value))
+                    new_ship_dict.Set_Typed(field, int(value))
 
-                except ValueError:
+                else:
                     # Floats will not have as complicated rounding, since
                     #  they don't get displayed directly in game.
-                    value = float(new_ship_dict[field]) * ratio
+                    value = value * ratio
                                                 
                     # Put it back.
                     # Aim for no more than 7 decimal places.
@@ -1307,7 +1302,7 @@ def Add_Ship_Variants(
             #  ship index.
             # Eg. the basic_dict might be index 0 for a mammoth, and the
             #  variant expected to be original max index + variant count.
-            base_index = tships_file.data_dict_list.index(basic_dict)
+            base_index = base_index_dict[basic_dict]
             this_index = base_tships_max_index + len(new_ships_list)
             variant_index_to_base_index_dict[this_index] = base_index
 
@@ -1365,55 +1360,48 @@ def Update_Bounce(variant_index_to_base_index_dict):
                                          error_if_not_found = False)
     if bounce_file == None:
         return
-    bounce_xml = bounce_file.Get_XML_Tree()
-    # Get the node with the bounce information.
-    bounce_node = bounce_xml.find('./page[@id="80000"]')
-
-    # Small support function for looking up a wall node.
-    def Get_T_Node(t_id):
-        subnode = bounce_node.find('./t[@id="{}"]'.format(t_id ))
-        return subnode
-
-    # Don't edit the wall file if no changes are made.
-    # This way the comments won't get stripped, particularly if the
-    #  wall file was generated manually for the variants.
-    change_occurred = False
+    # The bounce information is on page 80000, with text ids looked up
+    #  through the language file index.
+    bounce_page = 80000
+    # New wall nodes are added to the text override file, leaving the
+    #  bounce file unchanged.
+    text_override_file = File_Manager.Load_File('text_override')
+
+    # Small support function for looking up a wall node's text.
+    # Checks the override file first, in case of nodes added by a prior
+    #  call.
+    def Get_T_Text(t_id):
+        text = text_override_file.Get_Entry(bounce_page, t_id)
+        if text == None:
+            text = bounce_file.Get_Entry(bounce_page, t_id)
+        return text
 
     # Work through variants, in order.
     for variant_index, base_index in variant_index_to_base_index_dict.items():
 
         # Skip if the base_index (*10) wasn't in the wall file.
-        if Get_T_Node(base_index * 10) == None:
+        if Get_T_Text(base_index * 10) == None:
             continue
         # Skip if the variant index (*10) is in the wall file already for
         #  some reason. This could happen if the wall file was generated
         #  after variant additions, and then the customizer was rerun.
-        if Get_T_Node(variant_index * 10) != None:
+        if Get_T_Text(variant_index * 10) != None:
             continue
 
         # Loop over the base nodes (should be 7 total).
         for t_offset in range(7):
-            base_node = Get_T_Node(base_index * 10 + t_offset)
-
-            # Make a copy of this node. Could also make a new node, but this
-            #  might preserve spacing better.
-            variant_node = copy.deepcopy(base_node)
+            # Copy the text of this node.
+            text = Get_T_Text(base_index * 10 + t_offset)
+            assert text != None
 
             # The first node will swap the text field to the variant index.
             if t_offset == 0:
-                assert base_node.text == str(base_index)
-                variant_node.text = str(variant_index)
+                assert text == str(base_index)
+                text = str(variant_index)
 
             # All nodes swap their ids to offset from the variant index.
-            variant_node.set('id', str(variant_index * 10 + t_offset))
-            bounce_node.append(variant_node)
-
-        # If here, a variant was added.
-        change_occurred = True
-
-    # Record the changes.
-    if change_occurred:
-        bounce_file.Update_From_XML_Node(bounce_xml)
+            text_override_file.Set_Entry(
+                bounce_page, variant_index * 10 + t_offset, text)
     return
 
 
@@ -224,123 +224,97 @@ def Color_Sector_Names(
     '''
     import re
 
-    # Open the universe file and scan through it to find sector owners.
-    # This could be done with a fuller xml parser, but since the operation is simple just
-    #  do a quick pattern check on each line.
+    # Look up the sector owners through the universe file's sector index.
     # TODO: maybe also parse some other map files, eg War_Effort which has a different
     #  race ownership for sector used in the Final Fury plot that switches from
     #  unknown to Argon (Unknown in x3_universe, Argon in War_Effort).
     sector_id_color_dict = {}
-    # Loop over the universe lines.
-    for line in File_Manager.Load_File('maps/x3_universe.xml').Get_Text().splitlines():
+    universe_file = File_Manager.Load_File('maps/x3_universe.xml')
+    # Loop over the sectors.
+    for x, y in universe_file.Get_Sector_Keys():
+        field_dict = universe_file.Get_Sector_Fields(x, y)
 
-        # Expect every system declaration line to have a 'size' field.
-        if 'size=' in line:
+        # Verify by the sector also defining generic missions chances.
+        if 'qtrade' not in field_dict:
+            print('Skipped Color_Sector_Names, parsing error.')
+            return
 
-            # Verify by the line also defining generic missions chances.
-            if 'qtrade=' not in line:
-                print('Skipped Color_Sector_Names, parsing error.')
-                return
+        # Determine the sector code in the language file.
+        # This starts with prefix 102.
+        id = '102{:02d}{:02d}'.format(
+            # Add 1 to these to match up with the language file.
+            # Put y first.
+            y +1 , 
+            x +1 )
 
-            # Find the x,y,r terms.
-            field_dict = Parse_universe_line(line)
-
-            # Determine the sector code in the language file.
-            # This starts with prefix 102.
-            id = '102{:02d}{:02d}'.format(
-                # Add 1 to these to match up with the language file.
-                # Put y first.
-                int(field_dict['y']) +1 , 
-                int(field_dict['x']) +1 )
-
-            # Look up the color letter and store it.
-            sector_id_color_dict[id] = Race_color_letters[field_dict['r']]
+        # Look up the color letter and store it.
+        sector_id_color_dict[id] = Race_color_letters[field_dict['r']]
 
 
     # Now that all sector names and color codes are recorded, go through the
     #  text files.
-    # This will begin edits in the sector name section, identified by
-    #  start and end codes.
+    # This will read the sector name pages, identified by their title.
     # Note: a language file may have definitions broken up across multiple
-    #  Sectornames blocks with different ids.
-    start_code = 'title="Boardcomp. Sectornames"'
-    end_code   = '</page>'
-
-    # Loop over the language files to edit.
-    # Try to edit 0001 directly for now; don't use 9961 as intermediary.
-    for text_file_name in ['t/0001-L044.xml','t/7027-L044.xml','t/7360-L044.xml']: #'9961-L044.xml'
-        
-        # Break the text into lines, for easier editing.
-        file_contents = File_Manager.Load_File(text_file_name)
-        line_list = file_contents.Get_Text().splitlines()
-        start_found = False
-
-        # Loop over the lines by index.
-        for index, this_line in enumerate(line_list):
-
-            # Skip empty lines (do a quick split to toss white space).
-            if not this_line.split():
-                continue
-            
-            # Look for the start line if not found.
-            if not start_found:
-                if start_code in this_line:
-                    start_found = True
-                # Can skip the rest of this line.
-                continue
-
-            # Look for the end code.
-            if end_code in this_line:
-                # Unflag the start, so that the loop will search for the
-                #  next sector name block (if any).
-                start_found = False
-                continue
-
-            # Otherwise, this line should be of a format like:
-            #  <t id="1020101">Kingdom End</t>
-            # or
-            #  <t id="1020117">{7,1020000}</t>
-            # The latter case is a redirection to another line, and
-            #  can be ignored for coloring (the line redirected to should
-            #  have the color applied). Currently this appears to only be
-            #  used for unknown sector for the example colored sectors mod,
-            #  though may show up elsewhere in some text files for xrm.
-            # Start by getting the quoted id.
-            # Use regex search, pattern on quotes around numbers.
-            match_object = re.search(r'"([0-9]*)"', this_line)
-            assert match_object != None
-            # The id should be the only match, which can be obtained by
-            #  using .group(1) (group 0 is the whole string apparently).
-            id = match_object.group(1)
-
-            # If there is no color for this sector id, skip it.
-            # (This occurs for eg. Unknown Sector, which has a special code not
-            #  assigned to any particular real sector).
-            if id not in sector_id_color_dict:
-                continue
-
-            # Look up the color letter; it should hopefully be found.
-            color = sector_id_color_dict[id]
-
-            # Now look up the right side to wrap in color formatting.
-            # Use regex, pattern on the '>' and '<', numbers, letters, spaces,
-            #  braces, parenthesis (use \ to escape them) allowed. Also add
-            #  some special chars as needed, eg. ' and ,.
-            match_object = re.search(r">([A-Za-z0-9\s\(\)/{}',-]*)<", this_line)
-            assert match_object != None
-            sector_name = match_object.group(1)
-
-            # There may be comments or references in the sector name, but it
-            #  should be okay to just wrap it all in the text color blindly.
-
-            # Do a replacement and put it back.
-            line_list[index] = this_line.replace(sector_name, r'\033{}{}\033X'.format(
-                color,
-                sector_name
-                ))
-
-        # Put the lines back. Keep an ending newline, since some original files had that.
-        file_contents.Update_From_Text('\n'.join(line_list)+'\n')
+    #  Sectornames pages with different ids.
+    page_title = 'Boardcomp. Sectornames'
+
+    # Colored names are written to the text override file, leaving the
+    #  source language files unmodified.
+    text_override_file = File_Manager.Load_File('text_override')
+
+    # The language files to read.
+    # These are in increasing number order, matching the game's priority,
+    #  so that a name from a later file replaces that from an earlier one.
+    text_file_list = [File_Manager.Load_File(x) for x in 
+                      ['t/0001-L044.xml','t/7027-L044.xml','t/7360-L044.xml']]
+
+    # Find the ids of the sector name pages in any of the files.
+    # Since the game merges pages by id, a page is read in all files once
+    #  found, in case a later file gives it a different title.
+    sector_page_ids = []
+    for file_contents in text_file_list:
+        for page_id in file_contents.Get_Page_Ids(title = page_title):
+            if page_id not in sector_page_ids:
+                sector_page_ids.append(page_id)
+
+    for file_contents in text_file_list:
+
+        # Loop over the sector name pages, and their text ids.
+        for page_id in sector_page_ids:
+            for t_id in file_contents.Get_Text_Ids(page_id):
+
+                # If there is no color for this sector id, skip it.
+                # (This occurs for eg. Unknown Sector, which has a special code not
+                #  assigned to any particular real sector).
+                id = str(t_id)
+                if id not in sector_id_color_dict:
+                    continue
+
+                # Look up the color letter; it should hopefully be found.
+                color = sector_id_color_dict[id]
+
+                # The text should be of a format like:
+                #  Kingdom End
+                # or
+                #  {7,1020000}
+                # The latter case is a redirection to another line, and
+                #  can be ignored for coloring (the line redirected to should
+                #  have the color applied). Currently this appears to only be
+                #  used for unknown sector for the example colored sectors mod,
+                #  though may show up elsewhere in some text files for xrm.
+                # Verify the name has the expected characters with regex:
+                #  numbers, letters, spaces, braces, parenthesis (use \ to
+                #  escape them) allowed. Also add some special chars as needed,
+                #  eg. ' and ,.
+                sector_name = file_contents.Get_Entry(page_id, t_id)
+                assert re.fullmatch(r"[A-Za-z0-9\s\(\)/{}',-]*", sector_name) != None
+
+                # There may be comments or references in the sector name, but it
+                #  should be okay to just wrap it all in the text color blindly.
+                text_override_file.Set_Entry(page_id, t_id, r'\033{}{}\033X'.format(
+                    color,
+                    sector_name
+                    ))
                 
     return
 
@@ -356,14 +330,24 @@ def Restore_Aldrin_rock():
     # Since the text is long, put it at the end of this module.
     original_text, replacement_text = Get_Aldrin_rock_texts()
     
-    file_contents = File_Manager.Load_File('maps/x3_universe.xml')
+    # The text is within the objects of one sector, so search the sectors
+    #  through the universe file's sector index.
+    universe_file = File_Manager.Load_File('maps/x3_universe.xml')
+    match_count = 0
+    for x, y in universe_file.Get_Sector_Keys():
+        count = universe_file.Get_Sector_Object_Text(x, y).count(original_text)
+        if count:
+            match_count += count
+            sector_key = (x, y)
     # Verify the original_block is present (matches successfully).
-    if not file_contents.Get_Text().count(original_text) == 1:
+    if not match_count == 1:
         print('Skipped Restore_Aldrin_rock,'
               ' format of source not as expected from XRM.')
         return
-    file_contents.Update_From_Text(
-        file_contents.Get_Text().replace(original_text, replacement_text))
+    universe_file.Set_Sector_Object_Text(
+        *sector_key,
+        universe_file.Get_Sector_Object_Text(*sector_key).replace(
+            original_text, replacement_text))
         
     
 @File_Manager.Transform_Wrapper('maps/x3_universe.xml', Vanilla = False, LU = False)
@@ -383,18 +367,18 @@ def Restore_Hub_Music(
     # Pick a queue name for this; also use as file name.
     cue_name = 'X3_Customizer_Restore_Hub_Music'
     
-    # Do the test replacement, as above, keying off of sector
-    #  13,8, the Hub sector.
-    original_text    = '<o t="1" x="13" y="8" r="14" size="10000000" m="0"'
-    replacement_text = '<o t="1" x="13" y="8" r="14" size="10000000" m="8302"'
-
-    file_contents = File_Manager.Load_File('maps/x3_universe.xml')
-    # Verify the original_block is present (matches successfully).
-    if not file_contents.Get_Text().count(original_text) == 1:
+    # Edit the sector music through the universe file's sector index,
+    #  keying off of sector 13,8, the Hub sector.
+    universe_file = File_Manager.Load_File('maps/x3_universe.xml')
+    field_dict = universe_file.Get_Sector_Fields(13, 8)
+    # Verify the sector has the expected fields.
+    if (field_dict == None
+    or field_dict.get('r') != '14'
+    or field_dict.get('size') != '10000000'
+    or field_dict.get('m') != '0'):
         print('Skipped Restore_Hub_Music, format of source not as expected from XRM.')
         return
-    file_contents.Update_From_Text(
-        file_contents.Get_Text().replace(original_text, replacement_text))
+    universe_file.Set_Sector_Field(13, 8, 'm', 8302)
 
     # When a save already has the wrong music, apply a patch.
     if apply_to_existing_save:
@@ -427,18 +411,18 @@ def Restore_M148_Music(
     # Pick a queue name for this; also use as file name.
     cue_name = 'X3_Customizer_Restore_M148_Music'
     
-    # Do the test replacement, as above, keying off of sector
-    #  14,8, the M148 sector.
-    original_text    = '<o t="1" x="14" y="8" r="1" size="22500000" m="8100"'
-    replacement_text = '<o t="1" x="14" y="8" r="1" size="22500000" m="8509"'
-
-    file_contents = File_Manager.Load_File('maps/x3_universe.xml')
-    # Verify the original_block is present (matches successfully).
-    if not file_contents.Get_Text().count(original_text) == 1:
+    # Edit the sector music through the universe file's sector index,
+    #  keying off of sector 14,8, the M148 sector.
+    universe_file = File_Manager.Load_File('maps/x3_universe.xml')
+    field_dict = universe_file.Get_Sector_Fields(14, 8)
+    # Verify the sector has the expected fields.
+    if (field_dict == None
+    or field_dict.get('r') != '1'
+    or field_dict.get('size') != '22500000'
+    or field_dict.get('m') != '8100'):
         print('Skipped Restore_M148_Music, format of source not as expected from XRM.')
         return
-    file_contents.Update_From_Text(
-        file_contents.Get_Text().replace(original_text, replacement_text))
+    universe_file.Set_Sector_Field(14, 8, 'm', 8509)
 
     # When a save already has the wrong music, apply a patch.
     if apply_to_existing_save:
@@ -491,30 +475,6 @@ def Change_Sector_Music(
     Make_Director_Shell(cue_name, text)
 
     
-def Parse_universe_line(line):
-    '''
-    Parse a line from the universe file.
-    Returns a dict, keyed by field name; values are raw text, typically integers.
-    '''
-    # Convert the different fields into a dict.
-    field_dict = {}
-
-    # Line format is similar to (with some fields removed): 
-    #  <o t="1" x="14" y="10" r="18" size="15000000" m="0" p="-1">
-    # Remove the '<o' and '>', and the quotes.
-    line = line.replace('<o','').replace('>','').replace('"','')
-
-    # Loop over the entries in the line by splitting on spaces.
-    for entry in line.split():
-        # Split on the '='.
-        entry_split = entry.split('=')
-        # The left side is the entry name, right side is value.
-        field_dict[entry_split[0]] = entry_split[1]
-
-    return field_dict
-
-
-
 def Get_Aldrin_rock_texts():
     # Texts taken from XRM (called original) and TC plots for AP (called replacement).
     # Replacement text includes the 'SS_SPECIAL_ASTEROIDMOON', but the entire block is included
@@ -212,18 +212,18 @@ def Change_Ware_Size(
     for file_name in ware_file_list:
 
         # Try to load it; skip if not found.
-        line_dict_list = File_Manager.Load_File(file_name)
-        if line_dict_list == None:
+        t_file = File_Manager.Load_File(file_name, 
+                                        return_game_file = True,
+                                        error_if_not_found = False)
+        if t_file == None:
             continue
 
-        # Loop over the wares.
-        for this_dict in line_dict_list:
-            # Search for a name match.
-            if this_dict['name'] == ware_name:
-
-                # Apply the change and return.
-                this_dict['cargo_size'] = str(new_size)
-                return
+        # Search for a name match.
+        this_dict = t_file.Find('name', ware_name)
+        if this_dict != None:
+            # Apply the change and return.
+            this_dict['cargo_size'] = str(new_size)
+            return
 
     # If here, the ware wasn't found.
     print('Change_Ware_Size error: ware {}'
@@ -238,8 +238,11 @@ def Get_Ware_Cost(ware_list):
     Cost is given as estimated credits.
     '''
     total_cost = 0
-    for this_dict in File_Manager.Load_File('types/TWareT.txt'):
-        if this_dict['name'] in ware_list:
+    name_index = File_Manager.Load_File('types/TWareT.txt', 
+                                        return_game_file = True).Index('name')
+    # Each matching line counts once, even if its name is listed twice.
+    for name in set(ware_list):
+        for this_dict in name_index.get(name, []):
             total_cost += int(this_dict['relative_value_npc'])
     # Apply scaling and return.    
     return total_cost * Flags.Value_to_credits_ratio_dict['TWareT']
\ No newline at end of file
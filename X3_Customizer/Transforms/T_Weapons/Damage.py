@@ -61,11 +61,12 @@ def Adjust_Weapon_OOS_Damage(
       - The base multiplier to apply to OOS damage.
     '''
     # Step through the bullets and scale their OOS numbers.
-    for this_dict in File_Manager.Load_File('types/TBullets.txt'):
+    def Edit_Line(this_dict):
         if scaling_factor != 1:
             for field in ['hull_damage_oos', 'shield_damage_oos']:
-                value = int(this_dict[field])
-                this_dict[field] = str(round(value * scaling_factor))
+                value = this_dict.Get_Typed(field)
+                this_dict.Set_Typed(field, round(value * scaling_factor))
+    File_Manager.Apply_Row_Operation('types/TBullets.txt', Edit_Line)
 
     # -Removed; older code from when it was thought ROF was ignored OOS.
     # vanilla_calibration_factor:
@@ -357,7 +358,7 @@ def Adjust_Weapon_DPS(
                     continue
 
                 # Look up the IS damage, and calculate dps.
-                damage = int(bullet_dict[field])
+                damage = bullet_dict.Get_Typed(field)
                 overall_dps = damage   * fire_rate
 
                 # Skip ahead if dps is 0, eg. shield dps for mass drivers.
@@ -416,8 +417,8 @@ def Adjust_Weapon_DPS(
 
                 # Apply the scaling factors to their IS and OOS fields.
                 for writeback_field in [field, oos_field]:
-                    value = int(bullet_dict[writeback_field])
-                    bullet_dict[writeback_field] = str(int(value * this_scaling_factor))
+                    value = bullet_dict.Get_Typed(writeback_field)
+                    bullet_dict.Set_Typed(writeback_field, value * this_scaling_factor)
 
             # If no adjustments were made to the bullet, skip ahead.
             if not scaling_factor_dict:
@@ -433,8 +434,8 @@ def Adjust_Weapon_DPS(
             #  for the weapon).
             if maintain_energy_efficiency:
                 max_factor = max(scaling_factor_dict.values())
-                value = int(bullet_dict['energy_used'])
-                bullet_dict['energy_used'] = str(int(value * max_factor))
+                value = bullet_dict.Get_Typed('energy_used')
+                bullet_dict.Set_Typed('energy_used', value * max_factor)
                 
     #  Since bullet energies may have been changed, update the max laser energies.
     Floor_Laser_Energy_To_Bullet_Energy()
@@ -210,9 +210,9 @@ def Adjust_Weapon_Fire_Rate(
 
             # Pull the fire rate, IS hull/shield damage, and energy use.
             # TODO: modify special fields like energy drain.
-            hull_damage       = int(bullet_dict['hull_damage'])
-            shield_damage     = int(bullet_dict['shield_damage'])
-            energy_used       = int(bullet_dict['energy_used'])
+            hull_damage       = bullet_dict.Get_Typed('hull_damage')
+            shield_damage     = bullet_dict.Get_Typed('shield_damage')
+            energy_used       = bullet_dict.Get_Typed('energy_used')
                         
             # Scale energy use by inverse of the fire rate factor (half rate = double energy).
             energy_factor = 1 / new_fire_rate_factor
@@ -227,9 +227,9 @@ def Adjust_Weapon_Fire_Rate(
             energy_used   = round(energy_used           * energy_factor)
 
             # Put back.
-            bullet_dict['hull_damage']       = str(int(hull_damage  ))
-            bullet_dict['shield_damage']     = str(int(shield_damage))
-            bullet_dict['energy_used']       = str(int(energy_used  ))
+            bullet_dict.Set_Typed('hull_damage'  , hull_damage  )
+            bullet_dict.Set_Typed('shield_damage', shield_damage)
+            bullet_dict.Set_Typed('energy_used'  , energy_used  )
 
     #  Since bullet energies were changed, update the max laser energies.
     Floor_Laser_Energy_To_Bullet_Energy()
@@ -38,7 +38,7 @@ def _Initialize_Bullet_parent_to_child_dict():
         # Check if this bullet fragments.
         if flags_dict['fragmentation']:
             # Record the pairing.
-            _Bullet_parent_to_child_dict[index] = int(this_dict['fragment_bullet'])
+            _Bullet_parent_to_child_dict[index] = this_dict.Get_Typed('fragment_bullet')
             
 def Get_Laser_Bullets(laser_dict):
     '''
@@ -51,7 +51,7 @@ def Get_Laser_Bullets(laser_dict):
         _Initialize_Bullet_parent_to_child_dict()
 
     # Get the index of the bullet this laser creates.
-    this_bullet_index = int(laser_dict['bullet'])
+    this_bullet_index = laser_dict.Get_Typed('bullet')
     bullet_list = []
     # Start at the laser's initial bullet.
     current_bullet = this_bullet_index
@@ -108,19 +108,19 @@ def Floor_Laser_Energy_To_Bullet_Energy():
     for laser_dict in File_Manager.Load_File('types/TLaser.txt'):
 
         #  Grab the max laser energy storage.
-        laser_energy = int(laser_dict['max_energy'])
+        laser_energy = laser_dict.Get_Typed('max_energy')
         
         #  Look up the primary bullet to be fired.
         #  Extra child bullets shouldn't matter here.
-        this_bullet_index = int(laser_dict['bullet'])
+        this_bullet_index = laser_dict.Get_Typed('bullet')
         bullet_dict = tbullets_dict_list[this_bullet_index]
 
         #  Get the bullet required energy.
-        bullet_energy = int(bullet_dict['energy_used'])
+        bullet_energy = bullet_dict.Get_Typed('energy_used')
 
         #  If needed, upscale the laser storage.
         if laser_energy < bullet_energy:
-            laser_dict['max_energy'] = str(bullet_energy)
+            laser_dict.Set_Typed('max_energy', bullet_energy)
 
     return
 
@@ -131,8 +131,8 @@ def Update_Bullet_Speed(bullet_dict, new_speed):
     keeping range constant through a lifetime adjustment.
     '''
     # Look up the original lifetime and speed.
-    speed    = int(bullet_dict['speed'])
-    lifetime = int(bullet_dict['lifetime'])
+    speed    = bullet_dict.Get_Typed('speed')
+    lifetime = bullet_dict.Get_Typed('lifetime')
 
     # Round speed to nearest 10 for nicer looking number in game.
     # Round up in case a bullet is really slow.
@@ -146,5 +146,5 @@ def Update_Bullet_Speed(bullet_dict, new_speed):
     new_lifetime = lifetime * speed / new_speed
 
     # Put them back, rounded.
-    bullet_dict['speed'] = str(int(new_speed))
-    bullet_dict['lifetime'] = str(int(new_lifetime))
+    bullet_dict.Set_Typed('speed', new_speed)
+    bullet_dict.Set_Typed('lifetime', new_lifetime)